@@ -4,12 +4,16 @@ Galvenais Flask lietotnes modulis.
 Satur visus HTTP maršrutus un WebSocket apstrādi.
 """
 import os
+import json
 import logging
-from flask import Flask, jsonify, request, render_template, send_from_directory
+from flask import Flask, Response, g, jsonify, request, render_template, send_from_directory, stream_with_context
 from flask_socketio import SocketIO
 
 from config import Config
 from conversation import chatbot_service, conversation_manager
+from metrics import registry, STAGE_SECONDS
+from logging_setup import new_request_id, request_context, request_id_var
+from profiling import request_profiler
 
 # Konfigurējam logger
 logger = logging.getLogger(__name__)
@@ -26,6 +30,25 @@ app.config['DEBUG'] = os.environ.get('ENV', 'production') != 'production'
 # Inicializējam SocketIO ar CORS atļauju
 socketio = SocketIO(app, cors_allowed_origins="*")
 
+@app.before_request
+def start_request_context():
+    """Piešķir pieprasījumam ID (X-Request-ID vai jaunu), ko satur visi tā žurnāla ieraksti"""
+    g.request_id = new_request_id(request.headers.get("X-Request-ID"))
+    g.request_id_token = request_id_var.set(g.request_id)
+
+@app.after_request
+def add_request_id_header(response):
+    """Atgriež pieprasījuma ID klientam"""
+    response.headers["X-Request-ID"] = g.request_id
+    return response
+
+@app.teardown_request
+def end_request_context(error=None):
+    """Atjauno pieprasījuma ID pēc pieprasījuma (arī pēc SSE plūsmas beigām)"""
+    token = g.pop("request_id_token", None)
+    if token is not None:
+        request_id_var.reset(token)
+
 @app.route('/')
 def index():
     """Galvenā lapa - attēlo čata interfeisu"""
@@ -44,9 +67,10 @@ def chat():
     JSON ievade:
         message (str): Lietotāja ziņojums
         user_id (str, optional): Lietotāja identifikators
+        stream (bool, optional): Atgriezt atbildi pa daļām (text/event-stream)
     
     Returns:
-        JSON: Čatbota atbilde
+        JSON: Čatbota atbilde (vai SSE plūsma, ja pieprasīta)
     """
     data = request.get_json()
     if not data or "message" not in data:
@@ -55,9 +79,36 @@ def chat():
     user_id = data.get("user_id", "default_user")
     logger.info(f"REST API pieprasījums no {user_id}: {data['message'][:50]}...")
     
-    response = chatbot_service.process_message(data["message"], user_id)
+    # Atbilde pa daļām kā Server-Sent Events, ja klients to pieprasa
+    if data.get("stream") or "text/event-stream" in request.headers.get("Accept", ""):
+        return Response(stream_with_context(_sse_events(data["message"], user_id)),
+                        mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    
+    # Daļa pieprasījumu tiek profilēta (sk. profiling)
+    with request_profiler.profile(data["message"], entry="chat"):
+        response = chatbot_service.process_message(data["message"], user_id)
     return jsonify({"response": response})
 
+def _sse_events(message, user_id):
+    """
+    Ģenerē SSE notikumus no čatbota atbildes daļām
+    
+    Args:
+        message (str): Lietotāja ziņojums
+        user_id (str): Lietotāja identifikators
+        
+    Yields:
+        str: SSE notikums ("data: ..." katrai daļai, "event: done" beigās)
+    """
+    # Profilā ir arī notikumu nosūtīšana (ģenerators darbojas pieprasījuma pavedienā)
+    with request_profiler.profile(message, entry="chat_stream"):
+        response_parts = []
+        for chunk in chatbot_service.stream_message(message, user_id):
+            response_parts.append(chunk)
+            yield f"data: {json.dumps({'chunk': chunk}, ensure_ascii=False)}\n\n"
+        yield f"event: done\ndata: {json.dumps({'response': ''.join(response_parts)}, ensure_ascii=False)}\n\n"
+
 @socketio.on('connect')
 def handle_connect():
     """Apstrādā jaunu WebSocket savienojumu"""
@@ -74,26 +125,43 @@ def handle_message(msg):
     Apstrādā WebSocket ziņojumus
     
     Args:
-        msg (dict/str): Vai nu ziņojuma objekts ar 'message' un 'user_id',
+        msg (dict/str): Vai nu ziņojuma objekts ar 'message', 'user_id' un pēc izvēles 'stream',
                        vai arī vienkāršs teksta ziņojums
     """
-    try:
-        # Ja ziņojums ir JSON objekts ar user_id
-        if isinstance(msg, dict) and "message" in msg and "user_id" in msg:
-            user_id = msg["user_id"]
-            message = msg["message"]
-        else:
-            # Ja ziņojums ir vienkāršs teksts
-            user_id = request.sid  # Izmanto sesijas ID kā lietotāja ID
-            message = msg
-        
-        logger.info(f"WebSocket ziņojums no {user_id}: {message[:50]}...")
-        response = chatbot_service.process_message(message, user_id)
-        socketio.emit('response', {"response": response}, room=request.sid)
-    except Exception as e:
-        logger.error(f"Kļūda apstrādājot ziņojumu: {e}", exc_info=True)
-        error_msg = "Diemžēl radās kļūda apstrādājot jūsu ziņojumu. Lūdzu, mēģiniet vēlāk."
-        socketio.emit('error', {"error": error_msg}, room=request.sid)
+    with request_context():
+        try:
+            # Ja ziņojums ir JSON objekts ar user_id
+            if isinstance(msg, dict) and "message" in msg and "user_id" in msg:
+                user_id = msg["user_id"]
+                message = msg["message"]
+                stream = msg.get("stream", Config.STREAM_RESPONSES)
+            else:
+                # Ja ziņojums ir vienkāršs teksts
+                user_id = request.sid  # Izmanto sesijas ID kā lietotāja ID
+                message = msg
+                stream = Config.STREAM_RESPONSES
+            
+            logger.info(f"WebSocket ziņojums no {user_id}: {message[:50]}...")
+            
+            # Daļa pieprasījumu tiek profilēta (sk. profiling)
+            with request_profiler.profile(message, entry="socketio"):
+                if stream:
+                    # Sūtam atbildi pa daļām, tiklīdz tās pienāk no API
+                    response_parts = []
+                    for chunk in chatbot_service.stream_message(message, user_id):
+                        response_parts.append(chunk)
+                        with STAGE_SECONDS.time(stage="emit"):
+                            socketio.emit('response_chunk', {"chunk": chunk}, room=request.sid)
+                    with STAGE_SECONDS.time(stage="emit"):
+                        socketio.emit('response_done', {"response": "".join(response_parts)}, room=request.sid)
+                else:
+                    response = chatbot_service.process_message(message, user_id)
+                    with STAGE_SECONDS.time(stage="emit"):
+                        socketio.emit('response', {"response": response}, room=request.sid)
+        except Exception as e:
+            logger.error(f"Kļūda apstrādājot ziņojumu: {e}", exc_info=True)
+            error_msg = "Diemžēl radās kļūda apstrādājot jūsu ziņojumu. Lūdzu, mēģiniet vēlāk."
+            socketio.emit('error', {"error": error_msg}, room=request.sid)
 
 @app.route('/health')
 def health_check():
@@ -109,6 +177,18 @@ def health_check():
         "env": os.environ.get('ENV', 'production')
     }), 200
 
+@app.route('/metrics')
+def metrics():
+    """
+    Veiktspējas metriku galapunkts (Prometheus teksta formāts)
+
+    Returns:
+        Response: Metrikas vai 404, ja METRICS_ENABLED ir izslēgts
+    """
+    if not registry.enabled:
+        return jsonify({"error": "Metrikas ir izslēgtas"}), 404
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
 @app.route('/reset', methods=['POST'])
 def reset_conversation():
     """
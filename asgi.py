@@ -0,0 +1,178 @@
+# asgi.py
+"""
+ASGI ieejas punkts asinhronajam čatbota režīmam.
+/chat un Socket.IO ziņojumi tiek apstrādāti asyncio notikumu ciklā ar AsyncChatbotService,
+pārējie Flask maršruti (galvenā lapa, /health, /reset, /metrics, statiskie faili) - caur WSGI adapteri.
+
+Palaišana: uvicorn asgi:app --host 0.0.0.0 --port $PORT
+"""
+import json
+import logging
+import socketio
+from asgiref.wsgi import WsgiToAsgi
+
+from config import Config
+from app import app as flask_app
+from async_chatbot import async_chatbot_service
+from metrics import STAGE_SECONDS
+from logging_setup import request_context, request_id_var
+from profiling import request_profiler
+
+logger = logging.getLogger(__name__)
+
+# Asinhronais Socket.IO serveris ar CORS atļauju
+sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
+
+# Flask lietotne pārējiem maršrutiem
+wsgi_app = WsgiToAsgi(flask_app)
+
+@sio.event
+async def connect(sid, environ):
+    """Apstrādā jaunu WebSocket savienojumu"""
+    logger.info(f"Jauns klienta savienojums: {sid}")
+
+@sio.event
+async def disconnect(sid):
+    """Apstrādā WebSocket savienojuma pārtraukšanu"""
+    logger.info(f"Klients atvienojies: {sid}")
+
+@sio.on('message')
+async def handle_message(sid, msg):
+    """
+    Apstrādā WebSocket ziņojumus (tāpat kā app.handle_message, bet bez pavedienu bloķēšanas)
+
+    Args:
+        sid (str): Socket.IO sesijas ID
+        msg (dict/str): Ziņojuma objekts ar 'message', 'user_id' un pēc izvēles 'stream',
+                       vai arī vienkāršs teksta ziņojums
+    """
+    with request_context():
+        try:
+            if isinstance(msg, dict) and "message" in msg and "user_id" in msg:
+                user_id = msg["user_id"]
+                message = msg["message"]
+                stream = msg.get("stream", Config.STREAM_RESPONSES)
+            else:
+                user_id = sid
+                message = msg
+                stream = Config.STREAM_RESPONSES
+
+            logger.info(f"WebSocket ziņojums no {user_id}: {message[:50]}...")
+
+            # Daļa pieprasījumu tiek profilēta: izpildes laiks visam pieprasījumam, cProfile -
+            # tikai darbam pavedienu pūlā (notikumu ciklā darbojas arī citi pieprasījumi)
+            with request_profiler.profile_async(message, entry="asgi_socketio"):
+                if stream:
+                    response_parts = []
+                    async for chunk in async_chatbot_service.stream_message(message, user_id):
+                        response_parts.append(chunk)
+                        with STAGE_SECONDS.time(stage="emit"):
+                            await sio.emit('response_chunk', {"chunk": chunk}, room=sid)
+                    with STAGE_SECONDS.time(stage="emit"):
+                        await sio.emit('response_done', {"response": "".join(response_parts)}, room=sid)
+                else:
+                    response = await async_chatbot_service.process_message(message, user_id)
+                    with STAGE_SECONDS.time(stage="emit"):
+                        await sio.emit('response', {"response": response}, room=sid)
+        except Exception as e:
+            logger.error(f"Kļūda apstrādājot ziņojumu: {e}", exc_info=True)
+            error_msg = "Diemžēl radās kļūda apstrādājot jūsu ziņojumu. Lūdzu, mēģiniet vēlāk."
+            await sio.emit('error', {"error": error_msg}, room=sid)
+
+async def _read_body(receive):
+    """
+    Nolasa visu HTTP pieprasījuma ķermeni
+
+    Args:
+        receive: ASGI receive funkcija
+
+    Returns:
+        bytes: Pieprasījuma ķermenis
+    """
+    body = b""
+    while True:
+        event = await receive()
+        body += event.get("body", b"")
+        if not event.get("more_body"):
+            return body
+
+async def _send_json(send, status, data):
+    """
+    Nosūta JSON atbildi
+
+    Args:
+        send: ASGI send funkcija
+        status (int): HTTP statusa kods
+        data (dict): Atbildes saturs
+    """
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode()),
+                            (b"x-request-id", request_id_var.get().encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+async def chat(scope, receive, send):
+    """
+    REST API galapunkts čata ziņojumu apstrādei (asinhronā versija app.chat)
+
+    JSON ievade:
+        message (str): Lietotāja ziņojums
+        user_id (str, optional): Lietotāja identifikators
+        stream (bool, optional): Atgriezt atbildi pa daļām (text/event-stream)
+    """
+    try:
+        data = json.loads(await _read_body(receive) or b"null")
+    except ValueError:
+        data = None
+    if not isinstance(data, dict) or "message" not in data:
+        await _send_json(send, 400, {"error": "Trūkst 'message' lauka pieprasījumā"})
+        return
+
+    user_id = data.get("user_id", "default_user")
+    logger.info(f"REST API pieprasījums no {user_id}: {data['message'][:50]}...")
+
+    # Daļa pieprasījumu tiek profilēta (sk. handle_message)
+    with request_profiler.profile_async(data["message"], entry="asgi_chat"):
+        headers = dict(scope.get("headers", []))
+        if data.get("stream") or b"text/event-stream" in headers.get(b"accept", b""):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"text/event-stream; charset=utf-8"),
+                                    (b"cache-control", b"no-cache"),
+                                    (b"x-accel-buffering", b"no"),
+                                    (b"x-request-id", request_id_var.get().encode())]})
+            response_parts = []
+            async for chunk in async_chatbot_service.stream_message(data["message"], user_id):
+                response_parts.append(chunk)
+                event = f"data: {json.dumps({'chunk': chunk}, ensure_ascii=False)}\n\n"
+                await send({"type": "http.response.body", "body": event.encode("utf-8"), "more_body": True})
+            event = f"event: done\ndata: {json.dumps({'response': ''.join(response_parts)}, ensure_ascii=False)}\n\n"
+            await send({"type": "http.response.body", "body": event.encode("utf-8")})
+            return
+
+        response = await async_chatbot_service.process_message(data["message"], user_id)
+        await _send_json(send, 200, {"response": response})
+
+async def rest_app(scope, receive, send):
+    """
+    ASGI lietotne: POST /chat apstrādā asinhroni, pārējo nodod Flask lietotnei
+
+    Args:
+        scope (dict): ASGI pieprasījuma apraksts
+        receive: ASGI receive funkcija
+        send: ASGI send funkcija
+    """
+    if scope["type"] == "http" and scope["path"] == "/chat" and scope["method"] == "POST":
+        headers = dict(scope.get("headers", []))
+        with request_context(headers.get(b"x-request-id", b"").decode("latin-1")):
+            await chat(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
+
+async def shutdown():
+    """Aizver API savienojumu pūlu, apturot serveri"""
+    await async_chatbot_service.http_client.aclose()
+    async_chatbot_service.search_executor.shutdown(wait=False)
+
+# Socket.IO savienojumi uz /socket.io, viss pārējais - rest_app
+app = socketio.ASGIApp(sio, other_asgi_app=rest_app, on_shutdown=shutdown)
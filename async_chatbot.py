@@ -0,0 +1,253 @@
+# async_chatbot.py
+"""
+Asinhronā (asyncio) čatbota servisa modulis.
+API pieprasījumi notiek ar asinhrono HTTP klientu, bet meklēšana un sinhronās sarunu glabātuves
+(Redis) un atbilžu kešatmiņas (SQLite) operācijas - atsevišķā pavedienu pūlā, lai viens darba
+process varētu vienlaikus gaidīt simtiem GPT API atbilžu.
+"""
+import time
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from config import Config, GENERIC_ANSWER
+from conversation import ChatbotService, chatbot_service, conversation_manager
+from http_client import AsyncCompletionsClient
+from metrics import registry, UPSTREAM_SECONDS
+from profiling import request_profiler
+
+logger = logging.getLogger(__name__)
+
+class AsyncChatbotService(ChatbotService):
+    """Čatbota serviss asyncio notikumu ciklam; sarunu un kešatmiņas loģika kopīga ar ChatbotService"""
+
+    def __init__(self, conversation_manager, search_workers=Config.ASYNC_SEARCH_WORKERS, answer_cache=None):
+        """
+        Inicializē asinhrono čatbota servisu
+
+        Args:
+            conversation_manager: Sarunu pārvaldītāja instance
+            search_workers (int): Pavedienu skaits meklēšanai un glabātuves operācijām (CPU darbs un
+                                  bloķējoša ievade/izvade netiek veikta notikumu ciklā)
+            answer_cache (optional): Koplietojama atbilžu kešatmiņa (sk. ChatbotService)
+        """
+        super().__init__(conversation_manager, answer_cache)
+        self.http_client = AsyncCompletionsClient()
+        self.search_executor = ThreadPoolExecutor(max_workers=search_workers, thread_name_prefix="search")
+
+    async def process_message(self, text, user_id="default_user"):
+        """
+        Apstrādā lietotāja ziņojumu un atgriež čatbota atbildi
+
+        Args:
+            text (str): Lietotāja ziņojums
+            user_id (str): Lietotāja identifikators
+
+        Returns:
+            str: Čatbota atbilde
+        """
+        query = self._route(text)
+        if query.is_generic:
+            logger.info(f"Saņemts vispārīgs jautājums: {text}")
+            return GENERIC_ANSWER
+
+        cache_key, cached_response = await self._prepare_turn_async(query, user_id)
+        if cached_response:
+            await self._run_blocking(self.conversation_manager.add_message, user_id, "assistant", cached_response)
+            return cached_response
+
+        response, success = await self._get_gpt_response(user_id)
+        await self._run_blocking(self._finish_turn, user_id, cache_key, response, success)
+
+        return response
+
+    async def stream_message(self, text, user_id="default_user"):
+        """
+        Apstrādā lietotāja ziņojumu un atgriež atbildi pa daļām, tiklīdz tās pienāk no API
+
+        Args:
+            text (str): Lietotāja ziņojums
+            user_id (str): Lietotāja identifikators
+
+        Yields:
+            str: Nākamā atbildes daļa
+        """
+        query = self._route(text)
+        if query.is_generic:
+            logger.info(f"Saņemts vispārīgs jautājums: {text}")
+            yield GENERIC_ANSWER
+            return
+
+        cache_key, cached_response = await self._prepare_turn_async(query, user_id)
+        if cached_response:
+            await self._run_blocking(self.conversation_manager.add_message, user_id, "assistant", cached_response)
+            yield cached_response
+            return
+
+        # Asinhronais ģenerators nevar atgriezt vērtību, tāpēc rezultātu saņemam caur sarakstu
+        response_parts = []
+        outcome = [False]
+        stream = self._stream_gpt_response(user_id, outcome)
+        try:
+            async for part in stream:
+                response_parts.append(part)
+                yield part
+        except BaseException:
+            # Klients pārtrauca straumi (atvienošanās - GeneratorExit, atcelšana - CancelledError):
+            # saņemto daļu saglabājam vēsturē fonā, negaidot (atceltā uzdevumā gaidīšana var tikt pārtraukta)
+            finished = self._submit_blocking(self._finish_turn, user_id, cache_key, "".join(response_parts), False)
+            finished.add_done_callback(_log_background_error)
+            raise
+        finally:
+            # Atbrīvojam API savienojumu arī tad, ja straume netika nolasīta līdz galam
+            await stream.aclose()
+
+        await self._run_blocking(self._finish_turn, user_id, cache_key, "".join(response_parts), outcome[0])
+
+    async def _prepare_turn_async(self, query, user_id):
+        """
+        Izpilda meklēšanu un konteksta pievienošanu sarunai (glabātuve, atbilžu kešatmiņa) pavedienu pūlā
+
+        Args:
+            query (RoutedQuery): Klasificēts lietotāja ziņojums
+            user_id (str): Lietotāja identifikators
+
+        Returns:
+            tuple: (atbilžu kešatmiņas atslēga vai None, kešatmiņā atrastā atbilde vai None)
+        """
+        return await self._run_blocking(self._search_and_prepare_turn, query, user_id)
+
+    def _search_and_prepare_turn(self, query, user_id):
+        """Meklēšana un _prepare_turn vienā pavedienu pūla uzdevumā"""
+        context = self.query_processor.process_query(query)
+        return self._prepare_turn(query.text, user_id, context)
+
+    async def _run_blocking(self, function, *args):
+        """
+        Izpilda sinhronu funkciju pavedienu pūlā
+
+        Args:
+            function (callable): Funkcija (meklēšana, sarunu glabātuves vai kešatmiņas operācija)
+            *args: Funkcijas argumenti
+
+        Returns:
+            Funkcijas rezultāts
+        """
+        return await self._submit_blocking(function, *args)
+
+    def _submit_blocking(self, function, *args):
+        """
+        Nodod sinhronu funkciju pavedienu pūlam, negaidot tās izpildi
+
+        Args:
+            function (callable): Funkcija
+            *args: Funkcijas argumenti
+
+        Returns:
+            asyncio.Future: Funkcijas rezultāts
+        """
+        loop = asyncio.get_running_loop()
+        # Konteksta kopija nodod pavedienam pieprasījuma ID un profilu (run_in_executor to nedara)
+        return loop.run_in_executor(self.search_executor, contextvars.copy_context().run,
+                                    request_profiler.call, function, *args)
+
+    def _exception_message(self, error):
+        """
+        Sagatavo lietotājam saprotamu kļūdas ziņojumu no httpx izņēmuma
+
+        Args:
+            error (Exception): Pieprasījuma laikā radusies kļūda
+
+        Returns:
+            str: Kļūdas ziņojums
+        """
+        if isinstance(error, httpx.TimeoutException):
+            logger.error("API pieprasījuma timeout")
+            return "Pieprasījuma laiks beidzās. Lūdzu, mēģiniet vēlāk."
+        if isinstance(error, httpx.HTTPError):
+            logger.error(f"Savienojuma kļūda: {error}", exc_info=True)
+            return "Radās kļūda savienojoties ar asistentu. Lūdzu, pārbaudiet interneta savienojumu un mēģiniet vēlāk."
+        return super()._exception_message(error)
+
+    async def _get_gpt_response(self, user_id):
+        """
+        Iegūst atbildi no GPT API
+
+        Args:
+            user_id (str): Lietotāja identifikators
+
+        Returns:
+            tuple: (GPT API atbilde vai kļūdas ziņojums, True ja atbilde saņemta veiksmīgi)
+        """
+        try:
+            payload = await self._run_blocking(self._build_payload, user_id)
+            with UPSTREAM_SECONDS.time(client=self.http_client.name, phase="total"):
+                response = await self.http_client.post(payload)
+
+            if response.status_code != 200:
+                return self._api_error_message(response), False
+
+            assistant_response = response.json().get("choices", [{}])[0].get("message", {}).get("content", "")
+
+            if assistant_response:
+                return assistant_response, True
+            else:
+                logger.warning("Tukša atbilde no API")
+                return "Neizdevās saņemt atbildi. Lūdzu, mēģiniet vēlāk.", False
+
+        except Exception as e:
+            return self._exception_message(e), False
+
+    async def _stream_gpt_response(self, user_id, outcome):
+        """
+        Iegūst atbildi no GPT API pa daļām (stream: true), apstrādājot SSE notikumus
+
+        Args:
+            user_id (str): Lietotāja identifikators
+            outcome (list): Viena elementa saraksts, kurā tiek ierakstīts True, ja atbilde saņemta veiksmīgi
+
+        Yields:
+            str: Nākamā atbildes daļa (vai kļūdas ziņojums)
+        """
+        response = None
+        received = False
+        started = time.perf_counter()
+        try:
+            payload = await self._run_blocking(self._build_payload, user_id, True)
+            response = await self.http_client.post(payload, stream=True)
+
+            if response.status_code != 200:
+                await response.aread()
+                yield self._api_error_message(response)
+                return
+
+            async for line in response.aiter_lines():
+                content = self._parse_stream_line(line)
+                if content:
+                    received = True
+                    yield content
+
+            if not received:
+                logger.warning("Tukša atbilde no API")
+                yield "Neizdevās saņemt atbildi. Lūdzu, mēģiniet vēlāk."
+            outcome[0] = received
+
+        except Exception as e:
+            yield self._exception_message(e)
+
+        finally:
+            # Atbrīvojam savienojumu atpakaļ pūlā
+            if response is not None:
+                await response.aclose()
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, client=self.http_client.name, phase="total")
+
+def _log_background_error(future):
+    """Reģistrē pavedienu pūla funkcijas kļūdu, ja tās rezultāts netika gaidīts"""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Fona operācijas kļūda: {future.exception()}")
+
+# Izveidojam asinhronā čatbota servisa instanci ar to pašu sarunu pārvaldītāju un atbilžu kešatmiņu
+# (metrikās reģistrētie kešatmiņas skaitītāji attiecas uz abiem servisiem)
+async_chatbot_service = AsyncChatbotService(conversation_manager, answer_cache=chatbot_service.answer_cache)
+async_chatbot_service.http_client.register_metrics(registry)
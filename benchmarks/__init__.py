@@ -0,0 +1,8 @@
+# benchmarks/__init__.py
+"""
+Veiktspējas mērījumu skripti. Palaišana no projekta saknes direktorijas, piem.:
+python -m benchmarks.conversation_stress
+
+Meklēšanas un sarunu plūsmas latentuma mērījumi (JSON ar p50/p95/p99) uz pavairota korpusa:
+python -m benchmarks.pipeline --scales 1 10 100 --output rezultats.json
+"""
@@ -0,0 +1,170 @@
+# benchmarks/conversation_store_check.py
+"""
+RedisConversationStore pārbaude bez Redis servera (ar fakeredis): vēstures apgriešana,
+konteksta aizvietošana, TTL atjaunošana, atiestatīšana un tas, ka ConversationManager ar
+Redis glabātuvi atgriež to pašu vēsturi, ko ar glabātuvi atmiņā. Beigās vairāki pavedieni
+vienlaicīgi pievieno ziņojumus vienai sarunai - vēsture nedrīkst pārsniegt ierobežojumu.
+
+Palaišana: python -m benchmarks.conversation_store_check
+"""
+import os
+import sys
+import threading
+
+os.environ.setdefault("GPT_API_KEY", "benchmark")
+
+try:
+    import fakeredis
+except ImportError:  # vajadzīgs tikai šai pārbaudei
+    fakeredis = None
+
+from conversation import ConversationManager
+from conversation_store import MemoryConversationStore, RedisConversationStore
+
+MAX_HISTORY = 4
+TTL = 60
+
+def expect(checks, name, actual, expected):
+    """
+    Salīdzina vērtības un pieraksta rezultātu
+
+    Args:
+        checks (list): Rezultātu saraksts [(nosaukums, vai izdevās, apraksts), ...]
+        name (str): Pārbaudes nosaukums
+        actual: Iegūtā vērtība
+        expected: Sagaidītā vērtība
+    """
+    checks.append((name, actual == expected, f"{actual!r}" if actual == expected else f"{actual!r} != {expected!r}"))
+
+def check_store(client):
+    """
+    Pārbauda glabātuves operācijas tieši
+
+    Args:
+        client: Redis klients (fakeredis)
+
+    Returns:
+        list: [(nosaukums, vai izdevās, apraksts), ...]
+    """
+    checks = []
+    store = RedisConversationStore(None, MAX_HISTORY, TTL, client=client)
+
+    expect(checks, "jauna saruna", store.append("a", [("user", "1")], context="K1"), 0)
+    expect(checks, "ziņojumu skaits pirms pievienošanas", store.append("a", [("assistant", "2")]), 1)
+    store.append("a", [("user", "3"), ("assistant", "4"), ("user", "5")])
+    messages, context = store.get("a")
+    expect(checks, "apgriešana līdz max_history_length", [content for _, content in messages], ["2", "3", "4", "5"])
+    expect(checks, "konteksts saglabāts", context, "K1")
+
+    store.append("a", [("user", "6")], context="K2")
+    expect(checks, "konteksts aizvietots", store.get("a")[1], "K2")
+    expect(checks, "bez ziņojumiem - tikai skaits", store.append("a", []), MAX_HISTORY)
+
+    # TTL tiek atjaunots katrā pievienošanā abām atslēgām
+    client.expire(store._key("a"), 5)
+    client.expire(store._context_key("a"), 5)
+    store.append("a", [("assistant", "7")])
+    expect(checks, "vēstures TTL atjaunots", 5 < client.ttl(store._key("a")) <= TTL, True)
+    expect(checks, "konteksta TTL atjaunots", 5 < client.ttl(store._context_key("a")) <= TTL, True)
+
+    expect(checks, "atiestatīšana", store.reset("a"), True)
+    expect(checks, "pēc atiestatīšanas tukša", store.get("a"), ([], None))
+    expect(checks, "atslēgas dzēstas", client.exists(store._key("a"), store._context_key("a")), 0)
+    expect(checks, "atkārtota atiestatīšana", store.reset("a"), False)
+    expect(checks, "pēc atiestatīšanas jauna saruna", store.append("a", [("user", "8")]), 0)
+
+    # Bez TTL atslēgas neizbeidzas
+    persistent = RedisConversationStore(None, MAX_HISTORY, 0, prefix="p:", context_prefix="pc:", client=client)
+    persistent.append("b", [("user", "1")], context="K")
+    expect(checks, "ttl=0 - bez derīguma termiņa", (client.ttl("p:b"), client.ttl("pc:b")), (-1, -1))
+    return checks
+
+def check_manager_parity(client):
+    """
+    Izpilda vienādu operāciju secību ar abām glabātuvēm un salīdzina ConversationManager vēsturi
+
+    Args:
+        client: Redis klients (fakeredis)
+
+    Returns:
+        list: [(nosaukums, vai izdevās, apraksts), ...]
+    """
+    checks = []
+    managers = {
+        "memory": ConversationManager(10, MAX_HISTORY, store=MemoryConversationStore(10, MAX_HISTORY)),
+        "redis": ConversationManager(10, MAX_HISTORY, store=RedisConversationStore(
+            None, MAX_HISTORY, TTL, prefix="m:", context_prefix="mc:", client=client))
+    }
+    steps = [
+        ("add", [("user", "Kur uzskaita degvielu?")], "Konteksts 1"),
+        ("add", [("assistant", "Kodā 04.510")], None),
+        ("add", [("user", "Un dīzeļdegvielu?")], "Konteksts 2"),
+        ("add", [("assistant", "Tāpat")], None),
+        ("add", [("user", "Paldies")], None),
+        ("reset", None, None),
+        ("add", [("user", "Jauns jautājums")], "Konteksts 3"),
+    ]
+    for number, (action, messages, context) in enumerate(steps):
+        results = {}
+        for name, manager in managers.items():
+            if action == "add":
+                manager.add_messages("u", messages, context)
+            else:
+                manager.reset_conversation("u")
+            results[name] = manager.get_conversation("u")
+        expect(checks, f"vēsture sakrīt pēc {number + 1}. soļa ({action})", results["redis"], results["memory"])
+    return checks
+
+def check_concurrent_trim(client, threads=8, appends=200):
+    """
+    Vairāki pavedieni vienlaicīgi pievieno ziņojumus vienai sarunai
+
+    Args:
+        client: Redis klients (fakeredis)
+        threads (int): Pavedienu skaits
+        appends (int): Pievienošanas reizes katrā pavedienā
+
+    Returns:
+        list: [(nosaukums, vai izdevās, apraksts), ...]
+    """
+    checks = []
+    store = RedisConversationStore(None, MAX_HISTORY, TTL, prefix="c:", context_prefix="cc:", client=client)
+    errors = []
+
+    def worker(seed):
+        try:
+            for i in range(appends):
+                store.append("shared", [("user", f"{seed}-{i}"), ("assistant", "ok")], context=str(seed))
+                if len(store.get("shared")[0]) > MAX_HISTORY:
+                    raise AssertionError("Vēsture pārāk gara")
+        except Exception as e:
+            errors.append(e)
+
+    pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    expect(checks, "vienlaicīga pievienošana bez kļūdām", [repr(e) for e in errors], [])
+    expect(checks, "vēstures garums pēc vienlaicīgas pievienošanas", client.llen("c:shared"), MAX_HISTORY)
+    return checks
+
+def main():
+    if fakeredis is None:
+        print("Pārbaudei nepieciešama fakeredis bibliotēka (pip install fakeredis)")
+        return 1
+
+    checks = []
+    for check in (check_store, check_manager_parity, check_concurrent_trim):
+        checks.extend(check(fakeredis.FakeRedis()))
+
+    failed = 0
+    for name, passed, description in checks:
+        failed += not passed
+        print(f"{'OK  ' if passed else 'FAIL'} {name}: {description}")
+    print(f"{len(checks) - failed}/{len(checks)} pārbaudes izdevās")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
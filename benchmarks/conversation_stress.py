@@ -0,0 +1,119 @@
+# benchmarks/conversation_stress.py
+"""
+ConversationManager slodzes tests: daudzi pavedieni vienlaicīgi pievieno, lasa un atiestata
+sarunas (ar biežu vecāko sarunu izmešanu), pēc tam tiek pārbaudīta glabātuves integritāte:
+katrs lietotājs tiek pievienots vismaz vienreiz, tāpēc beigās glabātuvē jābūt tieši
+min(lietotāji, max_users) sarunām (ietilpība ir kopēja visām daļām), un kopējai LRU secībai
+jāatbilst sarunām daļās. Salīdzina vienu kopīgu slēdzeni (stripes=1) ar sadalītām slēdzenēm.
+
+Palaišana: python -m benchmarks.conversation_stress [--threads 32] [--ops 20000] [--users 500 5000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+
+os.environ.setdefault("GPT_API_KEY", "benchmark")
+
+from conversation import ConversationManager
+from conversation_store import MemoryConversationStore
+
+def worker(manager, user_count, ops, seed, threads, errors, barrier):
+    """
+    Pievieno savu lietotāju daļu, tad veic nejaušas sarunu operācijas
+
+    Args:
+        manager (ConversationManager): Pārbaudāmā sarunu pārvalde
+        user_count (int): Lietotāju identifikatoru skaits, no kuriem izvēlēties
+        ops (int): Operāciju skaits
+        seed (int): Nejaušo skaitļu sēkla (arī pavediena numurs)
+        threads (int): Pavedienu skaits (katrs sākumā pievieno katru threads-to lietotāju)
+        errors (list): Saraksts, kurā tiek pievienoti izņēmumi
+        barrier (threading.Barrier): Visu pavedienu vienlaicīgam startam
+    """
+    rng = random.Random(seed)
+    barrier.wait()
+    try:
+        for user in range(seed, user_count, threads):
+            manager.add_messages(f"user-{user}", [("user", "Labdien")])
+        for _ in range(ops):
+            user_id = f"user-{rng.randrange(user_count)}"
+            action = rng.random()
+            if action < 0.6:
+                manager.add_messages(user_id, [("user", "Kur uzskaita degvielas izdevumus?"),
+                                               ("system", "Konteksts")])
+            elif action < 0.95:
+                history = manager.get_conversation(user_id)
+                if len(history) > manager.max_history_length + 1:
+                    raise AssertionError(f"Vēsture pārāk gara: {len(history)}")
+            else:
+                manager.reset_conversation(user_id)
+    except Exception as e:
+        errors.append(e)
+
+def run(stripes, threads, ops, users, max_users, max_history_length):
+    """
+    Palaiž vienu slodzes testu
+
+    Returns:
+        dict: Operācijas sekundē, kļūdu skaits un sarunu skaits beigās
+    """
+    store = MemoryConversationStore(max_users, max_history_length, stripes)
+    manager = ConversationManager(max_users, max_history_length, store=store)
+    errors = []
+    barrier = threading.Barrier(threads + 1)
+    pool = [threading.Thread(target=worker, args=(manager, users, ops, seed, threads, errors, barrier))
+            for seed in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    stored = sum(len(stripe.conversations) for stripe in store.stripes)
+    if len(store) != min(users, max_users) or stored != len(store):
+        errors.append(AssertionError(f"Sarunu skaits {len(store)} (daļās {stored}), "
+                                     f"sagaidīts {min(users, max_users)}"))
+    # Kopējā LRU secībā jābūt tieši tām pašām sarunām ar to pašu aktivitātes numuru
+    ordered = {user_id: conversation.touched for stripe in store.stripes
+               for user_id, conversation in stripe.conversations.items()}
+    if dict(store._recency) != ordered:
+        errors.append(AssertionError(f"LRU secība ({len(store._recency)}) neatbilst sarunām ({len(ordered)})"))
+    return {
+        "stripes": stripes,
+        "users": users,
+        "ops_per_second": round(threads * ops / elapsed),
+        "seconds": round(elapsed, 3),
+        "errors": len(errors),
+        "conversations": len(store),
+        "first_error": repr(errors[0]) if errors else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="ConversationManager slodzes tests")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--ops", type=int, default=20000, help="Operācijas katrā pavedienā")
+    parser.add_argument("--users", type=int, nargs="+", default=[500, 5000],
+                        help="Dažādu lietotāju skaits (katram tiek veikts atsevišķs tests)")
+    parser.add_argument("--max-users", type=int, default=1000, help="Glabātuves ietilpība (izmešana, ja mazāka par --users)")
+    parser.add_argument("--history", type=int, default=10)
+    parser.add_argument("--stripes", type=int, nargs="+", default=[1, 16, 64])
+    args = parser.parse_args()
+
+    # Bieža pavedienu pārslēgšana palielina sacensību par slēdzenēm
+    sys.setswitchinterval(1e-5)
+
+    failed = False
+    for users in args.users:
+        for stripes in args.stripes:
+            result = run(stripes, args.threads, args.ops, users, args.max_users, args.history)
+            failed = failed or result["errors"] > 0
+            print(result)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/corpus_scaler.py
+"""
+Sintētiska korpusa veidošana mērījumiem: pdf_chunks_part* mapju saturs tiek pavairots
+N reizes. Katra kopija ir atsevišķs avots (faila nosaukumā pievienots "__xK"), tāpēc
+fragmentu, terminu un biežumu sarakstu skaits aug proporcionāli, bet fragmentu struktūra
+paliek tāda pati kā īstajā korpusā.
+
+Palaišana: python -m benchmarks.corpus_scaler --factor 10 --output /tmp/corpus_x10
+"""
+import os
+import sys
+import shutil
+import argparse
+
+os.environ.setdefault("GPT_API_KEY", "benchmark")
+
+from config import Config, get_folder_path
+from passages import parse_chunk_name
+from search_index import list_corpus_files
+
+def scale_corpus(target, factor, folders=None):
+    """
+    Izveido pavairotu korpusu norādītajā direktorijā
+
+    Args:
+        target (str): Mērķa direktorija (tajā tiek izveidotas mapes ar tiem pašiem nosaukumiem)
+        factor (int): Cik reizes pavairot korpusu
+        folders (list, optional): Mapju nosaukumi; pēc noklusējuma visas meklēšanas mapes
+
+    Returns:
+        int: Izveidoto failu skaits
+    """
+    folders = folders or Config.PRIMARY_FOLDERS + Config.COFOG_FOLDERS
+    for folder in folders:
+        os.makedirs(os.path.join(target, folder), exist_ok=True)
+
+    created = 0
+    for folder, name in list_corpus_files(folders):
+        source_path = os.path.join(get_folder_path(folder), name)
+        source, number = parse_chunk_name(name)
+        for copy in range(factor):
+            copy_name = name if copy == 0 else f"{source}__x{copy}_chunk_{number}.txt"
+            _link_or_copy(source_path, os.path.join(target, folder, copy_name))
+            created += 1
+    return created
+
+def _link_or_copy(source, destination):
+    """Izveido cieto saiti (ja iespējams) vai faila kopiju; esošs fails tiek atstāts"""
+    if os.path.exists(destination):
+        return
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pavairota korpusa izveide mērījumiem")
+    parser.add_argument("--factor", type=int, required=True, help="Pavairošanas reizes (piem. 10 vai 100)")
+    parser.add_argument("--output", required=True, help="Mērķa direktorija")
+    args = parser.parse_args()
+
+    created = scale_corpus(os.path.abspath(args.output), args.factor)
+    print({"factor": args.factor, "files": created, "output": os.path.abspath(args.output)})
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+# benchmarks/pipeline.py
+"""
+Meklēšanas un sarunu plūsmas veiktspējas mērījumi ar fiksētu jautājumu kopu (benchmarks.questions)
+uz īstā un pavairotā korpusa (benchmarks.corpus_scaler). GPT API vietā tiek palaists lokāls
+aizstājējs (benchmarks.stub_server), tāpēc ChatbotService.process_message mēra visu lietotnes
+plūsmu bez tīkla aiztures.
+
+Mērījumi katram korpusa izmēram:
+    search             - SearchEngine.search (bez rezultātu kešatmiņas)
+    score.<novērtētājs> - Scorer.score primārajās mapēs (legacy ietver _calculate_relevance)
+    add_message        - ConversationManager.add_message (--users dažādi lietotāji)
+    process_message    - ChatbotService.process_message no jautājuma līdz atbildei
+
+Rezultāts ir JSON ar p50/p95/p99 (ms) un caurlaidspēju (operācijas sekundē). Ar --baseline
+tiek salīdzināts ar iepriekšējo rezultātu failu; ja kāda mērījuma p95 pieaudzis vairāk par
+--tolerance, izejas kods ir 1.
+
+Palaišana: python -m benchmarks.pipeline [--scales 1 10 100] [--repeat 3] [--output rezultats.json]
+                                         [--baseline iepriekšējais.json] [--tolerance 0.25]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+
+from benchmarks.stub_server import StubCompletionsServer
+
+def percentile(sorted_values, fraction):
+    """
+    Procentile pēc tuvākā ranga metodes
+
+    Args:
+        sorted_values (list): Sakārtotas vērtības
+        fraction (float): Daļa (piem. 0.95)
+
+    Returns:
+        float: Vērtība
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * fraction // 1))
+    return sorted_values[int(rank) - 1]
+
+def summarize(latencies):
+    """
+    Apkopo izpildes laikus
+
+    Args:
+        latencies (list): Izpildes laiki sekundēs
+
+    Returns:
+        dict: Skaits, p50/p95/p99/vidējais (ms) un operācijas sekundē
+    """
+    values = sorted(latencies)
+    total = sum(values)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "mean_ms": round(total / len(values) * 1000, 3) if values else 0.0,
+        "ops_per_second": round(len(values) / total, 1) if total else 0.0
+    }
+
+def measure(operations):
+    """
+    Izpilda operācijas pa vienai un mēra katras izpildes laiku
+
+    Args:
+        operations (iterable): Funkcijas bez argumentiem
+
+    Returns:
+        dict: summarize rezultāts
+    """
+    latencies = []
+    for operation in operations:
+        started = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+def run_scale(root, scale, repeat, users):
+    """
+    Veic visus mērījumus vienam korpusa izmēram
+
+    Args:
+        root (str): Direktorija ar pdf_chunks_part* mapēm (tajā tiek saglabāts arī indekss)
+        scale (int): Korpusa pavairojums (tikai rezultātam)
+        repeat (int): Cik reizes atkārtot jautājumu kopu
+        users (int): Dažādo lietotāju skaits sarunu mērījumos
+
+    Returns:
+        dict: Korpusa apraksts un mērījumu rezultāti
+    """
+    from search import SearchEngine
+    from ranking import SCORERS, create_scorer
+    from conversation import ConversationManager, ChatbotService
+    from benchmarks.questions import question_texts
+
+    questions = question_texts()
+    workload = [question for _ in range(repeat) for question in questions]
+
+    # Indekss tiek ielādēts vai izveidots korpusa direktorijā
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        started = time.perf_counter()
+        engine = SearchEngine()
+        index_seconds = time.perf_counter() - started
+    finally:
+        os.chdir(cwd)
+    index = engine.index
+
+    def search(question):
+        engine.result_cache.clear()
+        return engine.search(question)
+
+    results = {"search": measure(lambda question=question: search(question) for question in workload)}
+
+    for name in SCORERS:
+        scorer = create_scorer(index, name)
+        queries = [(engine._preprocess_query(question), question) for question in workload]
+        results[f"score.{name}"] = measure(
+            lambda words=words, question=question: [scorer.score(folder, words, question)
+                                                    for folder in engine.primary_folders]
+            for words, question in queries
+        )
+
+    manager = ConversationManager()
+    results["add_message"] = measure(
+        lambda i=i, question=question: manager.add_message(f"user-{i % users}", "user", question)
+        for i, question in enumerate(workload * 10)
+    )
+
+    service = ChatbotService(ConversationManager())
+    service.query_processor.search_engine = engine
+
+    def process_message(i, question):
+        engine.result_cache.clear()
+        return service.process_message(question, f"user-{i % users}")
+
+    results["process_message"] = measure(
+        lambda i=i, question=question: process_message(i, question) for i, question in enumerate(workload)
+    )
+
+    engine.watcher.stop()
+    return {
+        "scale": scale,
+        "passages": len(index.documents),
+        "index_seconds": round(index_seconds, 3),
+        "benchmarks": results
+    }
+
+def compare(report, baseline, tolerance):
+    """
+    Atrod mērījumus, kuru p95 pieaudzis salīdzinājumā ar bāzes rezultātu
+
+    Args:
+        report (dict): Pašreizējie rezultāti
+        baseline (dict): Bāzes rezultāti (tas pats formāts)
+        tolerance (float): Pieļaujamais relatīvais pieaugums (0.25 = 25%)
+
+    Returns:
+        list: [{"scale", "benchmark", "baseline_p95_ms", "p95_ms"}, ...]
+    """
+    previous = {(run["scale"], name): stats["p95_ms"]
+                for run in baseline.get("runs", []) for name, stats in run["benchmarks"].items()}
+    regressions = []
+    for run in report["runs"]:
+        for name, stats in run["benchmarks"].items():
+            baseline_p95 = previous.get((run["scale"], name))
+            if baseline_p95 and stats["p95_ms"] > baseline_p95 * (1 + tolerance):
+                regressions.append({"scale": run["scale"], "benchmark": name,
+                                    "baseline_p95_ms": baseline_p95, "p95_ms": stats["p95_ms"]})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Meklēšanas un sarunu plūsmas veiktspējas mērījumi")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="Korpusa pavairojumi (piem. 1 10 100)")
+    parser.add_argument("--repeat", type=int, default=3, help="Jautājumu kopas atkārtojumi")
+    parser.add_argument("--users", type=int, default=1000, help="Dažādo lietotāju skaits")
+    parser.add_argument("--latency", type=float, default=0.0, help="GPT API aizstājēja atbildes aizture sekundēs")
+    parser.add_argument("--corpus-dir", help="Direktorija pavairotajiem korpusiem (pēc noklusējuma pagaidu, tiek dzēsta)")
+    parser.add_argument("--output", help="JSON rezultātu fails (pēc noklusējuma izvada konsolē)")
+    parser.add_argument("--baseline", help="Iepriekšējais rezultātu fails salīdzinājumam")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Pieļaujamais p95 pieaugums")
+    args = parser.parse_args()
+
+    # Aizstājējs jāpalaiž pirms lietotnes moduļu importēšanas - HTTP klients adresi nolasa no Config
+    stub = StubCompletionsServer(latency=args.latency).start()
+    os.environ["GPT_API_URL"] = stub.url
+    os.environ.setdefault("GPT_API_KEY", "benchmark")
+    os.environ.setdefault("CORPUS_CHECK_INTERVAL", "0")
+    os.environ.setdefault("ANSWER_CACHE_ENABLED", "False")
+
+    import logging
+    from config import Config
+    from benchmarks.corpus_scaler import scale_corpus
+
+    # Katra vaicājuma INFO ieraksti mērītu žurnāla rakstīšanu, nevis meklēšanu
+    logging.getLogger().setLevel(logging.WARNING)
+
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix="benchmark_corpus_")
+    runs = []
+    try:
+        for scale in args.scales:
+            if scale == 1:
+                root = os.getcwd()
+            else:
+                root = os.path.join(corpus_dir, f"x{scale}")
+                scale_corpus(root, scale)
+            runs.append(run_scale(root, scale, args.repeat, args.users))
+            print(f"Korpuss x{scale}: {runs[-1]['passages']} fragmenti", file=sys.stderr)
+    finally:
+        stub.stop()
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "ranking_engine": Config.RANKING_ENGINE,
+        "repeat": args.repeat,
+        "users": args.users,
+        "stub_latency": args.latency,
+        "stub_requests": stub.requests,
+        "runs": runs
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+        exit_code = 1 if report["regressions"] else 0
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# benchmarks/query_routing.py
+"""
+Ziņojumu maršrutēšanas mikrotests: iepriekšējā apstrāde (is_generic_question divreiz,
+COFOG atslēgvārdu pārbaude un kodu meklēšana meklēšanā un konteksta veidošanā) pret vienu
+route_query izsaukumu. Pārbauda, ka abas metodes klasificē ziņojumus vienādi.
+
+Palaišana: python -m benchmarks.query_routing [--repeat 2000]
+"""
+import os
+import sys
+import time
+import argparse
+
+os.environ.setdefault("GPT_API_KEY", "benchmark")
+
+from search_index import extract_codes
+from query_router import route_query
+from benchmarks.questions import QUESTIONS
+
+MESSAGES = [question for question, _ in QUESTIONS] + [
+    "Sveiki!",
+    "Kas tu esi?",
+    "Ko tu zini par budžetu?",
+    "Kā tu vari palīdzēt ar klasifikāciju?",
+    "Kādas ir tavas iespējas?",
+    "Kāds kods?",
+    "09.620",
+    "Ko nozīmē kods 09.620?",
+    "Kā kodu 04.500 salīdzināt ar COFOG?",
+    "Kāds ir COFOG kods izglītojamo ēdināšanai?",
+    "Salīdzini 10.400 ar starptautisko standartu",
+    "Kurā funkciju kategorijā ir sports?",
+    "What is the COFOG code for hospital services?",
+]
+
+def legacy_is_generic_question(text):
+    """Iepriekšējā is_generic_question realizācija (atslēgvārdu saraksts katrā izsaukumā)"""
+    generic_keywords = [
+        "kas tu esi", "ko tu zini", "ko tu dari", "kā tu vari palīdzēt",
+        "kam tu esi", "ko tu", "kas tu", "ko vari", "kā vari",
+        "palīdzi man", "kāda tev", "kādas ir", "ko māki", "ko maki"
+    ]
+    text_lower = text.lower()
+    is_short_without_specifics = (
+        len(text) < 30 and
+        not any(char.isdigit() for char in text) and
+        "kods" not in text_lower and
+        "kodu" not in text_lower
+    )
+    contains_generic_keyword = any(keyword in text_lower for keyword in generic_keywords)
+    return is_short_without_specifics or contains_generic_keyword
+
+def legacy_is_cofog_related(query):
+    """Iepriekšējā SearchEngine._is_cofog_related realizācija"""
+    cofog_keywords = [
+        "cofog", "salīdzin", "salīdzināj", "salīdzināt",
+        "starptautisk", "klasifik", "standart", "funkciju", "kods"
+    ]
+    query_lower = query.lower()
+    return any(word in query_lower for word in cofog_keywords)
+
+def legacy_pipeline(text):
+    """Klasifikācija, kā to iepriekš veica visi posmi kopā (ChatbotService, QueryProcessor, SearchEngine, ContextBuilder)"""
+    if legacy_is_generic_question(text):
+        return True, None, None
+    legacy_is_generic_question(text)
+    is_cofog = legacy_is_cofog_related(text)
+    codes = tuple(extract_codes(text.lower()))
+    extract_codes(text.lower())
+    return False, is_cofog, codes
+
+def routed_pipeline(text):
+    """Klasifikācija ar vienu route_query izsaukumu"""
+    query = route_query(text)
+    if query.is_generic:
+        return True, None, None
+    return False, query.is_cofog_comparison, query.codes
+
+def timed(function, repeat):
+    """Klasificē visus ziņojumus atkārtoti un atgriež vidējo laiku vienam ziņojumam (µs)"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for message in MESSAGES:
+            function(message)
+    return (time.perf_counter() - started) / (repeat * len(MESSAGES)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Ziņojumu maršrutēšanas mikrotests")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    mismatches = [message for message in MESSAGES if legacy_pipeline(message) != routed_pipeline(message)]
+    routes = {}
+    for message in MESSAGES:
+        route = route_query(message).route
+        routes[route] = routes.get(route, 0) + 1
+
+    print({
+        "messages": len(MESSAGES),
+        "routes": routes,
+        "legacy_us_per_message": round(timed(legacy_pipeline, args.repeat), 2),
+        "routed_us_per_message": round(timed(routed_pipeline, args.repeat), 2),
+        "mismatches": mismatches
+    })
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+# benchmarks/questions.py
+"""
+Fiksēts reprezentatīvu jautājumu kopums mērījumiem: jautājumi par MK noteikumu Nr. 934 kodiem
+(ar sagaidāmo kodu atsaukuma testam) un COFOG salīdzinājuma jautājumi.
+"""
+
+# (jautājums, sagaidāmais kods). Vārdi ir citos locījumos nekā noteikumu tekstā, daži bez
+# garumzīmēm un daži ar drukas kļūdām
+QUESTIONS = [
+    ("Kur uzskaita izdevumus par izglītojamo ēdināšanu?", "09.620"),
+    ("Kur uzskaitīt izglītojamo pārvadājumus?", "09.610"),
+    ("izdevumi par izglītojamo izmitināšanu", "09.630"),
+    ("Kur uzskaitīt bibliotēku izdevumus?", "08.210"),
+    ("muzeju un izstāžu finansējums", "08.220"),
+    ("Kurā kodā uzskaita ugunsdzēsību?", "03.200"),
+    ("pirmsskolas izglītības iestāžu izdevumi", "09.100"),
+    ("studentu kreditēšanai piešķirtie līdzekļi", "09.430"),
+    ("ūdensapgādes izdevumi", "06.300"),
+    ("notekūdeņu apsaimniekošanas izdevumi", "05.200"),
+    ("tūrisma pasākumu izdevumi", "04.730"),
+    ("Kur uzskaita dzelzceļa transporta izdevumus?", "04.530"),
+    ("zobārstniecības pakalpojumu izdevumi", "07.230"),
+    ("asins sagādes izdevumi", "07.460"),
+    ("atbalsts ģimenēm ar bērniem", "10.400"),
+    ("mājokļa atbalsta pabalsti", "10.600"),
+    ("robežsardzes izdevumi", "03.120"),
+    ("teātru un koncertu finansējums", "08.240"),
+    ("ieslodzījuma vietu vadības izdevumi", "03.410"),
+    ("valsts budžeta mērķdotācijas pašvaldībām", "01.812"),
+    ("diplomātisko pārstāvniecību izdevumi", "01.132"),
+    ("medikamentu iegāde", "07.110"),
+    ("viesnīcu un restorānu darbība", "04.720"),
+    ("izglitojamo edinasanas pakalpojumi", "09.620"),
+    ("ugunsdzesibas dienesti", "03.200"),
+    ("zobarstniecibas pakalpojumi", "07.230"),
+    # Drukas kļūdas
+    ("Kur uzskaita degvilas kompensācijas izglītojamiem?", "09.610"),
+    ("ugunsdzsības dienesti", "03.200"),
+    ("zobārstnecības pakalpojumi", "07.230"),
+    ("robežsargzes izdevumi", "03.120"),
+    ("muzeju un izstžu finansējums", "08.220"),
+]
+
+# COFOG salīdzinājuma jautājumi (meklēšana arī COFOG rokasgrāmatas mapēs)
+COFOG_QUESTIONS = [
+    "Kāds COFOG kods atbilst izglītojamo ēdināšanas pakalpojumiem 09.620?",
+    "Salīdzini kodu 04.500 ar COFOG klasifikāciju",
+    "Kā COFOG klasificē ugunsdzēsības dienestus?",
+    "Kurā COFOG grupā ir slimnīcu pakalpojumi?",
+    "Salīdzināt sociālās aizsardzības kodus ar starptautisko standartu",
+    "COFOG subsidiary services to education",
+    "COFOG classification of waste water management",
+    "Kāds ir kods 10.400 COFOG klasifikācijā?",
+]
+
+def question_texts():
+    """
+    Visi mērījumu jautājumi
+
+    Returns:
+        list: Jautājumu teksti (MK noteikumu jautājumi, tad COFOG jautājumi)
+    """
+    return [question for question, _ in QUESTIONS] + COFOG_QUESTIONS
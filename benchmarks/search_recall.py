@@ -0,0 +1,85 @@
+# benchmarks/search_recall.py
+"""
+Meklēšanas atsaukuma (recall) tests ar parauga jautājumiem: katram jautājumam ir zināms
+budžeta kods, kura fragmentam jābūt starp atrastajiem. Jautājumos vārdi ir citos locījumos
+nekā noteikumu tekstā (daži bez garumzīmēm, daži ar drukas kļūdām), lai salīdzinātu
+normalizācijas un trigrammu līdzības iestatījumus.
+
+Palaišana: python -m benchmarks.search_recall [--repeat 20]
+"""
+import os
+import sys
+import time
+import argparse
+
+os.environ.setdefault("GPT_API_KEY", "benchmark")
+# Salīdzinājuma indeksi tiek veidoti atmiņā - korpusa novērošana nav vajadzīga
+os.environ.setdefault("CORPUS_CHECK_INTERVAL", "0")
+
+from config import Config
+from normalization import normalize_word
+from search_index import CorpusIndex
+from search import SearchSnapshot, search_engine
+from benchmarks.questions import QUESTIONS
+
+# (nosaukums, Config.STEMMING, Config.FOLD_DIACRITICS, Config.FUZZY_MATCH_THRESHOLD)
+VARIANTS = [
+    ("bez normalizācijas", False, False, 0),
+    ("galotnes", True, False, 0),
+    ("galotnes + garumzīmes", True, True, 0),
+    ("galotnes + garumzīmes + trigrammas", True, True, 0.5),
+]
+
+def evaluate(repeat):
+    """
+    Novērtē meklēšanu ar pašreizējo indeksu
+
+    Args:
+        repeat (int): Cik reizes atkārtot katru vaicājumu laika mērījumam
+
+    Returns:
+        dict: recall@1, recall@5, MRR, vidējais vaicājuma laiks un neatrastie jautājumi
+    """
+    hits_at_1 = hits_at_5 = 0
+    reciprocal_ranks = 0.0
+    missed = []
+    started = time.perf_counter()
+    for question, code in QUESTIONS:
+        for _ in range(repeat):
+            # Kešatmiņa tiek iztukšota, lai mērītu meklēšanu, nevis kešatmiņu
+            search_engine.result_cache.clear()
+            results = search_engine.search(question)
+        codes = [result.get("parent_code") for result in results]
+        if code in codes:
+            rank = codes.index(code) + 1
+            hits_at_1 += rank == 1
+            hits_at_5 += rank <= 5
+            reciprocal_ranks += 1 / rank
+        else:
+            missed.append(question)
+    elapsed = time.perf_counter() - started
+    count = len(QUESTIONS)
+    return {
+        "recall@1": round(hits_at_1 / count, 3),
+        "recall@5": round(hits_at_5 / count, 3),
+        "mrr": round(reciprocal_ranks / count, 3),
+        "query_ms": round(elapsed / (count * repeat) * 1000, 3),
+        "missed": missed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Meklēšanas atsaukuma salīdzinājums")
+    parser.add_argument("--repeat", type=int, default=20, help="Vaicājuma atkārtojumi laika mērījumam")
+    args = parser.parse_args()
+
+    folders = Config.PRIMARY_FOLDERS + Config.COFOG_FOLDERS
+    for name, stemming, fold, fuzzy in VARIANTS:
+        Config.STEMMING, Config.FOLD_DIACRITICS, Config.FUZZY_MATCH_THRESHOLD = stemming, fold, fuzzy
+        normalize_word.cache_clear()
+        search_engine.snapshot = SearchSnapshot(CorpusIndex.build(folders))
+        result = evaluate(args.repeat)
+        print(dict({"variant": name}, **result))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# benchmarks/stub_server.py
+"""
+Lokāls GPT API (chat/completions) aizstājējs mērījumiem: atbild ar fiksētu tekstu pēc
+norādītās aiztures, arī pa daļām (stream: true), bez tīkla un API izmaksām.
+
+Palaišana atsevišķi: python -m benchmarks.stub_server [--port 8099] [--latency 0.05]
+un lietotnei GPT_API_URL=http://127.0.0.1:8099/v1/chat/completions
+"""
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_ANSWER = "Kodā 09.620 uzskaita izdevumus par izglītojamo ēdināšanas pakalpojumiem."
+
+class _CompletionsHandler(BaseHTTPRequestHandler):
+    """Atbild uz POST pieprasījumiem OpenAI chat/completions formātā"""
+
+    protocol_version = "HTTP/1.1"
+    # Galvenes un saturs tiek rakstīti atsevišķi - bez TCP_NODELAY keep-alive savienojumā katra
+    # atbilde gaidītu aizkavēto ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests += 1
+        time.sleep(self.server.latency)
+
+        if payload.get("stream"):
+            parts = [f"data: {json.dumps({'choices': [{'delta': {'content': word + ' '}}]})}\n\n"
+                     for word in STUB_ANSWER.split()]
+            body = ("".join(parts) + "data: [DONE]\n\n").encode("utf-8")
+            content_type = "text/event-stream"
+        else:
+            body = json.dumps({"choices": [{"message": {"role": "assistant", "content": STUB_ANSWER}}]}).encode("utf-8")
+            content_type = "application/json"
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Pieprasījumi netiek reģistrēti (mērījumu izvadi nepiesārņo)"""
+
+class StubCompletionsServer:
+    """GPT API aizstājējs fona pavedienā"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        """
+        Args:
+            host (str): Adrese
+            port (int): Ports (0 - jebkurš brīvs)
+            latency (float): Atbildes aizture sekundēs (imitē modeļa atbildes laiku)
+        """
+        self.server = ThreadingHTTPServer((host, port), _CompletionsHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.requests = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        """chat/completions adrese (GPT_API_URL)"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    @property
+    def requests(self):
+        """Saņemto pieprasījumu skaits"""
+        return self.server.requests
+
+    def start(self):
+        """Palaiž serveri fona pavedienā"""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="stub-completions", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Aptur serveri"""
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+def main():
+    parser = argparse.ArgumentParser(description="GPT API aizstājējs mērījumiem")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0, help="Atbildes aizture sekundēs")
+    args = parser.parse_args()
+
+    server = StubCompletionsServer(args.host, args.port, args.latency)
+    print(f"GPT_API_URL={server.url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# benchmarks/term_expansion.py
+"""
+Terminu paplašināšanas mikrotests: daļējās sakritības (termins kā daļa no garāka termina)
+ar visas vārdnīcas pārlūkošanu un ar trigrammu indeksu, kā arī līdzīgo terminu meklēšana
+drukas kļūdām. Pārbauda, ka abas daļējo sakritību metodes atgriež vienādus terminus.
+
+Palaišana: python -m benchmarks.term_expansion [--repeat 200]
+"""
+import os
+import sys
+import time
+import argparse
+
+os.environ.setdefault("GPT_API_KEY", "benchmark")
+os.environ.setdefault("CORPUS_CHECK_INTERVAL", "0")
+
+from search import search_engine
+from benchmarks.questions import QUESTIONS
+
+def timed(function, repeat):
+    """Izpilda funkciju atkārtoti un atgriež (rezultāts, vidējais laiks ms)"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return result, (time.perf_counter() - started) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Terminu paplašināšanas mikrotests")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    index = search_engine.index
+    trigrams, build_ms = timed(lambda: type(index.trigrams)(index.trigrams.terms), 1)
+    words = [word for question, _ in QUESTIONS for word in search_engine._preprocess_query(question)]
+    terms = list(dict.fromkeys(index.terms(words)))
+
+    scan_ms = trigram_ms = similar_ms = 0
+    mismatches = []
+    for term in terms:
+        scanned, elapsed = timed(lambda: [t for t in trigrams.terms if term in t and t != term], args.repeat)
+        scan_ms += elapsed
+        found, elapsed = timed(lambda: trigrams.containing(term), args.repeat)
+        trigram_ms += elapsed
+        _, elapsed = timed(lambda: trigrams.similar(term, limit=1), args.repeat)
+        similar_ms += elapsed
+        if scanned != found:
+            mismatches.append(term)
+
+    print({
+        "vocabulary": len(trigrams),
+        "trigram_build_ms": round(build_ms, 1),
+        "terms": len(terms),
+        "scan_ms_per_term": round(scan_ms / len(terms), 4),
+        "trigram_ms_per_term": round(trigram_ms / len(terms), 4),
+        "similar_ms_per_term": round(similar_ms / len(terms), 4),
+        "mismatches": mismatches
+    })
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# cache.py
+"""
+Kešatmiņas modulis.
+Satur ierobežota izmēra LRU kešu ar ierakstu derīguma termiņu (TTL) atmiņā un diskā (SQLite).
+"""
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """LRU kešatmiņa ar maksimālo izmēru, derīguma termiņu un trāpījumu skaitītājiem"""
+
+    def __init__(self, max_size, ttl=None):
+        """
+        Inicializē kešatmiņu
+
+        Args:
+            max_size (int): Maksimālais ierakstu skaits (0 - kešs atslēgts)
+            ttl (float, optional): Ieraksta derīguma termiņš sekundēs (None - bez termiņa)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Atgriež kešā saglabāto vērtību
+
+        Args:
+            key: Ieraksta atslēga
+            default: Vērtība, ko atgriezt, ja ieraksta nav vai tas novecojis
+
+        Returns:
+            Saglabātā vērtība vai default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """
+        Saglabā vērtību kešā, vajadzības gadījumā izmetot vecāko ierakstu
+
+        Args:
+            key: Ieraksta atslēga
+            value: Saglabājamā vērtība
+        """
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Iztukšo kešatmiņu"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Atgriež kešatmiņas statistiku
+
+        Returns:
+            dict: Izmērs, trāpījumi, netrāpījumi un izmestie ieraksti
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+class DiskCache:
+    """
+    LRU kešatmiņa SQLite failā ar derīguma termiņu - saglabājas starp servera restartiem.
+    Vērtībām jābūt JSON serializējamām.
+    """
+
+    def __init__(self, path, max_size, ttl=None):
+        """
+        Inicializē kešatmiņu un izveido tabulu, ja tās vēl nav
+
+        Args:
+            path (str): SQLite faila ceļš
+            max_size (int): Maksimālais ierakstu skaits (0 - kešs atslēgts)
+            ttl (float, optional): Ieraksta derīguma termiņš sekundēs (None - bez termiņa)
+        """
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        self._connection.commit()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Atgriež kešā saglabāto vērtību
+
+        Args:
+            key (str): Ieraksta atslēga
+            default: Vērtība, ko atgriezt, ja ieraksta nav vai tas novecojis
+
+        Returns:
+            Saglabātā vērtība vai default
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                value, expires_at = row
+                if expires_at is None or expires_at > now:
+                    self._connection.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+                    self._connection.commit()
+                    self.hits += 1
+                    return json.loads(value)
+                self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._connection.commit()
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """
+        Saglabā vērtību kešā, vajadzības gadījumā izmetot vecākos ierakstus
+
+        Args:
+            key (str): Ieraksta atslēga
+            value: JSON serializējama vērtība
+        """
+        if self.max_size <= 0:
+            return
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now)
+            )
+            excess = self._connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_size
+            if excess > 0:
+                self._connection.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY accessed_at LIMIT ?)", (excess,)
+                )
+                self.evictions += excess
+            self._connection.commit()
+
+    def clear(self):
+        """Iztukšo kešatmiņu"""
+        with self._lock:
+            self._connection.execute("DELETE FROM cache")
+            self._connection.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def stats(self):
+        """
+        Atgriež kešatmiņas statistiku
+
+        Returns:
+            dict: Izmērs, trāpījumi, netrāpījumi un izmestie ieraksti
+        """
+        return {
+            "size": len(self),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+def create_cache(max_size, ttl=None, path=None):
+    """
+    Izveido kešatmiņu atmiņā vai diskā
+
+    Args:
+        max_size (int): Maksimālais ierakstu skaits
+        ttl (float, optional): Ieraksta derīguma termiņš sekundēs
+        path (str, optional): SQLite faila ceļš; ja nav norādīts, kešs tiek glabāts atmiņā
+
+    Returns:
+        LRUCache vai DiskCache: Kešatmiņas instance
+    """
+    if path:
+        return DiskCache(path, max_size, ttl)
+    return LRUCache(max_size, ttl)
@@ -7,16 +7,8 @@ import os
 import sys
 import logging
 from dotenv import load_dotenv
+from logging_setup import configure_logging
 
-# Konfigurējam reģistrēšanu
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 # Ielādē vides mainīgos no .env faila
@@ -31,6 +23,18 @@ class Config:
     GPT_MODEL = os.getenv("GPT_MODEL", "gpt-3.5-turbo")
     MAX_TOKENS = int(os.getenv("MAX_TOKENS", 250))
     TEMPERATURE = float(os.getenv("TEMPERATURE", 0.7))
+    # Vai pēc noklusējuma sūtīt atbildes pa daļām (klients var to norādīt ar "stream")
+    STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "False").lower() in ('true', '1', 't')
+    
+    # HTTP klienta iestatījumi (savienojumu pūls, laika limiti sekundēs, atkārtojumi)
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 30))
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 2))
+    HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", 0.5))
+    # Asinhronā (ASGI) režīma iestatījumi: vienlaicīgie API savienojumi un meklēšanas pavedieni
+    ASYNC_HTTP_POOL_SIZE = int(os.getenv("ASYNC_HTTP_POOL_SIZE", 200))
+    ASYNC_SEARCH_WORKERS = int(os.getenv("ASYNC_SEARCH_WORKERS", 4))
     
     # Servera iestatījumi
     PORT = int(os.getenv('PORT', 5000))
@@ -43,10 +47,77 @@ class Config:
     # Lietotāju pārvaldības iestatījumi
     MAX_USERS = int(os.getenv("MAX_USERS", 1000))
     MAX_HISTORY_LENGTH = int(os.getenv("MAX_HISTORY_LENGTH", 10))
+    # Meklēšanas konteksta tokenu budžets un rindu skaits ap katru atbilstošo rindu
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 600))
+    CONTEXT_WINDOW_LINES = int(os.getenv("CONTEXT_WINDOW_LINES", 3))
+    # Koplietojama sarunu glabātuve vairākiem darba procesiem (piem. redis://localhost:6379/0);
+    # tukšs - sarunas glabājas procesa atmiņā. TTL - neaktīvas sarunas derīgums sekundēs
+    CONVERSATION_STORE_URL = os.getenv("CONVERSATION_STORE_URL", "")
+    CONVERSATION_TTL = int(os.getenv("CONVERSATION_TTL", 86400))
+    # Slēdzeņu daļu skaits sarunu glabātuvē atmiņā (vienlaicīgiem pavedieniem)
+    CONVERSATION_LOCK_STRIPES = int(os.getenv("CONVERSATION_LOCK_STRIPES", 64))
+    
+    # Atbilžu kešatmiņa pirmajiem sarunas jautājumiem (ANSWER_CACHE_PATH - SQLite fails diskā)
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "False").lower() in ('true', '1', 't')
+    ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 512))
+    ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", 86400))
+    ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "")
+    
+    # Apstrādes posmu laika mērījumi un skaitītāji (/metrics Prometheus formātā)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False").lower() in ('true', '1', 't')
+    # Pieprasījumu profilēšana: profilējamo pieprasījumu daļa (0 - izslēgts), direktorija un
+    # cik lēnāko profilu tajā saglabāt
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 20))
+    
+    # Reģistrēšana: līmenis, fails (tukšs - tikai konsole) ar rotāciju pēc izmēra, formāts
+    # ("text" vai "json") un moduļu līmeņi (piem. "search=WARNING,http_client=DEBUG")
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FILE = os.getenv("LOG_FILE", "app.log")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+    LOG_LEVELS = os.getenv("LOG_LEVELS", "")
     
     # Programmas ceļi
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     
+    # Meklēšanas iestatījumi
+    PRIMARY_FOLDERS = ["pdf_chunks_part8", "pdf_chunks_part9"]
+    COFOG_FOLDERS = [
+        "pdf_chunks_part1", "pdf_chunks_part2", "pdf_chunks_part3",
+        "pdf_chunks_part4", "pdf_chunks_part5", "pdf_chunks_part6", "pdf_chunks_part7"
+    ]
+    INDEX_PATH = os.getenv("INDEX_PATH", "search_index.bin")
+    # Darba procesi indeksa kompilēšanai lietotnes procesā (komandrindas rīks pēc noklusējuma izmanto visus kodolus)
+    INDEX_BUILD_WORKERS = int(os.getenv("INDEX_BUILD_WORKERS", 1))
+    # Fragmentu (passages) maksimālais garums simbolos un atgriežamo fragmentu skaits
+    PASSAGE_MAX_CHARS = int(os.getenv("PASSAGE_MAX_CHARS", 1200))
+    SEARCH_RESULTS = int(os.getenv("SEARCH_RESULTS", 5))
+    RANKING_ENGINE = os.getenv("RANKING_ENGINE", "bm25")
+    # Teksta normalizācija indeksā un vaicājumos: galotņu noņemšana un garumzīmju ignorēšana
+    STEMMING = os.getenv("STEMMING", "True").lower() in ('true', '1', 't')
+    FOLD_DIACRITICS = os.getenv("FOLD_DIACRITICS", "True").lower() in ('true', '1', 't')
+    # Vaicājuma termini, kuru nav indeksā, tiek aizstāti ar līdzīgāko terminu (trigrammu līdzība, 0 - izslēgts)
+    FUZZY_MATCH_THRESHOLD = float(os.getenv("FUZZY_MATCH_THRESHOLD", 0.5))
+    BM25_K1 = float(os.getenv("BM25_K1", 1.2))
+    BM25_B = float(os.getenv("BM25_B", 0.75))
+    # Vektorizētajam novērtētājam (bm25_vector): cik labāko fragmentu atgriezt no katras mapes
+    VECTOR_RERANK_DEPTH = int(os.getenv("VECTOR_RERANK_DEPTH", 20))
+    # Semantiskā meklēšana (pēc izvēles): fragmentu vektori no lokāla CPU modeļa, apvienoti ar atslēgvārdu
+    # rezultātiem (Reciprocal Rank Fusion). EMBEDDING_MODEL="hashing" - jaucējvektori bez modeļa
+    DENSE_RETRIEVAL = os.getenv("DENSE_RETRIEVAL", "False").lower() in ('true', '1', 't')
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+    EMBEDDING_INDEX_PATH = os.getenv("EMBEDDING_INDEX_PATH", "embeddings.bin")
+    EMBEDDING_DTYPE = os.getenv("EMBEDDING_DTYPE", "float16")
+    DENSE_TOP_K = int(os.getenv("DENSE_TOP_K", 20))
+    HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", 60))
+    # Meklēšanas rezultātu kešatmiņa un korpusa izmaiņu novērošanas intervāls (sekundēs, 0 - izslēgta)
+    SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", 1024))
+    SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 3600))
+    CORPUS_CHECK_INTERVAL = float(os.getenv("CORPUS_CHECK_INTERVAL", 10))
+    
     @classmethod
     def validate(cls):
         """Pārbauda, vai visi nepieciešamie iestatījumi ir pareizi konfigurēti"""
@@ -218,5 +289,8 @@ def get_folder_path(folder_name):
     """Atgriež pilnu ceļu līdz norādītajai mapei"""
     return os.path.join(os.getcwd(), folder_name)
 
-# Inicializējam konfigurāciju, kad modulis tiek importēts
+# Konfigurējam reģistrēšanu (rinda un fona pavediens, sk. logging_setup) un inicializējam
+# konfigurāciju, kad modulis tiek importēts
+configure_logging(Config.LOG_LEVEL, Config.LOG_FILE, Config.LOG_FORMAT, Config.LOG_MAX_BYTES,
+                  Config.LOG_BACKUP_COUNT, Config.LOG_LEVELS)
 Config.validate()
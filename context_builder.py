@@ -0,0 +1,216 @@
+# context_builder.py
+"""
+Konteksta veidošanas modulis.
+No atrastajiem fragmentiem izvēlas tikai rindu logus ap vaicājuma vārdiem un kodiem
+un saliek tos kontekstā, kas nepārsniedz noteiktu tokenu skaitu.
+"""
+import math
+import logging
+from config import Config
+from search_index import tokenize, extract_codes
+from normalization import normalize_word, is_stop_word
+
+try:
+    import tiktoken
+except ImportError:  # Bez tiktoken tokenus novērtējam pēc simbolu skaita
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Vidējais simbolu skaits vienā tokenā latviešu tekstam (garumzīmes BPE vārdnīcās ir dārgas)
+CHARS_PER_TOKEN = 3
+
+# Rindu logu atdalītājs viena fragmenta ietvaros
+PASSAGE_SEPARATOR = "\n...\n"
+
+class TokenCounter:
+    """Tokenu skaitītājs: tiktoken, ja pieejams, citādi novērtējums pēc teksta garuma"""
+
+    def __init__(self, model=Config.GPT_MODEL):
+        """
+        Inicializē skaitītāju
+
+        Args:
+            model (str): Modeļa nosaukums tiktoken kodējuma izvēlei
+        """
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except Exception as e:
+                # Nezināms modelis vai kodējumu nevar lejupielādēt (bezsaistes vide)
+                logger.warning(f"tiktoken kodējums nav pieejams ({e}), tokenus novērtējam pēc garuma")
+
+    def count(self, text):
+        """
+        Saskaita tekstā esošos tokenus
+
+        Args:
+            text (str): Teksts
+
+        Returns:
+            int: Tokenu skaits
+        """
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    def truncate(self, text, budget):
+        """
+        Saīsina tekstu līdz norādītajam tokenu skaitam
+
+        Args:
+            text (str): Teksts
+            budget (int): Maksimālais tokenu skaits
+
+        Returns:
+            str: Saīsinātais teksts
+        """
+        if budget <= 0:
+            return ""
+        if self.encoding is not None:
+            return self.encoding.decode(self.encoding.encode(text)[:budget])
+        return text[:budget * CHARS_PER_TOKEN]
+
+class ContextBuilder:
+    """Veido meklēšanas kontekstu no fragmentu rindu logiem tokenu budžeta ietvaros"""
+
+    def __init__(self, token_budget=Config.CONTEXT_TOKEN_BUDGET, window_lines=Config.CONTEXT_WINDOW_LINES,
+                 token_counter=None):
+        """
+        Inicializē konteksta veidotāju
+
+        Args:
+            token_budget (int): Maksimālais konteksta tokenu skaits
+            window_lines (int): Rindu skaits pirms un pēc katras atbilstošās rindas
+            token_counter (TokenCounter, optional): Tokenu skaitītājs
+        """
+        self.token_budget = token_budget
+        self.window_lines = window_lines
+        self.token_counter = token_counter or TokenCounter()
+
+    def build(self, query, chunks, codes=None):
+        """
+        Saliek kontekstu no fragmentiem atbilstības secībā, kamēr pietiek tokenu budžeta
+
+        Args:
+            query (str): Lietotāja vaicājums
+            chunks (list): Meklēšanas rezultāti ar "content" un "parent_code" laukiem (labākais pirmais)
+            codes (tuple, optional): Vaicājumā minētie kodi (RoutedQuery.codes); ja nav norādīti, tiek atrasti vaicājumā
+
+        Returns:
+            str: Konteksts
+        """
+        query_lower = query.lower()
+        if codes is None:
+            codes = extract_codes(query_lower)
+        stems = {normalize_word(word) for word in tokenize(query_lower)
+                 if len(word) > 2 and not word.isdigit() and not is_stop_word(word)}
+
+        chunk_lines = [chunk["content"].splitlines() for chunk in chunks]
+        weights = self._term_weights(stems, chunk_lines)
+        chunk_scores = [self._line_scores(lines, weights, codes) for lines in chunk_lines]
+
+        # Rindas tiek atlasītas pēc labākās rindas visos fragmentos, nevis katrā atsevišķi,
+        # lai vāji atbilstoši fragmenti nepievienotu nesaistītas rindas
+        best = max((max(scores, default=0) for scores in chunk_scores), default=0)
+
+        parts = []
+        remaining = self.token_budget
+        for chunk, lines, line_scores in zip(chunks, chunk_lines, chunk_scores):
+            passages = self._passages(lines, line_scores, best)
+            if not passages:
+                continue
+            text = PASSAGE_SEPARATOR.join(passages)
+            # Rindu logs var nesaturēt kodu, kuram fragments pieder (piem. "Neuzskaita:" sadaļa)
+            parent_code = chunk.get("parent_code")
+            if parent_code and not text.startswith(parent_code):
+                text = f"[{parent_code}]\n{text}"
+            tokens = self.token_counter.count(text)
+            if tokens > remaining:
+                # Pēdējo fragmentu saīsinām, ja budžetā vēl ir vieta kaut nelielam logam
+                if remaining >= self.token_budget // 4:
+                    parts.append(self.token_counter.truncate(text, remaining))
+                break
+            parts.append(text)
+            remaining -= tokens
+
+        context = "\n\n".join(parts)
+        logger.info(f"Konteksts: {len(parts)} fragmenti, {self.token_budget - remaining} no {self.token_budget} tokeniem")
+        return context
+
+    def _term_weights(self, stems, chunk_lines):
+        """
+        Aprēķina vaicājuma vārdu svarus: vārdi, kas sastopami retākās rindās, ir svarīgāki
+
+        Args:
+            stems (set): Vaicājuma vārdu celmi
+            chunk_lines (list): Katra fragmenta rindu saraksts
+
+        Returns:
+            dict: {celms: svars}
+        """
+        line_count = 0
+        frequencies = dict.fromkeys(stems, 0)
+        for lines in chunk_lines:
+            for line in lines:
+                line_count += 1
+                line_stems = {normalize_word(word) for word in tokenize(line.lower())}
+                for stem in stems & line_stems:
+                    frequencies[stem] += 1
+        return {
+            stem: math.log(1 + line_count / frequency)
+            for stem, frequency in frequencies.items() if frequency
+        }
+
+    def _line_scores(self, lines, weights, codes):
+        """
+        Novērtē katras fragmenta rindas atbilstību vaicājumam
+
+        Args:
+            lines (list): Fragmenta rindas
+            weights (dict): Vaicājuma vārdu celmu svari
+            codes (list): Vaicājumā minētie kodi
+
+        Returns:
+            list: Rindu atbilstības reitingi
+        """
+        code_weight = max(weights.values(), default=1) * 2
+        line_scores = []
+        for line in lines:
+            line_lower = line.lower()
+            score = sum(weights.get(normalize_word(word), 0) for word in set(tokenize(line_lower)))
+            # Kodi ir ļoti svarīgi, tāpēc rinda ar kodu vienmēr tiek iekļauta
+            if any(code in line_lower for code in codes):
+                score += code_weight
+            line_scores.append(score)
+        return line_scores
+
+    def _passages(self, lines, line_scores, best):
+        """
+        Izvēlas fragmenta rindu logus ap atbilstošākajām rindām
+
+        Args:
+            lines (list): Fragmenta rindas
+            line_scores (list): Rindu atbilstības reitingi
+            best (float): Labākās rindas reitings visos fragmentos
+
+        Returns:
+            list: Rindu logi (teksts) fragmenta secībā
+        """
+        if best <= 0:
+            # Neviena rinda nesatur vaicājuma vārdus (fragmenti atrasti citādi) - ņemam sākumu
+            return ["\n".join(lines[:2 * self.window_lines + 1]).strip()] if lines else []
+
+        # Logi ap rindām, kuru atbilstība ir vismaz puse no labākās rindas
+        windows = []
+        for i, score in enumerate(line_scores):
+            if score <= 0 or score * 2 < best:
+                continue
+            start, end = max(0, i - self.window_lines), min(len(lines), i + self.window_lines + 1)
+            if windows and start <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], end)
+            else:
+                windows.append([start, end])
+
+        return ["\n".join(lines[start:end]).strip() for start, end in windows]
@@ -5,28 +5,56 @@ Saglabā un pārvalda lietotāju sarunas ar čatbotu.
 """
 import time
 import json
+import hashlib
 import logging
 import requests
 from config import Config, SYSTEM_MESSAGE, GENERIC_ANSWER
-from search import search_engine, is_generic_question
+from search import search_engine
+from query_router import route_query
+from cache import create_cache
+from conversation_store import MemoryConversationStore, create_conversation_store
+from context_builder import ContextBuilder
+from http_client import completions_client
+from metrics import registry, STAGE_SECONDS, UPSTREAM_SECONDS, MESSAGES_TOTAL
+from profiling import request_profiler
 
 logger = logging.getLogger(__name__)
 
+# Meklēšanas konteksta sistēmas ziņojums
+CONTEXT_MESSAGE_TEMPLATE = """Šī ir informācija no MK noteikumiem Nr. 934, kas var palīdzēt atbildēt uz lietotāja jautājumu.
+
+ĪPAŠI PIEVĒRS UZMANĪBU sadaļām "Kodā X.XXX uzskaita:" un "Neuzskaita:".
+Ja kāds izdevums atrodas "Neuzskaita:" sadaļā, nekādā gadījumā NEIETEIKT šo kodu!
+Ja redzi, ka prasītais izdevums pieminēts "Neuzskaita:" sadaļā kādā kodā, NEIESAKI šo kodu!
+
+Konteksts:
+{context}
+
+Atceries sniegt TIKAI precīzu atbildi ar konkrētu kodu, bez liekiem skaidrojumiem."""
+
 class ConversationManager:
-    """Klase sarunu pārvaldībai ar ierobežotu atmiņas patēriņu"""
+    """
+    Klase sarunu pārvaldībai ar ierobežotu atmiņas patēriņu.
+    Sarunas glabājas glabātuvē (atmiņā vai Redis, sk. conversation_store); sistēmas ziņojums
+    netiek glabāts katrai sarunai atsevišķi - tas tiek pievienots, atgriežot vēsturi.
+    """
     
-    def __init__(self, max_users=Config.MAX_USERS, max_history_length=Config.MAX_HISTORY_LENGTH):
+    def __init__(self, max_users=Config.MAX_USERS, max_history_length=Config.MAX_HISTORY_LENGTH, store=None):
         """
         Inicializē sarunu pārvaldi
         
         Args:
             max_users (int): Maksimālais lietotāju skaits, kas tiek saglabāts atmiņā
             max_history_length (int): Maksimālais ziņojumu skaits, ko saglabāt katrai sarunai
+            store (optional): Sarunu glabātuve; pēc noklusējuma atbilstoši Config.CONVERSATION_STORE_URL
         """
-        self.conversations = {}
         self.max_users = max_users
         self.max_history_length = max_history_length
-        self.current_time = time.time()
+        if store is None:
+            store = create_conversation_store(max_users, max_history_length,
+                                              Config.CONVERSATION_STORE_URL or None, Config.CONVERSATION_TTL,
+                                              Config.CONVERSATION_LOCK_STRIPES)
+        self.store = store
     
     def add_message(self, user_id, role, content):
         """
@@ -40,36 +68,25 @@ class ConversationManager:
         Returns:
             bool: True, ja ziņojums pievienots veiksmīgi
         """
-        # Inicializē lietotāja vēsturi, ja tā vēl nav
-        if user_id not in self.conversations:
-            # Ja sasniegts maksimālais lietotāju skaits, noņem vecāko lietotāju
-            if len(self.conversations) >= self.max_users:
-                self._remove_oldest_conversation()
-            
-            # Inicializē jaunu sarunu ar sistēmas ziņojumu
-            self.conversations[user_id] = [
-                {
-                    "role": "system", 
-                    "content": SYSTEM_MESSAGE, 
-                    "timestamp": time.time()
-                }
-            ]
-        
-        # Pievieno ziņojumu ar laika zīmogu
-        current_time = time.time()
-        self.conversations[user_id].append({
-            "role": role, 
-            "content": content,
-            "timestamp": current_time
-        })
-        
-        # Ierobežojam vēstures garumu (saglabājam sistēmas ziņojumu + pēdējos N ziņojumus)
-        if len(self.conversations[user_id]) > self.max_history_length + 1:
-            # Saglabājam sistēmas ziņojumu un pēdējos ziņojumus
-            self.conversations[user_id] = [self.conversations[user_id][0]] + self.conversations[user_id][-(self.max_history_length):]
-        
+        self.add_messages(user_id, [(role, content)])
         return True
     
+    def add_messages(self, user_id, messages, context=None):
+        """
+        Pievieno vairākus ziņojumus lietotāja sarunai vienā glabātuves operācijā
+        
+        Args:
+            user_id (str): Lietotāja identifikators
+            messages (list): (loma, saturs) pāru saraksts
+            context (str, optional): Meklēšanas konteksta ziņojums; aizvieto iepriekšējo, nevis
+                                     uzkrājas vēsturē
+            
+        Returns:
+            int: Ziņojumu skaits sarunā pirms pievienošanas (0 - jauna saruna)
+        """
+        # Ja sasniegts maksimālais lietotāju skaits, glabātuve noņem vecāko sarunu
+        return self.store.append(user_id, messages, context)
+    
     def get_conversation(self, user_id):
         """
         Atgriež lietotāja sarunu vēsturi
@@ -78,14 +95,19 @@ class ConversationManager:
             user_id (str): Lietotāja identifikators
             
         Returns:
-            list: Sarunu vēstures ziņojumu saraksts bez laika zīmogiem
+            list: Sarunu vēstures ziņojumu saraksts (sākot ar sistēmas ziņojumu) bez laika zīmogiem
         """
-        if user_id not in self.conversations:
-            return [{"role": "system", "content": SYSTEM_MESSAGE}]
+        history, context = self.store.get(user_id)
+        messages = [{"role": "system", "content": SYSTEM_MESSAGE}]
+        messages.extend({"role": role, "content": content} for role, content in history)
         
-        # Atgriežam sarunu bez laika zīmogiem
-        return [{"role": msg["role"], "content": msg["content"]} 
-                for msg in self.conversations[user_id]]
+        # Pēdējais meklēšanas konteksts seko jautājumam, kuram tas tika atrasts
+        if context:
+            position = len(messages)
+            while position > 1 and messages[position - 1]["role"] != "user":
+                position -= 1
+            messages.insert(position, {"role": "system", "content": context})
+        return messages
     
     def reset_conversation(self, user_id):
         """
@@ -97,55 +119,29 @@ class ConversationManager:
         Returns:
             bool: True, ja atiestatīšana veiksmīga, citādi False
         """
-        if user_id in self.conversations:
-            current_time = time.time()
-            self.conversations[user_id] = [
-                {"role": "system", "content": SYSTEM_MESSAGE, "timestamp": current_time}
-            ]
-            return True
-        return False
-    
-    def _remove_oldest_conversation(self):
-        """
-        Noņem vecāko sarunu, lai ietaupītu atmiņu
-        
-        Returns:
-            bool: True, ja noņemšana veiksmīga, citādi False
-        """
-        if not self.conversations:
-            return False
-        
-        # Atrod vecāko lietotāju, pamatojoties uz pēdējā ziņojuma laika zīmogu
-        oldest_user = None
-        oldest_timestamp = float('inf')
-        
-        for user_id, msgs in self.conversations.items():
-            if msgs:
-                last_timestamp = msgs[-1]["timestamp"]
-                if last_timestamp < oldest_timestamp:
-                    oldest_timestamp = last_timestamp
-                    oldest_user = user_id
-        
-        # Noņem vecāko lietotāju
-        if oldest_user:
-            logger.info(f"Noņemam vecāko sarunu: {oldest_user} (pēdējā aktivitāte: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(oldest_timestamp))})")
-            del self.conversations[oldest_user]
-            return True
-        
-        return False
+        return self.store.reset(user_id)
 
 class ChatbotService:
     """Klase čatbota servisa funkcionalitātei"""
     
-    def __init__(self, conversation_manager):
+    def __init__(self, conversation_manager, answer_cache=None):
         """
         Inicializē čatbota servisu
         
         Args:
             conversation_manager: Sarunu pārvaldītāja instance
+            answer_cache (optional): Koplietojama atbilžu kešatmiņa; pēc noklusējuma tiek izveidota
+                                     jauna, ja ANSWER_CACHE_ENABLED
         """
         self.conversation_manager = conversation_manager
         self.query_processor = QueryProcessor(search_engine)
+        self.http_client = completions_client
+        
+        # Atbilžu kešatmiņa pirmajiem sarunas jautājumiem (pēc izvēles)
+        self.answer_cache = answer_cache
+        if answer_cache is None and Config.ANSWER_CACHE_ENABLED:
+            self.answer_cache = create_cache(Config.ANSWER_CACHE_SIZE, Config.ANSWER_CACHE_TTL,
+                                             Config.ANSWER_CACHE_PATH or None)
     
     def process_message(self, text, user_id="default_user"):
         """
@@ -158,103 +154,298 @@ class ChatbotService:
         Returns:
             str: Čatbota atbilde
         """
-        # Pārbauda, vai tas ir vispārīgs jautājums
-        if is_generic_question(text):
+        # Ziņojums tiek klasificēts vienreiz; klasifikācija tiek nodota meklēšanai
+        query = self._route(text)
+        if query.is_generic:
             logger.info(f"Saņemts vispārīgs jautājums: {text}")
             return GENERIC_ANSWER
         
-        # Pievieno lietotāja ziņojumu vēsturei
-        self.conversation_manager.add_message(user_id, "user", text)
+        context = self.query_processor.process_query(query)
+        cache_key, cached_response = self._prepare_turn(text, user_id, context)
+        if cached_response:
+            self.conversation_manager.add_message(user_id, "assistant", cached_response)
+            return cached_response
         
-        # Iegūst kontekstu no meklēšanas
-        context = self.query_processor.process_query(text)
+        # Iegūstam atbildi no GPT API
+        response, success = self._get_gpt_response(user_id)
+        self._finish_turn(user_id, cache_key, response, success)
         
-        # Ja atrasts konteksts, pievieno to kā sistēmas ziņojumu
-        if context:
-            self.conversation_manager.add_message(user_id, "system", 
-                f"""Šī ir informācija no MK noteikumiem Nr. 934, kas var palīdzēt atbildēt uz lietotāja jautājumu.
-                
-                ĪPAŠI PIEVĒRS UZMANĪBU sadaļām "Kodā X.XXX uzskaita:" un "Neuzskaita:". 
-                Ja kāds izdevums atrodas "Neuzskaita:" sadaļā, nekādā gadījumā NEIETEIKT šo kodu!
-                Ja redzi, ka prasītais izdevums pieminēts "Neuzskaita:" sadaļā kādā kodā, NEIESAKI šo kodu!
-                
-                Konteksts:
-                {context}
-                
-                Atceries sniegt TIKAI precīzu atbildi ar konkrētu kodu, bez liekiem skaidrojumiem.
-                """)
+        return response
+    
+    def stream_message(self, text, user_id="default_user"):
+        """
+        Apstrādā lietotāja ziņojumu un atgriež atbildi pa daļām, tiklīdz tās pienāk no API
         
-        # Iegūstam atbildi no GPT API
-        response = self._get_gpt_response(user_id)
+        Args:
+            text (str): Lietotāja ziņojums
+            user_id (str): Lietotāja identifikators
+            
+        Yields:
+            str: Nākamā atbildes daļa
+        """
+        query = self._route(text)
+        if query.is_generic:
+            logger.info(f"Saņemts vispārīgs jautājums: {text}")
+            yield GENERIC_ANSWER
+            return
+        
+        context = self.query_processor.process_query(query)
+        cache_key, cached_response = self._prepare_turn(text, user_id, context)
+        if cached_response:
+            self.conversation_manager.add_message(user_id, "assistant", cached_response)
+            yield cached_response
+            return
+        
+        response_parts = []
+        success = False
+        stream = self._stream_gpt_response(user_id)
+        try:
+            while True:
+                part = next(stream)
+                response_parts.append(part)
+                yield part
+        except StopIteration as finished:
+            success = finished.value
+        finally:
+            # Arī tad, ja klients pārtrauca straumi (GeneratorExit): atbrīvojam API savienojumu
+            # un saglabājam vēsturē līdz tam saņemto atbildes daļu (kešatmiņā - tikai pilnu)
+            stream.close()
+            self._finish_turn(user_id, cache_key, "".join(response_parts), success)
+    
+    def _route(self, text):
+        """
+        Klasificē ziņojumu (sk. query_router) un uzskaita to metrikās un pieprasījuma profilā
+        
+        Args:
+            text (str): Lietotāja ziņojums
+            
+        Returns:
+            RoutedQuery: Klasificēts ziņojums
+        """
+        with STAGE_SECONDS.time(stage="classify"):
+            query = route_query(text)
+        MESSAGES_TOTAL.inc(route=query.route)
+        request_profiler.annotate(route=query.route)
+        return query
+    
+    def _prepare_turn(self, text, user_id, context):
+        """
+        Pievieno lietotāja ziņojumu un meklēšanas kontekstu sarunai
+        
+        Args:
+            text (str): Lietotāja ziņojums
+            user_id (str): Lietotāja identifikators
+            context (str): Meklēšanas konteksts (QueryProcessor.process_query rezultāts)
+            
+        Returns:
+            tuple: (atbilžu kešatmiņas atslēga vai None, kešatmiņā atrastā atbilde vai None)
+        """
+        # Ja atrasts konteksts, tas aizvieto iepriekšējā jautājuma kontekstu (nevis uzkrājas vēsturē)
+        context_message = CONTEXT_MESSAGE_TEMPLATE.format(context=context) if context else None
+        
+        # Lietotāja ziņojumu un kontekstu saglabājam vienā glabātuves operācijā; pirmais jautājums
+        # sarunā, ja pirms tam vēsturē nebija neviena ziņojuma (tikai sistēmas ziņojums)
+        is_first_turn = self.conversation_manager.add_messages(user_id, [("user", text)], context_message) == 0
+        
+        # Pirmajam jautājumam atbilde var būt kešatmiņā
+        if not is_first_turn or self.answer_cache is None:
+            return None, None
+        
+        cache_key = self._answer_cache_key(context, text)
+        cached_response = self.answer_cache.get(cache_key)
+        if cached_response:
+            logger.info("Atbilde atrasta atbilžu kešatmiņā")
+        return cache_key, cached_response
+    
+    def _finish_turn(self, user_id, cache_key, response, success):
+        """
+        Saglabā asistenta atbildi vēsturē un (ja veiksmīga) kešatmiņā
+        
+        Args:
+            user_id (str): Lietotāja identifikators
+            cache_key (str): Atbilžu kešatmiņas atslēga vai None
+            response (str): Asistenta atbilde
+            success (bool): Vai atbilde saņemta no API veiksmīgi
+        """
+        # Kešatmiņā saglabājam tikai veiksmīgas atbildes
+        if cache_key and success:
+            self.answer_cache.set(cache_key, response)
         
         # Pievieno asistenta atbildi vēsturei
         if response:
             self.conversation_manager.add_message(user_id, "assistant", response)
+    
+    def _answer_cache_key(self, context, text):
+        """
+        Izveido atbilžu kešatmiņas atslēgu no visa, kas ietekmē pirmā jautājuma atbildi
         
-        return response
+        Args:
+            context (str): Meklēšanas konteksts
+            text (str): Lietotāja jautājums
+            
+        Returns:
+            str: SHA-256 atslēga
+        """
+        key_data = json.dumps([Config.GPT_MODEL, Config.TEMPERATURE, SYSTEM_MESSAGE, context, text.strip()],
+                              ensure_ascii=False)
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
     
-    def _get_gpt_response(self, user_id):
+    def _build_payload(self, user_id, stream=False):
         """
-        Iegūst atbildi no GPT API
+        Sagatavo GPT API pieprasījumu no lietotāja sarunas vēstures
         
         Args:
             user_id (str): Lietotāja identifikators
+            stream (bool): Vai pieprasīt atbildi pa daļām (SSE)
             
         Returns:
-            str: GPT API atbilde vai kļūdas ziņojums
+            dict: Pieprasījuma JSON saturs
         """
-        # Iegūstam visu sarunu vēsturi
-        conversation_history = self.conversation_manager.get_conversation(user_id)
-        
-        headers = {
-            "Authorization": f"Bearer {Config.GPT_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": Config.GPT_MODEL,
-            "messages": conversation_history,
+            "messages": self.conversation_manager.get_conversation(user_id),
             "max_tokens": Config.MAX_TOKENS,
             "temperature": Config.TEMPERATURE,
             "presence_penalty": 0.5,  # Palīdz izvairīties no atkārtošanās
             "frequency_penalty": 0.5   # Veicina dažādāku vārdu lietošanu
         }
+        if stream:
+            payload["stream"] = True
+        return payload
+    
+    def _api_error_message(self, response):
+        """
+        Sagatavo lietotājam saprotamu kļūdas ziņojumu no neveiksmīgas API atbildes
+        
+        Args:
+            response (requests.Response): API atbilde ar kļūdas statusu
+            
+        Returns:
+            str: Kļūdas ziņojums
+        """
+        try:
+            response_data = response.json()
+            logger.error(f"API kļūda: {response.status_code} - {json.dumps(response_data)}")
+            error_message = response_data.get("error", {}).get("message", "Nezināma kļūda")
+            return f"Diemžēl radās kļūda sazinoties ar asistentu: {error_message}. Lūdzu, mēģiniet vēlāk."
+        except Exception:
+            logger.error(f"API kļūda: {response.status_code} - {response.text}", exc_info=True)
+            return f"Diemžēl radās kļūda sazinoties ar asistentu (Kods: {response.status_code}). Lūdzu, mēģiniet vēlāk."
+    
+    def _exception_message(self, error):
+        """
+        Sagatavo lietotājam saprotamu kļūdas ziņojumu no izņēmuma
+        
+        Args:
+            error (Exception): Pieprasījuma laikā radusies kļūda
+            
+        Returns:
+            str: Kļūdas ziņojums
+        """
+        if isinstance(error, requests.exceptions.Timeout):
+            logger.error("API pieprasījuma timeout")
+            return "Pieprasījuma laiks beidzās. Lūdzu, mēģiniet vēlāk."
+        if isinstance(error, requests.exceptions.RequestException):
+            logger.error(f"Savienojuma kļūda: {error}", exc_info=True)
+            return "Radās kļūda savienojoties ar asistentu. Lūdzu, pārbaudiet interneta savienojumu un mēģiniet vēlāk."
+        logger.error(f"Neparedzēta kļūda: {error}", exc_info=True)
+        return "Radās neparedzēta kļūda. Lūdzu, mēģiniet vēlāk."
+    
+    def _parse_stream_line(self, line):
+        """
+        Izvelk atbildes daļu no vienas SSE rindas
+        
+        Args:
+            line (str): Rinda no API atbildes plūsmas
+            
+        Returns:
+            str: Atbildes daļa vai None, ja rindā tās nav
+        """
+        # SSE notikumi: "data: {...}", beigās "data: [DONE]"
+        if not line or not line.startswith("data:"):
+            return None
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return None
+        
+        delta = json.loads(data).get("choices", [{}])[0].get("delta", {})
+        return delta.get("content")
+    
+    def _get_gpt_response(self, user_id):
+        """
+        Iegūst atbildi no GPT API
         
+        Args:
+            user_id (str): Lietotāja identifikators
+            
+        Returns:
+            tuple: (GPT API atbilde vai kļūdas ziņojums, True ja atbilde saņemta veiksmīgi)
+        """
         try:
-            response = requests.post(Config.GPT_API_URL, headers=headers, json=payload, timeout=30)
+            with UPSTREAM_SECONDS.time(client=self.http_client.name, phase="total"):
+                response = self.http_client.post(self._build_payload(user_id))
             
             # Pārbauda, vai ir kļūda pieprasījumā
             if response.status_code != 200:
-                try:
-                    response_data = response.json()
-                    logger.error(f"API kļūda: {response.status_code} - {json.dumps(response_data)}")
-                    error_message = response_data.get("error", {}).get("message", "Nezināma kļūda")
-                    return f"Diemžēl radās kļūda sazinoties ar asistentu: {error_message}. Lūdzu, mēģiniet vēlāk."
-                except Exception:
-                    logger.error(f"API kļūda: {response.status_code} - {response.text}", exc_info=True)
-                    return f"Diemžēl radās kļūda sazinoties ar asistentu (Kods: {response.status_code}). Lūdzu, mēģiniet vēlāk."
+                return self._api_error_message(response), False
             
             response_data = response.json()
             
             assistant_response = response_data.get("choices", [{}])[0].get("message", {}).get("content", "")
             
             if assistant_response:
-                return assistant_response
+                return assistant_response, True
             else:
                 logger.warning("Tukša atbilde no API")
-                return "Neizdevās saņemt atbildi. Lūdzu, mēģiniet vēlāk."
+                return "Neizdevās saņemt atbildi. Lūdzu, mēģiniet vēlāk.", False
         
-        except requests.exceptions.Timeout:
-            logger.error("API pieprasījuma timeout")
-            return "Pieprasījuma laiks beidzās. Lūdzu, mēģiniet vēlāk."
+        except Exception as e:
+            return self._exception_message(e), False
+    
+    def _stream_gpt_response(self, user_id):
+        """
+        Iegūst atbildi no GPT API pa daļām (stream: true), apstrādājot SSE notikumus
         
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Savienojuma kļūda: {e}", exc_info=True)
-            return "Radās kļūda savienojoties ar asistentu. Lūdzu, pārbaudiet interneta savienojumu un mēģiniet vēlāk."
+        Args:
+            user_id (str): Lietotāja identifikators
+            
+        Yields:
+            str: Nākamā atbildes daļa (vai kļūdas ziņojums)
+            
+        Returns:
+            bool: True, ja atbilde saņemta veiksmīgi
+        """
+        response = None
+        received = False
+        started = time.perf_counter()
+        try:
+            response = self.http_client.post(self._build_payload(user_id, stream=True), stream=True)
+            
+            if response.status_code != 200:
+                yield self._api_error_message(response)
+                return False
+            
+            # Lasām līdz galam (arī pēc [DONE]), lai savienojumu varētu atgriezt pūlā
+            for line in response.iter_lines():
+                content = self._parse_stream_line(line.decode("utf-8"))
+                if content:
+                    received = True
+                    yield content
+            
+            if not received:
+                logger.warning("Tukša atbilde no API")
+                yield "Neizdevās saņemt atbildi. Lūdzu, mēģiniet vēlāk."
+            return received
         
         except Exception as e:
-            logger.error(f"Neparedzēta kļūda: {e}", exc_info=True)
-            return "Radās neparedzēta kļūda. Lūdzu, mēģiniet vēlāk."
+            yield self._exception_message(e)
+            return False
+        
+        finally:
+            # Atbrīvojam savienojumu atpakaļ pūlā
+            if response is not None:
+                response.close()
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, client=self.http_client.name, phase="total")
 
 class QueryProcessor:
     """Klase, kas apvieno meklēšanu un vaicājumu apstrādi"""
@@ -267,31 +458,36 @@ class QueryProcessor:
             search_engine: Meklēšanas dzinēja instance
         """
         self.search_engine = search_engine
+        self.context_builder = ContextBuilder()
     
-    def process_query(self, text):
+    def process_query(self, query):
         """
         Apstrādā vaicājumu un atgriež kontekstu
         
         Args:
-            text (str): Vaicājuma teksts
+            query (str vai RoutedQuery): Vaicājums (jau klasificēts ziņojums netiek klasificēts atkārtoti)
             
         Returns:
             str: Konteksts atbildei vai tukša virkne, ja konteksts nav atrasts
         """
+        query = route_query(query)
+        
         # Pārbauda, vai tas ir vispārīgs jautājums
-        if is_generic_question(text):
-            logger.info(f"Saņemts vispārīgs jautājums: {text}")
+        if query.is_generic:
+            logger.info(f"Saņemts vispārīgs jautājums: {query.text}")
             return ""
         
         # Meklējam relevantos fragmentus
-        relevant_chunks = self.search_engine.search(text)
+        with STAGE_SECONDS.time(stage="search"):
+            relevant_chunks = self.search_engine.search(query)
         
         if not relevant_chunks:
             logger.info("Nav atrasts neviens atbilstošs fragments kontekstam")
             return ""
         
-        # Apvieno fragmentus vienā kontekstā
-        context = "\n\n".join([chunk["content"] for chunk in relevant_chunks])
+        # Apvieno atbilstošākos fragmentu logus vienā kontekstā tokenu budžeta ietvaros
+        with STAGE_SECONDS.time(stage="context"):
+            context = self.context_builder.build(query.text, relevant_chunks, query.codes)
         logger.info(f"Pievienojam kontekstu no {len(relevant_chunks)} fragmentiem")
         
         return context
@@ -301,3 +497,19 @@ conversation_manager = ConversationManager()
 
 # Izveidojam čatbota servisa instanci, kad modulis tiek importēts
 chatbot_service = ChatbotService(conversation_manager)
+
+# Sarunu un atbilžu kešatmiņas rādītāji (/metrics). Sarunu skaits tikai atmiņas glabātuvei (O(1));
+# Redis glabātuvē tas prasītu visu atslēgu pārlūkošanu katrā metriku pieprasījumā
+if isinstance(conversation_manager.store, MemoryConversationStore):
+    registry.register_callback("chatbot_active_conversations", "gauge", "Saglabāto sarunu skaits",
+                               lambda: len(conversation_manager.store))
+    registry.register_callback("chatbot_conversation_evictions_total", "counter", "Izmestās (vecākās) sarunas",
+                               lambda: conversation_manager.store.evictions)
+# Asinhronais serviss (async_chatbot) izmanto to pašu kešatmiņu
+if chatbot_service.answer_cache is not None:
+    for metric, help, attribute in (("chatbot_cache_hits_total", "Kešatmiņas trāpījumi", "hits"),
+                                    ("chatbot_cache_misses_total", "Kešatmiņas netrāpījumi", "misses"),
+                                    ("chatbot_cache_evictions_total", "No kešatmiņas izmestie ieraksti", "evictions")):
+        registry.register_callback(metric, "counter", help,
+                                   lambda attribute=attribute: getattr(chatbot_service.answer_cache, attribute),
+                                   cache="answer")
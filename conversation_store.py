@@ -0,0 +1,339 @@
+# conversation_store.py
+"""
+Sarunu glabātuves modulis.
+Satur sarunu vēstures glabātuvi procesa atmiņā (LRU) un tīklā (Redis), lai vairāki darba
+procesi vai serveri varētu koplietot lietotāju sarunas.
+"""
+import json
+import time
+import logging
+import threading
+from itertools import count
+from collections import OrderedDict, deque
+
+try:
+    import redis
+except ImportError:  # redis vajadzīgs tikai koplietojamai glabātuvei
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+class Message:
+    """Viens sarunas ziņojums (ar __slots__, lai ietaupītu atmiņu)"""
+
+    __slots__ = ("role", "content", "timestamp")
+
+    def __init__(self, role, content, timestamp):
+        """
+        Args:
+            role (str): Ziņojuma loma ('user', 'assistant', 'system')
+            content (str): Ziņojuma saturs
+            timestamp (float): Pievienošanas laiks
+        """
+        self.role = role
+        self.content = content
+        self.timestamp = timestamp
+
+class Conversation:
+    """Vienas sarunas vēsture, pēdējais meklēšanas konteksts un pēdējās aktivitātes kārtas numurs"""
+
+    __slots__ = ("messages", "context", "touched")
+
+    def __init__(self, max_history_length, touched):
+        """
+        Args:
+            max_history_length (int): Maksimālais ziņojumu skaits (deque pats izmet vecākos)
+            touched (int): Pēdējās aktivitātes kārtas numurs (visā glabātuvē augošs)
+        """
+        self.messages = deque(maxlen=max_history_length)
+        self.context = None
+        self.touched = touched
+
+class _Stripe:
+    """Viena atmiņas glabātuves daļa: savas sarunas un sava slēdzene"""
+
+    __slots__ = ("lock", "conversations", "evictions")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.conversations = {}
+        self.evictions = 0
+
+class MemoryConversationStore:
+    """
+    Sarunu glabātuve procesa atmiņā, droša vienlaicīgai lietošanai no vairākiem pavedieniem.
+    Lietotāji ir sadalīti pa daļām (stripes) pēc user_id jaucējvērtības; katrai daļai ir sava
+    slēdzene, tāpēc dažādu lietotāju pieprasījumi parasti negaida viens otru. Ietilpība
+    (max_users) ir kopēja visām daļām: kopīgs OrderedDict LRU secībā (pēdējā aktivitāte beigās)
+    tiek mainīts tikai uz īsu brīdi zem atsevišķas slēdzenes, un izmešana paņem tā pirmo sarunu
+    (O(1), bez daļu pārlūkošanas). Slēdzenes vienmēr tiek ņemtas secībā daļa → kopīgā.
+    Katras sarunas vēsture ir deque ar maxlen, kas pats izmet vecākos ziņojumus; meklēšanas
+    kontekstam ir viena vieta, ko katrs jauns konteksts aizvieto.
+    """
+
+    def __init__(self, max_users, max_history_length, stripes=64):
+        """
+        Inicializē glabātuvi
+
+        Args:
+            max_users (int): Maksimālais sarunu skaits atmiņā (kopā visās daļās)
+            max_history_length (int): Maksimālais ziņojumu skaits vienā sarunā
+            stripes (int): Daļu (slēdzeņu) skaits
+        """
+        self.max_users = max_users
+        self.max_history_length = max_history_length
+        self.stripes = [_Stripe() for _ in range(max(1, stripes))]
+        # Kopējā LRU secība {user_id: pēdējās aktivitātes kārtas numurs} un sarunu skaits
+        self._recency = OrderedDict()
+        self._size = 0
+        self._size_lock = threading.Lock()
+        # Aktivitātes kārtas numuri ļauj izmešanai pamanīt, ka saruna tikko bijusi aktīva
+        # (laiks nederētu - vienādi laiki un pulksteņa izmaiņas)
+        self._activity = count()
+
+    def _stripe(self, user_id):
+        return self.stripes[hash(user_id) % len(self.stripes)]
+
+    def append(self, user_id, messages, context=None):
+        """
+        Pievieno ziņojumus sarunai, vajadzības gadījumā izmetot vecāko sarunu glabātuvē
+
+        Args:
+            user_id (str): Lietotāja identifikators
+            messages (list): (loma, saturs) pāru saraksts
+            context (str, optional): Jauns meklēšanas konteksts, kas aizvieto iepriekšējo
+
+        Returns:
+            int: Ziņojumu skaits sarunā pirms pievienošanas
+        """
+        stripe = self._stripe(user_id)
+        now = time.time()
+        records = [Message(role, content, now) for role, content in messages]
+        over_capacity = False
+        with stripe.lock:
+            conversation = stripe.conversations.get(user_id)
+            if conversation is None:
+                conversation = stripe.conversations[user_id] = Conversation(self.max_history_length, None)
+                with self._size_lock:
+                    self._size += 1
+                    over_capacity = self._size > self.max_users
+            # Atzīmējam sarunu kā pēdējo aktīvo
+            self._touch(user_id, conversation)
+
+            previous_length = len(conversation.messages)
+            conversation.messages.extend(records)
+            if context is not None:
+                conversation.context = context
+
+        if over_capacity:
+            self._evict_oldest()
+        return previous_length
+
+    def get(self, user_id):
+        """
+        Atgriež sarunas ziņojumus
+
+        Args:
+            user_id (str): Lietotāja identifikators
+
+        Returns:
+            tuple: ((loma, saturs) pāru saraksts, pēdējais meklēšanas konteksts vai None)
+        """
+        stripe = self._stripe(user_id)
+        with stripe.lock:
+            conversation = stripe.conversations.get(user_id)
+            if conversation is None:
+                return [], None
+            return [(msg.role, msg.content) for msg in conversation.messages], conversation.context
+
+    def reset(self, user_id):
+        """
+        Izdzēš sarunas ziņojumus
+
+        Args:
+            user_id (str): Lietotāja identifikators
+
+        Returns:
+            bool: True, ja saruna eksistēja
+        """
+        stripe = self._stripe(user_id)
+        with stripe.lock:
+            conversation = stripe.conversations.get(user_id)
+            if conversation is None:
+                return False
+            conversation.messages.clear()
+            conversation.context = None
+            self._touch(user_id, conversation)
+            return True
+
+    def _touch(self, user_id, conversation):
+        """
+        Pārvieto sarunu kopējās LRU secības beigās (izsauc, turot sarunas daļas slēdzeni)
+
+        Args:
+            user_id (str): Lietotāja identifikators
+            conversation (Conversation): Lietotāja saruna
+        """
+        with self._size_lock:
+            conversation.touched = touched = next(self._activity)
+            self._recency[user_id] = touched
+            self._recency.move_to_end(user_id)
+
+    def _evict_oldest(self):
+        """
+        Izmet sarunu ar senāko pēdējo aktivitāti visā glabātuvē (vienlaicīgi izmešanas
+        pieprasījumi katrs paņem citu sarunu no kopējās LRU secības sākuma)
+        """
+        while True:
+            with self._size_lock:
+                if not self._recency:
+                    return
+                user_id, touched = self._recency.popitem(last=False)
+
+            stripe = self._stripe(user_id)
+            with stripe.lock:
+                conversation = stripe.conversations.get(user_id)
+                # Ja saruna tikko bijusi aktīva, _touch to jau atkal ielika secības beigās -
+                # izmetam nākamo vecāko (katrs mēģinājums paņem citu sarunu)
+                if conversation is None or conversation.touched != touched:
+                    continue
+                del stripe.conversations[user_id]
+                stripe.evictions += 1
+            with self._size_lock:
+                self._size -= 1
+            break
+
+        # Pie liela lietotāju skaita izmešana notiek bieži - formatējam tikai, ja žurnāls to ieraksta
+        if logger.isEnabledFor(logging.DEBUG):
+            history = conversation.messages
+            last_activity = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(history[-1].timestamp)) if history else "-"
+            logger.debug(f"Noņemam vecāko sarunu: {user_id} (pēdējā aktivitāte: {last_activity})")
+
+    @property
+    def evictions(self):
+        """Izmesto sarunu skaits kopš palaišanas"""
+        return sum(stripe.evictions for stripe in self.stripes)
+
+    def __len__(self):
+        return self._size
+
+class RedisConversationStore:
+    """
+    Sarunu glabātuve Redis (vai saderīgā) serverī, koplietojama starp darba procesiem.
+    Katra saruna ir Redis saraksts ar JSON ziņojumiem un atsevišķa atslēga meklēšanas kontekstam;
+    lasīšana un rakstīšana notiek vienā konveijera (pipeline) pieprasījumā, un neaktīvas sarunas
+    izbeidzas pēc TTL, nevis pēc lietotāju skaita.
+    """
+
+    def __init__(self, url, max_history_length, ttl, prefix="conversation:", context_prefix="conversation_context:",
+                 client=None):
+        """
+        Inicializē glabātuvi
+
+        Args:
+            url (str): Redis adrese, piem. redis://localhost:6379/0
+            max_history_length (int): Maksimālais ziņojumu skaits vienā sarunā
+            ttl (int): Sarunas derīguma termiņš sekundēs kopš pēdējās aktivitātes
+            prefix (str): Vēstures atslēgu prefikss
+            context_prefix (str): Konteksta atslēgu prefikss
+            client (optional): Gatavs Redis klients (piem. testēšanai)
+        """
+        if client is None:
+            if redis is None:
+                raise RuntimeError("Koplietojamai sarunu glabātuvei nepieciešama redis bibliotēka")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.max_history_length = max_history_length
+        self.ttl = ttl
+        self.prefix = prefix
+        self.context_prefix = context_prefix
+
+    def _key(self, user_id):
+        return f"{self.prefix}{user_id}"
+
+    def _context_key(self, user_id):
+        return f"{self.context_prefix}{user_id}"
+
+    def append(self, user_id, messages, context=None):
+        """
+        Pievieno ziņojumus sarunai, apgriež vēsturi un atjauno TTL vienā tīkla pieprasījumā
+
+        Args:
+            user_id (str): Lietotāja identifikators
+            messages (list): (loma, saturs) pāru saraksts
+            context (str, optional): Jauns meklēšanas konteksts, kas aizvieto iepriekšējo
+
+        Returns:
+            int: Ziņojumu skaits sarunā pirms pievienošanas
+        """
+        if not messages:
+            return len(self.get(user_id)[0])
+        key = self._key(user_id)
+        context_key = self._context_key(user_id)
+        now = time.time()
+        encoded = [json.dumps([role, content, now], ensure_ascii=False) for role, content in messages]
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.rpush(key, *encoded)
+        pipe.ltrim(key, -self.max_history_length, -1)
+        if context is not None:
+            pipe.set(context_key, context)
+        if self.ttl:
+            pipe.expire(key, self.ttl)
+            pipe.expire(context_key, self.ttl)
+        length = pipe.execute()[0]
+        return length - len(messages)
+
+    def get(self, user_id):
+        """
+        Atgriež sarunas ziņojumus
+
+        Args:
+            user_id (str): Lietotāja identifikators
+
+        Returns:
+            tuple: ((loma, saturs) pāru saraksts, pēdējais meklēšanas konteksts vai None)
+        """
+        pipe = self.client.pipeline(transaction=False)
+        pipe.lrange(self._key(user_id), 0, -1)
+        pipe.get(self._context_key(user_id))
+        items, context = pipe.execute()
+
+        messages = []
+        for item in items:
+            role, content, _ = json.loads(item)
+            messages.append((role, content))
+        return messages, context.decode("utf-8") if context is not None else None
+
+    def reset(self, user_id):
+        """
+        Izdzēš sarunas ziņojumus
+
+        Args:
+            user_id (str): Lietotāja identifikators
+
+        Returns:
+            bool: True, ja saruna eksistēja
+        """
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self._key(user_id))
+        pipe.delete(self._context_key(user_id))
+        return pipe.execute()[0] > 0
+
+def create_conversation_store(max_users, max_history_length, url=None, ttl=None, stripes=64):
+    """
+    Izveido sarunu glabātuvi atmiņā vai Redis serverī
+
+    Args:
+        max_users (int): Maksimālais sarunu skaits (tikai glabātuvei atmiņā)
+        max_history_length (int): Maksimālais ziņojumu skaits vienā sarunā
+        url (str, optional): Redis adrese; ja nav norādīta, sarunas tiek glabātas atmiņā
+        ttl (int, optional): Sarunas derīguma termiņš sekundēs (tikai Redis)
+        stripes (int): Slēdzeņu daļu skaits (tikai glabātuvei atmiņā)
+
+    Returns:
+        MemoryConversationStore vai RedisConversationStore: Glabātuves instance
+    """
+    if url:
+        return RedisConversationStore(url, max_history_length, ttl)
+    return MemoryConversationStore(max_users, max_history_length, stripes)
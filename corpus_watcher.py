@@ -0,0 +1,89 @@
+# corpus_watcher.py
+"""
+Korpusa izmaiņu novērošanas modulis.
+Fona pavediens periodiski pārbauda pdf_chunks_part* mapes (failu izmērus un izmaiņu laikus)
+un paziņo par pievienotajiem, mainītajiem un dzēstajiem failiem. Aptauja (polling) darbojas
+visās platformās un arī tīkla failu sistēmās, kur inotify notikumi netiek saņemti.
+"""
+import os
+import logging
+import threading
+from config import Config, get_folder_path
+from search_index import list_corpus_files
+
+logger = logging.getLogger(__name__)
+
+class CorpusWatcher:
+    """Periodiski salīdzina korpusa failu stāvokli un izsauc apstrādātāju ar mainītajiem failiem"""
+
+    def __init__(self, folders, callback, interval=Config.CORPUS_CHECK_INTERVAL):
+        """
+        Inicializē novērotāju un nolasa sākotnējo korpusa stāvokli
+
+        Args:
+            folders (list): Novērojamo mapju nosaukumi
+            callback (callable): Funkcija, ko izsauc ar mainīto failu kopu {(mape, nosaukums), ...}
+            interval (float): Pārbaudes intervāls sekundēs (0 vai mazāk - novērošana izslēgta)
+        """
+        self.folders = list(folders)
+        self.callback = callback
+        self.interval = interval
+        self._state = self._scan()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Palaiž novērošanas fona pavedienu"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="corpus-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Korpusa novērošana: {len(self.folders)} mapes ik pēc {self.interval:g}s")
+
+    def stop(self):
+        """Aptur novērošanu"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def check(self):
+        """
+        Vienreiz pārbauda korpusu un izsauc apstrādātāju, ja faili mainījušies.
+        Ja apstrādātājs izmet izņēmumu, stāvoklis netiek atjaunots un izmaiņas tiks paziņotas atkārtoti.
+
+        Returns:
+            set: Mainītie faili {(mape, nosaukums), ...}
+        """
+        state = self._scan()
+        changed = {path for path in state.keys() | self._state.keys() if state.get(path) != self._state.get(path)}
+        if changed:
+            logger.info(f"Korpusā mainījušies {len(changed)} faili")
+            self.callback(changed)
+        self._state = state
+        return changed
+
+    def _run(self):
+        """Novērošanas cikls"""
+        while not self._stopped.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Kļūda apstrādājot korpusa izmaiņas: {e}", exc_info=True)
+
+    def _scan(self):
+        """
+        Nolasa korpusa failu stāvokli
+
+        Returns:
+            dict: {(mape, nosaukums): (izmērs, izmaiņu laiks ns)}
+        """
+        state = {}
+        for folder, name in list_corpus_files(self.folders):
+            try:
+                stat = os.stat(os.path.join(get_folder_path(folder), name))
+            except FileNotFoundError:
+                # Fails izdzēsts starp mapes nolasīšanu un stat izsaukumu
+                continue
+            state[(folder, name)] = (stat.st_size, stat.st_mtime_ns)
+        return state
@@ -0,0 +1,378 @@
+# embeddings.py
+"""
+Semantiskās meklēšanas modulis.
+Fragmentu vektori tiek aprēķināti iepriekš ar lokālu CPU modeli (sentence-transformers)
+un saglabāti kvantizētā (float16 vai int8) matricā, ko ielādē ar mmap. Vaicājuma vektoram
+tuvākie fragmenti tiek atrasti ar vienu NumPy matricas-vektora reizinājumu.
+
+Vektoru faila izveide (pēc meklēšanas indeksa izveides):
+    python embeddings.py build [--output embeddings.bin] [--dtype int8]
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import zlib
+import struct
+import hashlib
+import logging
+import argparse
+from config import Config, get_folder_path
+from normalization import normalize_word, is_stop_word
+
+try:
+    import numpy as np
+except ImportError:  # Bez NumPy semantiskā meklēšana nav pieejama
+    np = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # Bez modeļa izmantojam jaucējvektorus (sk. HashingEmbedder)
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+# Vektoru faila formāts: maģiskā virkne, versija, metadatu (JSON) garums
+EMBEDDING_MAGIC = b"LVSEMB\0\0"
+EMBEDDING_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sII")
+# Rindu skaits vienā meklēšanas blokā (float32 bloks: 4096 × 384 dimensijas ≈ 6 MB)
+SEARCH_BLOCK_ROWS = 4096
+
+class HashingEmbedder:
+    """
+    Vektori bez ārēja modeļa: indeksa terminu un to rakstzīmju trigrammu jaucējvērtības
+    (feature hashing). Nesaprot sinonīmus, bet ļauj semantiskās meklēšanas ceļam darboties
+    bez papildu atkarībām un sakrīt ar vārdu daļām un locījumiem.
+    """
+
+    def __init__(self, dimensions=512):
+        """
+        Args:
+            dimensions (int): Vektora garums
+        """
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def embed(self, texts):
+        """
+        Aprēķina tekstu vektorus
+
+        Args:
+            texts (list): Teksti
+
+        Returns:
+            numpy.ndarray: float32 matrica (tekstu skaits × dimensions), rindas normalizētas
+        """
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                word = word.strip(".,;:!?()\"'«»—–-")
+                if not word or is_stop_word(word):
+                    continue
+                term = normalize_word(word)
+                self._add(vectors[row], term, 1.0)
+                padded = f" {term} "
+                for i in range(len(padded) - 2):
+                    self._add(vectors[row], padded[i:i + 3], 0.3)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _add(self, vector, feature, weight):
+        """Pieskaita pazīmi vektoram (zīme no jaucējvērtības samazina sadursmju ietekmi)"""
+        # crc32, nevis hash(), lai vektori nemainītos starp procesiem
+        hashed = zlib.crc32(feature.encode("utf-8"))
+        vector[hashed % self.dimensions] += weight if hashed & 0x80000000 else -weight
+
+class SentenceTransformerEmbedder:
+    """Lokāls sentence-transformers modelis uz CPU"""
+
+    def __init__(self, model_name):
+        """
+        Args:
+            model_name (str): Modeļa nosaukums vai ceļš (piem. paraphrase-multilingual-MiniLM-L12-v2)
+        """
+        if SentenceTransformer is None:
+            raise RuntimeError("Semantiskajam modelim nepieciešama sentence-transformers bibliotēka")
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = model_name
+        self.dimensions = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts):
+        """
+        Aprēķina tekstu vektorus
+
+        Args:
+            texts (list): Teksti
+
+        Returns:
+            numpy.ndarray: float32 matrica ar normalizētām rindām
+        """
+        return self.model.encode(list(texts), batch_size=32, normalize_embeddings=True,
+                                 convert_to_numpy=True, show_progress_bar=False).astype(np.float32)
+
+_embedder = None
+
+def get_embedder():
+    """
+    Atgriež konfigurēto vektoru modeli (ielādē vienreiz uz procesu)
+
+    Returns:
+        HashingEmbedder vai SentenceTransformerEmbedder: Modelis
+    """
+    global _embedder
+    if _embedder is None:
+        model_name = Config.EMBEDDING_MODEL
+        if model_name != "hashing" and SentenceTransformer is None:
+            logger.warning(f"sentence-transformers nav instalēts, modeļa {model_name} vietā izmantojam jaucējvektorus")
+            model_name = "hashing"
+        _embedder = HashingEmbedder() if model_name == "hashing" else SentenceTransformerEmbedder(model_name)
+        logger.info(f"Vektoru modelis: {_embedder.name}")
+    return _embedder
+
+class EmbeddingIndex:
+    """
+    Meklēšanas indeksa fragmentu vektori (rinda = dokumenta_id) kvantizētā matricā.
+
+    int8 gadījumā katrai rindai ir savs mērogs (rinda ≈ int8 vērtības × mērogs).
+    Katrai rindai saglabāta arī satura jaucējvērtība, lai pēc korpusa izmaiņām vektorus
+    varētu pārrēķināt tikai mainītajiem fragmentiem.
+    """
+
+    DTYPES = ("float16", "int8")
+
+    def __init__(self, buffer):
+        """
+        Ielādē vektorus no binārā bufera (bez kopēšanas)
+
+        Args:
+            buffer: bytes vai mmap objekts
+
+        Raises:
+            ValueError: Ja buferis nav derīgs vektoru fails
+        """
+        if len(buffer) < _HEADER.size:
+            raise ValueError("Vektoru fails ir pārāk īss")
+        magic, version, meta_length = _HEADER.unpack_from(buffer, 0)
+        if magic != EMBEDDING_MAGIC or version != EMBEDDING_FORMAT_VERSION:
+            raise ValueError("Nezināms vektoru faila formāts vai versija")
+
+        meta = json.loads(bytes(buffer[_HEADER.size:_HEADER.size + meta_length]).decode("utf-8"))
+        self._buffer = buffer
+        self.checksum = meta["checksum"]
+        self.model = meta["model"]
+        self.dtype = meta["dtype"]
+        count, dimensions = meta["count"], meta["dimensions"]
+
+        base = _align(_HEADER.size + meta_length)
+        self.keys = np.frombuffer(buffer, dtype=np.uint64, count=count, offset=base + meta["keys"])
+        self.scales = np.frombuffer(buffer, dtype=np.float32, count=count, offset=base + meta["scales"])
+        self.matrix = np.frombuffer(buffer, dtype=self.dtype, count=count * dimensions,
+                                    offset=base + meta["matrix"]).reshape(count, dimensions)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def compile(cls, index, embedder, dtype="float16", previous=None):
+        """
+        Aprēķina meklēšanas indeksa fragmentu vektorus un sakompilē tos binārā formātā
+
+        Args:
+            index (CorpusIndex): Meklēšanas indekss
+            embedder: Vektoru modelis
+            dtype (str): "float16" vai "int8"
+            previous (EmbeddingIndex, optional): Iepriekšējie vektori, ko izmantot nemainītiem fragmentiem
+
+        Returns:
+            bytes: Vektoru faila saturs
+        """
+        if dtype not in cls.DTYPES:
+            raise ValueError(f"Nezināms vektoru tips: {dtype}")
+        started = time.time()
+
+        contents = [index.content(doc_id) for doc_id in range(len(index.documents))]
+        keys = np.array([_content_key(content) for content in contents], dtype=np.uint64)
+
+        # Nemainītu fragmentu vektori tiek ņemti no iepriekšējā faila (ja modelis tas pats)
+        reused = {}
+        if previous is not None and previous.model == embedder.name:
+            rows = {int(key): row for row, key in enumerate(previous.keys)}
+            for doc_id, key in enumerate(keys.tolist()):
+                if key in rows:
+                    reused[doc_id] = previous.vector(rows[key])
+
+        missing = [doc_id for doc_id in range(len(contents)) if doc_id not in reused]
+        computed = embedder.embed([contents[doc_id] for doc_id in missing]) if missing else None
+        dimensions = embedder.dimensions
+
+        vectors = np.zeros((len(contents), dimensions), dtype=np.float32)
+        for doc_id, vector in reused.items():
+            vectors[doc_id] = vector
+        if computed is not None:
+            vectors[missing] = computed
+
+        if dtype == "int8":
+            scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127
+            matrix = np.round(vectors / scales[:, None]).astype(np.int8)
+        else:
+            scales = np.ones(len(vectors), dtype=np.float32)
+            matrix = vectors.astype(np.float16)
+
+        sections = [keys.tobytes(), scales.astype(np.float32).tobytes(), matrix.tobytes()]
+        layout = []
+        offset = 0
+        for section in sections:
+            layout.append(offset)
+            offset = _align(offset + len(section))
+        meta = {
+            "checksum": index.checksum,
+            "model": embedder.name,
+            "dtype": dtype,
+            "count": len(contents),
+            "dimensions": dimensions,
+            "keys": layout[0],
+            "scales": layout[1],
+            "matrix": layout[2]
+        }
+        meta_bytes = json.dumps(meta).encode("utf-8")
+        data = bytearray(_HEADER.pack(EMBEDDING_MAGIC, EMBEDDING_FORMAT_VERSION, len(meta_bytes)) + meta_bytes)
+        base = _align(len(data))
+        for section_offset, section in zip(layout, sections):
+            data.extend(b"\0" * (base + section_offset - len(data)))
+            data.extend(section)
+
+        logger.info(f"Vektori aprēķināti: {len(missing)} jauni, {len(reused)} no iepriekšējā faila, "
+                    f"{dimensions} dimensijas, {dtype}, {time.time() - started:.2f}s")
+        return bytes(data)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Ielādē vektoru failu ar mmap
+
+        Args:
+            path (str): Faila ceļš
+
+        Returns:
+            EmbeddingIndex: Vektori
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped)
+
+    @classmethod
+    def load_or_build(cls, index, path, embedder=None, dtype=None):
+        """
+        Ielādē vektoru failu, ja tas atbilst meklēšanas indeksam un modelim; citādi to pārrēķina
+        (izmantojot nemainīto fragmentu vektorus no novecojušā faila)
+
+        Args:
+            index (CorpusIndex): Meklēšanas indekss
+            path (str): Vektoru faila ceļš
+            embedder (optional): Vektoru modelis; pēc noklusējuma get_embedder()
+            dtype (str, optional): "float16" vai "int8"; pēc noklusējuma Config.EMBEDDING_DTYPE
+
+        Returns:
+            EmbeddingIndex: Vektori
+        """
+        embedder = embedder or get_embedder()
+        dtype = dtype or Config.EMBEDDING_DTYPE
+        previous = None
+        try:
+            previous = cls.load(path)
+            if (previous.checksum == index.checksum and previous.model == embedder.name
+                    and previous.dtype == dtype and len(previous) == len(index.documents)):
+                logger.info(f"Vektori ielādēti no {path}: {len(previous)} fragmenti")
+                return previous
+        except FileNotFoundError:
+            logger.info(f"Vektoru fails {path} nav atrasts, aprēķinām no jauna")
+        except (ValueError, OSError) as e:
+            logger.warning(f"Vektoru fails {path} nav derīgs ({e}), aprēķinām no jauna")
+
+        data = cls.compile(index, embedder, dtype, previous)
+        try:
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+            return cls.load(path)
+        except OSError as e:
+            logger.warning(f"Neizdevās saglabāt vektoru failu {path}: {e}")
+            return cls(data)
+
+    def vector(self, row):
+        """
+        Atgriež vienas rindas vektoru
+
+        Args:
+            row (int): Rindas (dokumenta) numurs
+
+        Returns:
+            numpy.ndarray: float32 vektors
+        """
+        return self.matrix[row].astype(np.float32) * self.scales[row]
+
+    def search(self, query_vector, k, rows=None):
+        """
+        Atrod k vaicājumam tuvākos fragmentus (kosinusa līdzība, pilna pārlase)
+
+        Args:
+            query_vector (numpy.ndarray): Normalizēts vaicājuma vektors
+            k (int): Rezultātu skaits
+            rows (numpy.ndarray, optional): Bool maska - kurus dokumentus drīkst atgriezt
+
+        Returns:
+            list: [(dokumenta_id, līdzība), ...] līdzības secībā
+        """
+        query_vector = query_vector.astype(np.float32)
+        similarities = np.empty(len(self), dtype=np.float32)
+        # NumPy float16/int8 reizinājumiem neizmanto BLAS (aptuveni 10 reizes lēnāk), tāpēc mmap
+        # matrica tiek pārvērsta float32 pa blokiem - atmiņā nekad nav visa atkvantizētā matrica.
+        # Rindas mērogs attiecas uz visu skalāro reizinājumu, tāpēc to piemēro līdzībām
+        for start in range(0, len(self), SEARCH_BLOCK_ROWS):
+            end = start + SEARCH_BLOCK_ROWS
+            similarities[start:end] = self.matrix[start:end].astype(np.float32) @ query_vector
+        similarities *= self.scales
+        if rows is not None:
+            similarities = np.where(rows, similarities, -np.inf)
+        k = min(k, len(similarities))
+        if k <= 0:
+            return []
+        candidates = np.argpartition(-similarities, k - 1)[:k]
+        candidates = candidates[np.argsort(-similarities[candidates])]
+        return [(int(doc_id), float(similarities[doc_id])) for doc_id in candidates
+                if np.isfinite(similarities[doc_id])]
+
+def _content_key(content):
+    """Satura 64 bitu jaucējvērtība vektoru atkārtotai izmantošanai"""
+    return int.from_bytes(hashlib.blake2b(content.encode("utf-8"), digest_size=8).digest(), "little")
+
+def _align(offset, boundary=8):
+    """Noapaļo nobīdi uz augšu līdz norādītajai robežai"""
+    return (offset + boundary - 1) // boundary * boundary
+
+def main(argv=None):
+    """Komandrindas rīks vektoru faila izveidei"""
+    from search_index import CorpusIndex
+
+    parser = argparse.ArgumentParser(description="Fragmentu vektoru aprēķināšana")
+    parser.add_argument("command", choices=["build"], help="Veicamā darbība")
+    parser.add_argument("--output", default=Config.EMBEDDING_INDEX_PATH, help="Vektoru faila ceļš")
+    parser.add_argument("--dtype", default=Config.EMBEDDING_DTYPE, choices=EmbeddingIndex.DTYPES)
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("Semantiskajai meklēšanai nepieciešams NumPy")
+        return 1
+    folders = Config.PRIMARY_FOLDERS + Config.COFOG_FOLDERS
+    index = CorpusIndex.load_or_build(folders, get_folder_path(Config.INDEX_PATH))
+    started = time.time()
+    embeddings = EmbeddingIndex.load_or_build(index, args.output, dtype=args.dtype)
+    print(f"Vektori saglabāti: {args.output} ({len(embeddings)} fragmenti, {embeddings.model}, "
+          f"{embeddings.dtype}, {time.time() - started:.2f}s)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,398 @@
+# http_client.py
+"""
+HTTP klienta modulis.
+Koplietojams savienojumu pūls GPT API pieprasījumiem ar keep-alive, atsevišķiem
+savienojuma/lasīšanas laika limitiem un atkārtojumiem ar nejaušu aizturi (jitter).
+Satur sinhrono (requests) un asinhrono (httpx) klientu.
+"""
+import time
+import random
+import asyncio
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+from config import Config
+from metrics import registry, UPSTREAM_SECONDS
+
+try:
+    import httpx
+except ImportError:  # httpx vajadzīgs tikai asinhronajam (ASGI) režīmam
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# Statusa kodi, pie kuriem pieprasījumu ir jēga atkārtot
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+def _is_connect_failure(error):
+    """
+    Pārbauda, vai requests savienojuma kļūda radusies pirms pieprasījuma nosūtīšanas
+
+    Args:
+        error (requests.exceptions.ConnectionError): Kļūda
+
+    Returns:
+        bool: True, ja savienojumu neizdevās izveidot (timeout, atteikts savienojums, DNS)
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    # requests ietin urllib3 MaxRetryError, kura reason ir sākotnējā kļūda
+    cause = error.args[0] if error.args else None
+    return isinstance(getattr(cause, "reason", cause), NewConnectionError)
+
+class _TimedHTTPConnection(HTTPConnection):
+    """HTTP savienojums, kura izveides laiks tiek pierakstīts metrikās"""
+
+    def connect(self):
+        with UPSTREAM_SECONDS.time(client=CompletionsClient.name, phase="connect"):
+            super().connect()
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    """HTTPS savienojums, kura izveides laiks (TCP un TLS) tiek pierakstīts metrikās"""
+
+    def connect(self):
+        with UPSTREAM_SECONDS.time(client=CompletionsClient.name, phase="connect"):
+            super().connect()
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class _RetryingClient:
+    """Kopīgā atkārtojumu politika un statistika sinhronajam un asinhronajam klientam"""
+
+    # Klienta nosaukums metriku iezīmēs
+    name = None
+
+    def __init__(self, api_url=None, api_key=None, pool_size=None, connect_timeout=None,
+                 read_timeout=None, max_retries=None, backoff=None):
+        """
+        Inicializē klienta iestatījumus
+
+        Args:
+            api_url (str, optional): API adrese; pēc noklusējuma Config.GPT_API_URL
+            api_key (str, optional): API atslēga; pēc noklusējuma Config.GPT_API_KEY
+            pool_size (int, optional): Maksimālais savienojumu skaits pūlā
+            connect_timeout (float, optional): Savienojuma izveides laika limits sekundēs
+            read_timeout (float, optional): Atbildes gaidīšanas laika limits sekundēs
+            max_retries (int, optional): Maksimālais atkārtojumu skaits
+            backoff (float, optional): Aiztures bāze sekundēs (dubultojas ar katru mēģinājumu)
+        """
+        self.api_url = api_url or Config.GPT_API_URL
+        self.pool_size = pool_size or Config.HTTP_POOL_SIZE
+        self.timeout = (connect_timeout or Config.HTTP_CONNECT_TIMEOUT,
+                        read_timeout or Config.HTTP_READ_TIMEOUT)
+        self.max_retries = Config.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = Config.HTTP_BACKOFF if backoff is None else backoff
+        self.headers = {
+            "Authorization": f"Bearer {api_key or Config.GPT_API_KEY}",
+            "Content-Type": "application/json"
+        }
+
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        """
+        Aprēķina aizturi pirms nākamā mēģinājuma
+
+        Args:
+            attempt (int): Mēģinājuma numurs (no 0)
+            retry_after (str, optional): Servera Retry-After galvene
+
+        Returns:
+            float: Aizture sekundēs
+        """
+        # Pilna nejaušā aizture: [0, backoff * 2^attempt]
+        delay = random.uniform(0, self.backoff * (2 ** attempt))
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.timeout[1]))
+            except ValueError:
+                pass
+        return delay
+
+    def _should_retry(self, status_code, attempt):
+        """
+        Nosaka, vai atbildi ar šo statusu vajag atkārtot, un uzskaita neveiksmes
+
+        Args:
+            status_code (int): Atbildes statusa kods
+            attempt (int): Mēģinājuma numurs (no 0)
+
+        Returns:
+            bool: True, ja pieprasījums jāatkārto
+        """
+        if status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+            logger.warning(f"API atbildēja ar {status_code}, atkārtojam pieprasījumu")
+            return True
+        if status_code != 200:
+            self._count_failure()
+        return False
+
+    def _request_started(self):
+        """Uzskaita jaunu aktīvu pieprasījumu"""
+        with self._lock:
+            self.in_flight += 1
+            self.requests += 1
+
+    def _request_finished(self):
+        """Uzskaita pabeigtu pieprasījumu"""
+        with self._lock:
+            self.in_flight -= 1
+
+    def _count_retry(self):
+        """Palielina atkārtojumu skaitītāju"""
+        with self._lock:
+            self.retries += 1
+
+    def _count_failure(self):
+        """Palielina neveiksmīgo pieprasījumu skaitītāju"""
+        with self._lock:
+            self.failures += 1
+
+    def register_metrics(self, registry):
+        """
+        Reģistrē klienta skaitītājus metrikās (nolasa pieprasījuma brīdī)
+
+        Args:
+            registry (MetricsRegistry): Metriku reģistrs
+        """
+        registry.register_callback("chatbot_upstream_in_flight", "gauge", "Aktīvie GPT API pieprasījumi",
+                                   lambda: self.in_flight, client=self.name)
+        registry.register_callback("chatbot_upstream_requests_total", "counter", "GPT API pieprasījumi",
+                                   lambda: self.requests, client=self.name)
+        registry.register_callback("chatbot_upstream_retries_total", "counter", "Atkārtotie GPT API pieprasījumi",
+                                   lambda: self.retries, client=self.name)
+        registry.register_callback("chatbot_upstream_failures_total", "counter", "Neveiksmīgie GPT API pieprasījumi",
+                                   lambda: self.failures, client=self.name)
+
+    def stats(self):
+        """
+        Atgriež klienta statistiku
+
+        Returns:
+            dict: Pieprasījumi, atkārtojumi, kļūdas un aktīvie pieprasījumi
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "in_flight": self.in_flight,
+                "pool_size": self.pool_size
+            }
+
+class CompletionsClient(_RetryingClient):
+    """Klients GPT API pieprasījumiem ar koplietojamu savienojumu pūlu"""
+
+    name = "sync"
+
+    def __init__(self, *args, **kwargs):
+        """Inicializē klientu un requests sesiju ar savienojumu pūlu (argumenti kā _RetryingClient)"""
+        super().__init__(*args, **kwargs)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        # Savienojumu izveides laiks tiek mērīts urllib3 savienojuma klasē
+        self.adapter.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool
+        }
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+    def post(self, payload, stream=False):
+        """
+        Nosūta pieprasījumu API, atkārtojot to pie 429/5xx un savienojuma kļūdām
+
+        Args:
+            payload (dict): Pieprasījuma JSON saturs
+            stream (bool): Vai atbildi lasīt pa daļām
+
+        Returns:
+            requests.Response: Pēdējā saņemtā atbilde
+
+        Raises:
+            requests.exceptions.RequestException: Ja savienojums neizdevās arī pēc atkārtojumiem
+        """
+        attempt = 0
+        self._request_started()
+        try:
+            while True:
+                try:
+                    response = self.session.post(self.api_url, json=payload, timeout=self.timeout, stream=stream)
+                except requests.exceptions.ConnectionError as e:
+                    # Atkārto tikai, ja savienojums netika izveidots. Lasīšanas timeout un pārtraukts
+                    # savienojums pēc pieprasījuma nosūtīšanas netiek atkārtoti - API varētu jau ģenerēt
+                    # (un iekasēt) atbildi
+                    if attempt >= self.max_retries or not _is_connect_failure(e):
+                        self._count_failure()
+                        raise
+                    logger.warning(f"Savienojuma kļūda ({e}), atkārtojam pieprasījumu")
+                    delay = self._backoff_delay(attempt)
+                else:
+                    # requests elapsed: no pieprasījuma sākuma līdz atbildes galvenēm (ar savienojuma izveidi)
+                    UPSTREAM_SECONDS.observe(response.elapsed.total_seconds(), client=self.name, phase="ttfb")
+                    if not self._should_retry(response.status_code, attempt):
+                        return response
+                    delay = self._backoff_delay(attempt, response.headers.get("Retry-After"))
+                    response.close()
+
+                attempt += 1
+                self._count_retry()
+                time.sleep(delay)
+        finally:
+            self._request_finished()
+
+    def register_metrics(self, registry):
+        """
+        Reģistrē klienta un savienojumu pūla skaitītājus metrikās (nolasa pieprasījuma brīdī)
+
+        Args:
+            registry (MetricsRegistry): Metriku reģistrs
+        """
+        super().register_metrics(registry)
+        registry.register_callback("chatbot_upstream_connections_opened_total", "counter",
+                                   "Atvērtie GPT API savienojumi",
+                                   lambda: self._pool_stats()[0], client=self.name)
+        registry.register_callback("chatbot_upstream_pooled_requests_total", "counter",
+                                   "Pieprasījumi caur savienojumu pūlu",
+                                   lambda: self._pool_stats()[1], client=self.name)
+
+    def _pool_stats(self):
+        """
+        Returns:
+            tuple: (atvērto savienojumu skaits, pieprasījumu skaits caur pūlu)
+        """
+        connections = 0
+        pooled_requests = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            pooled_requests += pool.num_requests
+        return connections, pooled_requests
+
+    def stats(self):
+        """
+        Atgriež klienta un savienojumu pūla statistiku
+
+        Returns:
+            dict: Pieprasījumi, atkārtojumi, kļūdas, aktīvie pieprasījumi un pūla dati
+        """
+        connections, pooled_requests = self._pool_stats()
+        stats = super().stats()
+        stats.update({
+            "connections_opened": connections,
+            "pooled_requests": pooled_requests
+        })
+        return stats
+
+class AsyncCompletionsClient(_RetryingClient):
+    """Asinhronais klients GPT API pieprasījumiem (httpx), daudziem vienlaicīgiem pieprasījumiem"""
+
+    name = "async"
+
+    def __init__(self, *args, **kwargs):
+        """Inicializē klientu (argumenti kā _RetryingClient); httpx klients tiek izveidots pie pirmā pieprasījuma"""
+        if httpx is None:
+            raise RuntimeError("Asinhronajam klientam nepieciešama httpx bibliotēka")
+        kwargs.setdefault("pool_size", Config.ASYNC_HTTP_POOL_SIZE)
+        super().__init__(*args, **kwargs)
+        self._client = None
+
+    @property
+    def client(self):
+        """httpx.AsyncClient ar keep-alive savienojumu pūlu"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+        return self._client
+
+    async def post(self, payload, stream=False):
+        """
+        Nosūta pieprasījumu API, atkārtojot to pie 429/5xx un savienojuma kļūdām
+
+        Args:
+            payload (dict): Pieprasījuma JSON saturs
+            stream (bool): Vai atbildi lasīt pa daļām (tad izsaucējam jāizsauc response.aclose())
+
+        Returns:
+            httpx.Response: Pēdējā saņemtā atbilde
+
+        Raises:
+            httpx.HTTPError: Ja savienojums neizdevās arī pēc atkārtojumiem
+        """
+        attempt = 0
+        self._request_started()
+        try:
+            while True:
+                try:
+                    # httpcore trace notikumi dod savienojuma izveides un pirmā atbildes baita laiku
+                    extensions = {"trace": self._trace()} if registry.enabled else None
+                    request = self.client.build_request("POST", self.api_url, json=payload, extensions=extensions)
+                    response = await self.client.send(request, stream=stream)
+                except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                    if attempt >= self.max_retries:
+                        self._count_failure()
+                        raise
+                    logger.warning(f"Savienojuma kļūda ({e}), atkārtojam pieprasījumu")
+                    delay = self._backoff_delay(attempt)
+                else:
+                    if not self._should_retry(response.status_code, attempt):
+                        return response
+                    delay = self._backoff_delay(attempt, response.headers.get("Retry-After"))
+                    await response.aclose()
+
+                attempt += 1
+                self._count_retry()
+                await asyncio.sleep(delay)
+        finally:
+            self._request_finished()
+
+    def _trace(self):
+        """
+        Izveido httpcore trace apstrādātāju vienam pieprasījumam
+
+        Returns:
+            callable: Asinhronā funkcija (notikuma nosaukums, informācija)
+        """
+        started = time.perf_counter()
+        connecting = []
+
+        async def trace(event_name, info):
+            now = time.perf_counter()
+            if event_name == "connection.connect_tcp.started":
+                connecting.append(now)
+            elif event_name.endswith(".send_request_headers.started") and connecting:
+                # Savienojums (TCP un TLS) gatavs - sākas pieprasījuma sūtīšana
+                UPSTREAM_SECONDS.observe(now - connecting.pop(), client=self.name, phase="connect")
+            elif event_name.endswith(".receive_response_headers.complete"):
+                UPSTREAM_SECONDS.observe(now - started, client=self.name, phase="ttfb")
+
+        return trace
+
+    async def aclose(self):
+        """Aizver savienojumu pūlu"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+# Izveidojam koplietojamo klientu, kad modulis tiek importēts
+completions_client = CompletionsClient()
+completions_client.register_metrics(registry)
@@ -0,0 +1,201 @@
+# logging_setup.py
+"""
+Reģistrēšanas (logging) konfigurācijas modulis.
+Pieprasījumu pavedieni ierakstus tikai ievieto rindā (QueueHandler); failā (ar rotāciju pēc
+izmēra) un konsolē tos raksta atsevišķs fona pavediens (QueueListener), tāpēc diska
+rakstīšana nebloķē pieprasījumus. Katram ierakstam tiek pievienots pieprasījuma ID
+(contextvars - darbojas pavedienos, asyncio uzdevumos un eventlet zaļajos pavedienos).
+
+Ar eventlet monkey_patch fona pavediens un rinda ir īsti OS objekti, nevis zaļie -
+faila rakstīšana nebloķē eventlet notikumu ciklu.
+"""
+import json
+import uuid
+import atexit
+import logging
+import importlib
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+try:
+    from eventlet import patcher as eventlet_patcher
+except ImportError:
+    eventlet_patcher = None
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+# Pašreizējā pieprasījuma ID ("-" ārpus pieprasījumiem)
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+def new_request_id(candidate=None):
+    """
+    Args:
+        candidate (str, optional): Klienta norādītais ID (X-Request-ID); tiek izmantots, ja tas ir
+                                   īss un satur tikai burtus, ciparus un domuzīmes
+
+    Returns:
+        str: Pieprasījuma ID (jauns - 12 heksadecimālas zīmes)
+    """
+    if candidate and len(candidate) <= 64 and candidate.replace("-", "").isalnum() and candidate.isascii():
+        return candidate
+    return uuid.uuid4().hex[:12]
+
+@contextmanager
+def request_context(request_id=None):
+    """
+    Konteksta pārvaldnieks, kura laikā visiem ierakstiem tiek pievienots pieprasījuma ID
+
+    Args:
+        request_id (str, optional): Pieprasījuma ID (nederīgs vai tukšs - jauns)
+
+    Yields:
+        str: Pieprasījuma ID
+    """
+    request_id = new_request_id(request_id)
+    token = request_id_var.set(request_id)
+    try:
+        yield request_id
+    finally:
+        request_id_var.reset(token)
+
+class JsonFormatter(logging.Formatter):
+    """Formatē ierakstus kā vienrindas JSON objektus"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "thread": record.threadName
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+    def formatTime(self, record, datefmt=None):
+        """ISO 8601 laiks ar milisekundēm"""
+        return super().formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}"
+
+# Traceback teksts tiek sagatavots izsaucēja pavedienā (traceback objektus nevar nodot tālāk)
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+class _RequestQueueHandler(QueueHandler):
+    """Ievieto ierakstus rindā kopā ar pieprasījuma ID (nolasa izsaucēja kontekstā)"""
+
+    def prepare(self, record):
+        """
+        Sagatavo ierakstu nodošanai citam pavedienam: ziņojums un izņēmuma teksts tiek
+        aprēķināti šeit, bet formatēšana (teksts vai JSON) paliek fona pavedienam
+
+        Args:
+            record (LogRecord): Ieraksts
+
+        Returns:
+            LogRecord: Tas pats ieraksts bez argumentiem un traceback objekta (kā QueueHandler.prepare)
+        """
+        record.request_id = request_id_var.get()
+        record.msg = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+        record.args = None
+        record.exc_info = None
+        return record
+
+class _NativeQueueListener(QueueListener):
+    """QueueListener, kura pavediens ir īsts OS pavediens arī ar eventlet monkey_patch"""
+
+    def start(self):
+        self._thread = thread = _native("threading").Thread(target=self._monitor, name="logging", daemon=True)
+        thread.start()
+
+def _native(module_name):
+    """
+    Atgriež standarta bibliotēkas moduli bez eventlet izmaiņām (ja eventlet aizstājis moduli)
+
+    Args:
+        module_name (str): Moduļa nosaukums ("threading", "queue")
+
+    Returns:
+        module: Modulis
+    """
+    if eventlet_patcher is not None and eventlet_patcher.is_monkey_patched("thread"):
+        return eventlet_patcher.original(module_name)
+    return importlib.import_module(module_name)
+
+def parse_levels(spec):
+    """
+    Nolasa moduļu reģistrēšanas līmeņus
+
+    Args:
+        spec (str): "modulis=LĪMENIS" pāri, atdalīti ar komatu (piem. "search=WARNING,http_client=DEBUG")
+
+    Returns:
+        dict: {moduļa nosaukums: līmenis}
+    """
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+_listener = None
+
+def configure_logging(level="INFO", log_file="app.log", log_format="text", max_bytes=10 * 1024 * 1024,
+                      backup_count=5, module_levels=""):
+    """
+    Konfigurē saknes reģistrētāju: rinda pieprasījumu pavedienos, fails un konsole fona pavedienā
+
+    Args:
+        level (str): Saknes reģistrēšanas līmenis
+        log_file (str): Žurnāla fails (tukšs - tikai konsole)
+        log_format (str): "text" vai "json"
+        max_bytes (int): Faila izmērs, pēc kura tas tiek rotēts (0 - bez rotācijas)
+        backup_count (int): Saglabājamo rotēto failu skaits
+        module_levels (str): Moduļu līmeņi (sk. parse_levels)
+
+    Returns:
+        QueueListener: Fona pavediena klausītājs
+    """
+    global _listener
+
+    formatter = JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                            encoding="utf-8", delay=True))
+    native_threading = _native("threading")
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        # Apstrādātāji darbojas tikai fona pavedienā - tiem vajadzīga OS pavedienu slēdzene
+        handler.lock = native_threading.RLock()
+
+    # Rinda bez ierobežojuma: ievietošana nekad negaida
+    log_queue = _native("queue").SimpleQueue()
+    root = logging.getLogger()
+    if _listener is not None:
+        _listener.stop()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_RequestQueueHandler(log_queue))
+    root.setLevel(level.upper())
+    for name, module_level in parse_levels(module_levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = _NativeQueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def shutdown_logging():
+    """Ieraksta rindā palikušos ierakstus un aptur fona pavedienu"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,276 @@
+# metrics.py
+"""
+Veiktspējas metriku modulis.
+Apstrādes posmu (klasifikācija, meklēšana pa mapēm, konteksta veidošana, GPT API pieprasījums,
+Socket.IO sūtīšana) izpildes laiku histogrammas un skaitītāji Prometheus teksta formātā (/metrics).
+Esošo komponenšu skaitītāji (kešatmiņas trāpījumi, aktīvās sarunas, aktīvie API pieprasījumi)
+tiek nolasīti tikai metriku pieprasījuma brīdī.
+
+Ja Config.METRICS_ENABLED ir izslēgts, laika mērīšana ir tukša operācija (viens nosacījums).
+"""
+import time
+import logging
+import threading
+from bisect import bisect_left
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Histogrammu robežas sekundēs: no sub-milisekunžu meklēšanas līdz API atbildēm
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+class _NullTimer:
+    """Laika mērītājs, kas neko nedara (metrikas izslēgtas)"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    """Mēra bloka izpildes laiku un pieraksta to histogrammā"""
+
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+class Histogram:
+    """Vērtību sadalījums pa robežām (Prometheus histogram) ar iezīmēm"""
+
+    kind = "histogram"
+
+    def __init__(self, registry, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Args:
+            registry (MetricsRegistry): Reģistrs
+            name (str): Metrikas nosaukums
+            help (str): Apraksts
+            labelnames (tuple): Iezīmju nosaukumi
+            buckets (tuple): Augošas robežas
+        """
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """
+        Pieraksta vērtību
+
+        Args:
+            value (float): Vērtība (sekundēs)
+            **labels: Iezīmju vērtības
+        """
+        if not self.registry.enabled:
+            return
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [skaits katrā robežā (+Inf pēdējā), summa, kopskaits]
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, **labels):
+        """
+        Konteksta pārvaldnieks bloka izpildes laika mērīšanai
+
+        Args:
+            **labels: Iezīmju vērtības
+
+        Returns:
+            Konteksta pārvaldnieks
+        """
+        if not self.registry.enabled:
+            return _NULL_TIMER
+        return _Timer(self, labels)
+
+    def samples(self):
+        """
+        Returns:
+            list: [(nosaukuma sufikss, iezīmes, vērtība), ...] Prometheus formātam
+        """
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        samples = []
+        for key, counts, total, count in sorted(series):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append(("_bucket", dict(labels, le=_format_value(bound)), cumulative))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, count))
+        return samples
+
+class Counter:
+    """Augošs skaitītājs ar iezīmēm"""
+
+    kind = "counter"
+
+    def __init__(self, registry, name, help, labelnames=()):
+        """
+        Args:
+            registry (MetricsRegistry): Reģistrs
+            name (str): Metrikas nosaukums
+            help (str): Apraksts
+            labelnames (tuple): Iezīmju nosaukumi
+        """
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """
+        Palielina skaitītāju
+
+        Args:
+            amount (float): Pieaugums
+            **labels: Iezīmju vērtības
+        """
+        if not self.registry.enabled:
+            return
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        """
+        Returns:
+            list: [(nosaukuma sufikss, iezīmes, vērtība), ...] Prometheus formātam
+        """
+        with self._lock:
+            values = sorted(self._values.items())
+        return [("", dict(zip(self.labelnames, key)), value) for key, value in values]
+
+class _CallbackMetric:
+    """Metrika, kuras vērtības tiek nolasītas no komponentēm pieprasījuma brīdī"""
+
+    def __init__(self, name, kind, help):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.callbacks = []
+
+    def samples(self):
+        samples = []
+        for labels, callback in self.callbacks:
+            try:
+                samples.append(("", labels, callback()))
+            except Exception as e:
+                logger.warning(f"Neizdevās nolasīt metriku {self.name}: {e}")
+        return samples
+
+class MetricsRegistry:
+    """Metriku reģistrs un Prometheus teksta formāta izvade"""
+
+    def __init__(self, enabled=False):
+        """
+        Args:
+            enabled (bool): Vai mērīt izpildes laikus un skaitīt notikumus
+        """
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Izveido un reģistrē histogrammu"""
+        return self._register(Histogram(self, name, help, labelnames, buckets))
+
+    def counter(self, name, help, labelnames=()):
+        """Izveido un reģistrē skaitītāju"""
+        return self._register(Counter(self, name, help, labelnames))
+
+    def register_callback(self, name, kind, help, callback, **labels):
+        """
+        Reģistrē metriku, kuras vērtību nolasa pieprasījuma brīdī (vairākas reģistrācijas ar vienu
+        nosaukumu un atšķirīgām iezīmēm veido vienu metriku)
+
+        Args:
+            name (str): Metrikas nosaukums
+            kind (str): "gauge" vai "counter"
+            help (str): Apraksts
+            callback (callable): Funkcija bez argumentiem, kas atgriež skaitli
+            **labels: Iezīmju vērtības
+        """
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = _CallbackMetric(name, kind, help)
+            metric.callbacks.append((labels, callback))
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metrika {metric.name} jau reģistrēta")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        """
+        Returns:
+            str: Visas metrikas Prometheus teksta formātā (versija 0.0.4)
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+def _format_labels(labels):
+    """Formatē iezīmes Prometheus formātā"""
+    if not labels:
+        return ""
+    escaped = (f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_value(value):
+    """Formatē skaitli Prometheus formātā"""
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+# Koplietojamais reģistrs un lietotnes metrikas
+registry = MetricsRegistry(Config.METRICS_ENABLED)
+
+STAGE_SECONDS = registry.histogram(
+    "chatbot_stage_seconds", "Apstrādes posmu izpildes laiks (classify, search, context, emit)", ("stage",))
+SEARCH_FOLDER_SECONDS = registry.histogram(
+    "chatbot_search_folder_seconds", "Vienas mapes fragmentu novērtēšanas laiks", ("folder",))
+UPSTREAM_SECONDS = registry.histogram(
+    "chatbot_upstream_seconds", "GPT API pieprasījuma laiks pa fāzēm (connect, ttfb, total)", ("client", "phase"))
+MESSAGES_TOTAL = registry.counter(
+    "chatbot_messages_total", "Apstrādātie ziņojumi pēc maršruta", ("route",))
@@ -0,0 +1,106 @@
+# normalization.py
+"""
+Teksta normalizācijas modulis.
+Vienādi tiek pielietots indeksēšanas un vaicājuma laikā: stop-vārdu izmešana, vienkāršots
+latviešu valodas galotņu celmotājs un (pēc izvēles) garumzīmju un mīkstinājuma zīmju noņemšana,
+lai "ēdināšanas", "ēdināšanu" un "edinasana" būtu viens un tas pats termins.
+"""
+from functools import lru_cache
+from config import Config
+
+# Bieži vārdi, kas neraksturo fragmenta saturu (latviešu un angļu - COFOG rokasgrāmatai)
+STOP_WORDS = frozenset("""
+    un vai ar par uz no pie pēc līdz bez pret starp zem virs caur ap aiz pa
+    kā kas kur kad ko kam kāds kāda kādi kādas kādu kurš kura kuri kuras kuru kurā kurās kuros
+    ir nav bija būs būt tiek tika tiks var varu vari
+    to tā tas tie tās tai tam tiem šo šī šis šie šīs šajā šajos
+    arī jā ne nu gan bet jo ka lai tikai vēl ja tad kā
+    es tu viņš viņa mēs jūs viņi man mani tev tevi mums jums sev savu sava savs savas
+    the of and or to in a an for on by is are was be been as with at from this that these it its not
+""".split())
+
+# Garumzīmes un mīkstinājuma zīmes → pamata burti
+_DIACRITICS = str.maketrans("āčēģīķļņōŗšūž", "acegiklnorsuz")
+
+# Stop-vārdi arī bez garumzīmēm ("ka" un "kā" lietotāji bieži neatšķir)
+_STOP_WORDS = STOP_WORDS | {word.translate(_DIACRITICS) for word in STOP_WORDS}
+
+# Locījumu un darbības vārdu galotnes garākās vispirms; tiek noņemta viena, garākā atbilstošā
+_SUFFIXES = tuple(sorted((
+    "ajiem", "ajām", "ajās", "ajai", "ajam", "ajos", "ajā",
+    "iem", "ais",
+    "ām", "ās", "ēm", "ēs", "īm", "īs", "ūm", "ūs",
+    "ai", "am", "as", "ei", "em", "es", "ie", "im", "is", "os", "um", "us",
+    "īt", "ēt", "āt",
+    "a", "ā", "e", "ē", "i", "ī", "o", "u", "s", "š"
+), key=len, reverse=True))
+
+# Īsākais celms, ko celmotājs atstāj (īsiem vārdiem galotne netiek noņemta)
+MIN_STEM_LENGTH = 3
+
+def fold_diacritics(text):
+    """
+    Aizstāj latviešu garumzīmes un mīkstinājuma zīmes ar pamata burtiem
+
+    Args:
+        text (str): Teksts
+
+    Returns:
+        str: Teksts bez diakritiskajām zīmēm
+    """
+    return text.translate(_DIACRITICS)
+
+def stem(word):
+    """
+    Noņem vārdam latviešu valodas locījuma galotni
+
+    Args:
+        word (str): Vārds mazajiem burtiem
+
+    Returns:
+        str: Vārda celms (skaitļi un vārdi ar cipariem netiek mainīti)
+    """
+    if not word.isalpha():
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+def is_stop_word(word):
+    """
+    Nosaka, vai vārds ir stop-vārds
+
+    Args:
+        word (str): Vārds mazajiem burtiem
+
+    Returns:
+        bool: True, ja vārds netiek indeksēts
+    """
+    return word in _STOP_WORDS
+
+@lru_cache(maxsize=65536)
+def normalize_word(word):
+    """
+    Pārveido vārdu indeksa terminā (Config.STEMMING un Config.FOLD_DIACRITICS)
+
+    Args:
+        word (str): Vārds mazajiem burtiem
+
+    Returns:
+        str: Indeksa termins
+    """
+    if Config.STEMMING:
+        word = stem(word)
+    if Config.FOLD_DIACRITICS:
+        word = fold_diacritics(word)
+    return word
+
+def signature():
+    """
+    Normalizācijas iestatījumu apraksts; indekss, kas veidots ar citiem iestatījumiem, nav derīgs
+
+    Returns:
+        str: Iestatījumu paraksts
+    """
+    return f"lv-stem-1/stem={int(Config.STEMMING)}/fold={int(Config.FOLD_DIACRITICS)}"
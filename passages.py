@@ -0,0 +1,214 @@
+# passages.py
+"""
+Fragmentu sadalīšanas modulis.
+pdf_chunks_part* faili ir secīgi ~1000 simbolu gabali no PDF dokumentiem, sagriezti neatkarīgi
+no satura. Šis modulis atjauno avota dokumentus no gabaliem un sadala tos fragmentos (passages)
+pa struktūras robežām: koda virsraksts, "Kodā X.XXX uzskaita:", "Neuzskaita:" un COFOG virsraksti.
+Katram fragmentam ir stabils identifikators un (ja zināms) kods, kuram tas pieder.
+"""
+import os
+import re
+import bisect
+import logging
+from config import Config, get_folder_path
+
+logger = logging.getLogger(__name__)
+
+# Gabala faila nosaukums: <avots>_chunk_<numurs>.txt
+CHUNK_NAME_PATTERN = re.compile(r'^(?P<source>.+)_chunk_(?P<number>\d+)\.txt$')
+
+# Struktūras robežas avota tekstā (oriģinālajā reģistrā)
+PASSAGE_BOUNDARY_PATTERN = re.compile(
+    # MK noteikumi Nr. 934: koda virsraksts atsevišķā rindā, kam seko nosaukums (ar lielo burtu
+    # vai "(svītrots ..."), nevis teikuma turpinājums pēc koda pārnesuma, definīcija un izņēmumi
+    r'^[ \t]*(?P<heading>\d{2}\.\d{3})[ \t]*$(?=\n[ \t]*[(A-ZĀČĒĢĪĶĻŅŠŪŽ])'
+    r'|^[ \t]*Kodā\s+(?P<defined>\d{2}\.\d{3})\s+uzskaita'
+    r'|^[ \t]*(?P<exclusion>Neuzskaita)[ \t]*:'
+    # COFOG: grupas virsraksts lielajiem burtiem ("09.6 SUBSIDIARY SERVICES TO EDUCATION")
+    r'|^[ \t]*(?P<group>\d{2}\.\d(?:\.\d)?)[ \t]+(?=[A-Z])[A-Z0-9 ,&()/\-.]+$'
+    # COFOG rokasgrāmatas nodaļas ("4.5.3.  Statistical units"), bet ne satura rādītāja rindas
+    r'|^[ \t]*(?P<section>\d{1,2}(?:\.\d{1,2})+)\.[ \t]+[A-Z](?:(?!\.[ ]?\.[ ]?\.).)*$',
+    re.MULTILINE
+)
+
+# Fragmentu veidi
+KIND_TEXT = "text"              # teksts ārpus kodu sadaļām (ievads, pielikumi)
+KIND_DEFINITION = "definition"  # koda virsraksts un "Kodā X.XXX uzskaita:" sadaļa
+KIND_EXCLUDED = "excluded"      # koda "Neuzskaita:" sadaļa
+KIND_SECTION = "section"        # COFOG grupa vai rokasgrāmatas nodaļa
+
+class Passage:
+    """Viens meklēšanas fragments (ar __slots__, jo korpusā to ir tūkstošiem)"""
+
+    __slots__ = ("id", "source", "folder", "file", "code", "kind", "text")
+
+    def __init__(self, passage_id, source, folder, file, code, kind, text):
+        """
+        Args:
+            passage_id (str): Stabils identifikators: "<avots>#<kods vai ->/<veids>/<kārtas nr.>"
+            source (str): Avota dokumenta nosaukums
+            folder (str): Mape, kurā atrodas fragmenta sākums
+            file (str): Gabala fails (relatīvs ceļš), kurā atrodas fragmenta sākums
+            code (str): Kods, kuram fragments pieder, vai None
+            kind (str): Fragmenta veids (KIND_*)
+            text (str): Fragmenta teksts
+        """
+        self.id = passage_id
+        self.source = source
+        self.folder = folder
+        self.file = file
+        self.code = code
+        self.kind = kind
+        self.text = text
+
+def parse_chunk_name(name):
+    """
+    Nosaka gabala faila avotu un kārtas numuru
+
+    Args:
+        name (str): Faila nosaukums
+
+    Returns:
+        tuple: (avota nosaukums, gabala numurs); fails, kas nav sagriezts gabalos, ir atsevišķs avots
+    """
+    match = CHUNK_NAME_PATTERN.match(name)
+    if match:
+        return match.group("source"), int(match.group("number"))
+    return os.path.splitext(name)[0], 0
+
+def group_sources(files):
+    """
+    Sagrupē gabalu failus pa avota dokumentiem
+
+    Args:
+        files (list): [(mapes nosaukums, faila nosaukums), ...] (sk. search_index.list_corpus_files)
+
+    Returns:
+        dict: {avots: [(gabala numurs, mape, faila nosaukums), ...]} gabalu secībā, avotu parādīšanās secībā
+    """
+    sources = {}
+    for folder, name in files:
+        source, number = parse_chunk_name(name)
+        chunks = sources.setdefault(source, {})
+        # Tas pats gabals var atkārtoties blakus mapēs (mapju robeža) - izmantojam pirmo
+        chunks.setdefault(number, (folder, name))
+    return {
+        source: [(number,) + chunks[number] for number in sorted(chunks)]
+        for source, chunks in sources.items()
+    }
+
+def split_source(source, chunks, max_chars=None):
+    """
+    Atjauno avota tekstu no gabaliem un sadala to fragmentos
+
+    Args:
+        source (str): Avota dokumenta nosaukums
+        chunks (list): [(gabala numurs, mape, faila nosaukums), ...] gabalu secībā
+        max_chars (int, optional): Maksimālais fragmenta garums; pēc noklusējuma Config.PASSAGE_MAX_CHARS
+
+    Returns:
+        list: Passage objektu saraksts teksta secībā
+    """
+    max_chars = max_chars or Config.PASSAGE_MAX_CHARS
+
+    parts = []
+    starts = []
+    locations = []
+    length = 0
+    for _, folder, name in chunks:
+        file_path = os.path.join(get_folder_path(folder), name)
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except Exception as e:
+            logger.error(f"Kļūda lasot failu {file_path}: {e}", exc_info=True)
+            continue
+        starts.append(length)
+        locations.append((folder, f"{folder}/{name}"))
+        parts.append(content)
+        length += len(content)
+    text = "".join(parts)
+    if not text:
+        return []
+
+    passages = []
+    ordinals = {}
+    for start, end, code, kind in _segments(text):
+        for piece_start, piece_end in _split_long(text, start, end, max_chars):
+            piece = text[piece_start:piece_end].strip()
+            if not piece:
+                continue
+            ordinal = ordinals.get((code, kind), 0)
+            ordinals[(code, kind)] = ordinal + 1
+            folder, file = locations[bisect.bisect_right(starts, piece_start) - 1]
+            passages.append(Passage(f"{source}#{code or '-'}/{kind}/{ordinal}", source, folder, file,
+                                    code, kind, piece))
+    return passages
+
+def split_corpus(files, max_chars=None):
+    """
+    Sadala visu korpusu fragmentos
+
+    Args:
+        files (list): [(mapes nosaukums, faila nosaukums), ...]
+        max_chars (int, optional): Maksimālais fragmenta garums
+
+    Returns:
+        list: Passage objektu saraksts (avotu un teksta secībā)
+    """
+    passages = []
+    for source, chunks in group_sources(files).items():
+        passages.extend(split_source(source, chunks, max_chars))
+    return passages
+
+def _segments(text):
+    """
+    Atrod struktūras sadaļas avota tekstā
+
+    Args:
+        text (str): Avota teksts
+
+    Yields:
+        tuple: (sākums, beigas, kods vai None, veids)
+    """
+    start, code, kind = 0, None, KIND_TEXT
+    for match in PASSAGE_BOUNDARY_PATTERN.finditer(text):
+        if match.group("heading"):
+            new_code, new_kind = match.group("heading"), KIND_DEFINITION
+        elif match.group("defined"):
+            # Definīcija parasti seko sava koda virsrakstam - tad tā ir tās pašas sadaļas daļa
+            if kind == KIND_DEFINITION and code == match.group("defined"):
+                continue
+            new_code, new_kind = match.group("defined"), KIND_DEFINITION
+        elif match.group("exclusion"):
+            new_code, new_kind = code, KIND_EXCLUDED
+        elif match.group("group"):
+            new_code, new_kind = match.group("group"), KIND_SECTION
+        else:
+            new_code, new_kind = None, KIND_SECTION
+
+        if match.start() > start:
+            yield start, match.start(), code, kind
+        start, code, kind = match.start(), new_code, new_kind
+    yield start, len(text), code, kind
+
+def _split_long(text, start, end, max_chars):
+    """
+    Sadala pārāk garu sadaļu daļās pa rindu robežām
+
+    Args:
+        text (str): Avota teksts
+        start (int): Sadaļas sākums
+        end (int): Sadaļas beigas
+        max_chars (int): Maksimālais daļas garums
+
+    Yields:
+        tuple: (daļas sākums, daļas beigas)
+    """
+    while end - start > max_chars:
+        cut = text.rfind("\n", start + 1, start + max_chars)
+        if cut <= start:
+            cut = start + max_chars
+        yield start, cut
+        start = cut
+    yield start, end
@@ -0,0 +1,324 @@
+# profiling.py
+"""
+Pieprasījumu profilēšanas modulis.
+Daļa (/chat un Socket.IO) pieprasījumu tiek izpildīta ar cProfile no ieejas punkta līdz atbildes
+beigām (arī GPT API gaidīšana un atbildes nosūtīšana), un lēnāko N pieprasījumu profili tiek
+saglabāti direktorijā (ātrāki profili tiek dzēsti). Faila nosaukumā ir izpildes laiks un
+vaicājuma teksta jaucējvērtība (pats teksts netiek saglabāts), blakus - JSON apraksts.
+
+Sinhronajā serverī (app.py) pieprasījums aizņem vienu pavedienu, un tas tiek profilēts pilnībā.
+Asinhronajā serverī (asgi.py) notikumu ciklā vienlaikus darbojas citi pieprasījumi, tāpēc tur
+izpildes laiks ir visam pieprasījumam, bet cProfile - tikai tā darbam pavedienu pūlā
+(meklēšana, sarunu glabātuve, atbilžu kešatmiņa; sk. RequestProfiler.call).
+
+Saglabāto profilu apskate: python profiling.py [--limit 20] [fails.prof]
+"""
+import os
+import sys
+import json
+import time
+import heapq
+import pstats
+import random
+import hashlib
+import logging
+import argparse
+import cProfile
+import threading
+import contextvars
+from contextlib import nullcontext
+from config import Config, get_folder_path
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = ".prof"
+
+# Pašreizējais profilējamais pieprasījums (None, ja pieprasījums nav izlasē)
+_active_request = contextvars.ContextVar("profiled_request", default=None)
+
+def query_hash(text):
+    """
+    Vaicājuma teksta jaucējvērtība profilu sasaistei ar žurnāla ierakstiem
+
+    Args:
+        text (str): Vaicājuma teksts
+
+    Returns:
+        str: 16 heksadecimālas zīmes
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+class _ProfiledRequest:
+    """Viena pieprasījuma profilēšana (konteksta pārvaldnieks)"""
+
+    __slots__ = ("profiler", "text", "details", "offloaded", "profile", "started", "duration",
+                 "token", "lock", "running", "calls", "finished")
+
+    def __init__(self, profiler, text, details, offloaded):
+        """
+        Args:
+            profiler (RequestProfiler): Profilētājs, kas saglabā rezultātu
+            text (str): Vaicājuma teksts
+            details (dict): Papildu informācija profila aprakstam
+            offloaded (bool): True - profilē tikai call() izsaukumus (asinhronais serveris)
+        """
+        self.profiler = profiler
+        self.text = text
+        self.details = details
+        self.offloaded = offloaded
+        self.lock = threading.Lock()
+        self.running = 0
+        self.calls = 0
+        self.finished = False
+
+    def __enter__(self):
+        self.profile = cProfile.Profile()
+        self.token = _active_request.set(self)
+        self.started = time.perf_counter()
+        if not self.offloaded:
+            self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self.offloaded:
+            self.profile.disable()
+        self.duration = time.perf_counter() - self.started
+        _active_request.reset(self.token)
+        with self.lock:
+            self.finished = True
+            # Pārtraukta pieprasījuma fona darbs vēl var izpildīties - saglabās tas, kas beigs pēdējais
+            if self.running:
+                return False
+        self._record()
+        return False
+
+    def call(self, function, *args):
+        """Izpilda funkciju šajā pavedienā, pievienojot tās profilu pieprasījuma profilam"""
+        with self.lock:
+            if self.finished or not self.offloaded:
+                profiled = False
+            else:
+                profiled = True
+                self.running += 1
+                self.calls += 1
+        if not profiled:
+            return function(*args)
+
+        self.profile.enable()
+        try:
+            return function(*args)
+        finally:
+            self.profile.disable()
+            with self.lock:
+                self.running -= 1
+                record = self.finished and not self.running
+            if record:
+                self._record()
+
+    def _record(self):
+        # Asinhronam pieprasījumam bez darba pavedienu pūlā (piem. vispārīgs jautājums) profila nav
+        if not self.offloaded or self.calls:
+            self.profiler._record(self.profile, self.duration, self.text, self.details)
+
+class RequestProfiler:
+    """Izlases veida pieprasījumu profilēšana, saglabājot lēnākos profilus"""
+
+    def __init__(self, sample_rate=0.0, directory="profiles", keep=20):
+        """
+        Inicializē profilētāju; iepriekš saglabātie profili tiek ņemti vērā lēnāko sarakstā
+
+        Args:
+            sample_rate (float): Profilējamo pieprasījumu daļa (0 - izslēgts, 1 - visi)
+            directory (str): Profilu direktorija
+            keep (int): Cik lēnākos profilus saglabāt
+        """
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.keep = keep
+        self.sampled = 0
+        # Saglabātie profili: kaudze [(izpildes laiks, faila ceļš), ...], ātrākais pirmais
+        self._saved = []
+        self._lock = threading.Lock()
+        if self.enabled:
+            self._load_saved()
+
+    @property
+    def enabled(self):
+        """Vai profilēšana ir ieslēgta"""
+        return self.sample_rate > 0 and self.keep > 0
+
+    def profile(self, text, **details):
+        """
+        Konteksta pārvaldnieks visa pieprasījuma profilēšanai pavedienā, kas to apstrādā
+        (ja pieprasījums iekļauts izlasē)
+
+        Args:
+            text (str): Vaicājuma teksts
+            **details: Papildu informācija profila aprakstam (piem. ieejas punkts)
+
+        Returns:
+            Konteksta pārvaldnieks
+        """
+        return self._sample(text, details, offloaded=False)
+
+    def profile_async(self, text, **details):
+        """
+        Konteksta pārvaldnieks asyncio pieprasījumam: mēra visa pieprasījuma izpildes laiku, bet
+        cProfile ieslēdz tikai call() izsaukumiem pavedienu pūlā (notikumu cikla profilā būtu
+        arī citi vienlaicīgie pieprasījumi)
+
+        Args:
+            text (str): Vaicājuma teksts
+            **details: Papildu informācija profila aprakstam (piem. ieejas punkts)
+
+        Returns:
+            Konteksta pārvaldnieks
+        """
+        return self._sample(text, details, offloaded=True)
+
+    def _sample(self, text, details, offloaded):
+        if not self.enabled or random.random() >= self.sample_rate:
+            return nullcontext()
+        return _ProfiledRequest(self, text, details, offloaded)
+
+    def call(self, function, *args):
+        """
+        Izpilda pieprasījuma darbu pavedienu pūlā; ja pieprasījums tiek profilēts ar
+        profile_async, darbs tiek iekļauts tā profilā (konteksts jānodod ar contextvars.copy_context)
+
+        Args:
+            function (callable): Funkcija
+            *args: Funkcijas argumenti
+
+        Returns:
+            Funkcijas rezultāts
+        """
+        request = _active_request.get()
+        if request is None:
+            return function(*args)
+        return request.call(function, *args)
+
+    def annotate(self, **details):
+        """
+        Papildina pašreizējā profilējamā pieprasījuma aprakstu (ja pieprasījums tiek profilēts)
+
+        Args:
+            **details: Papildu informācija (piem. vaicājuma maršruts)
+        """
+        request = _active_request.get()
+        if request is not None:
+            request.details.update(details)
+
+    def _record(self, profile, duration, text, details):
+        """
+        Saglabā profilu, ja tas ir starp lēnākajiem, un dzēš ātrāko, ja saraksts ir pilns
+
+        Args:
+            profile (cProfile.Profile): Pabeigts profils
+            duration (float): Izpildes laiks sekundēs
+            text (str): Vaicājuma teksts
+            details (dict): Papildu informācija
+        """
+        with self._lock:
+            self.sampled += 1
+            if len(self._saved) >= self.keep and duration <= self._saved[0][0]:
+                return
+
+            digest = query_hash(text)
+            name = f"{duration * 1000:010.3f}ms_{digest}_{int(time.time() * 1000)}"
+            path = os.path.join(self.directory, name + PROFILE_SUFFIX)
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                profile.dump_stats(path)
+                with open(os.path.join(self.directory, name + ".json"), "w", encoding="utf-8") as f:
+                    json.dump(dict(details, query_hash=digest, query_length=len(text),
+                                   duration_ms=round(duration * 1000, 3),
+                                   created=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                                   thread=threading.current_thread().name), f, ensure_ascii=False)
+            except OSError as e:
+                logger.warning(f"Neizdevās saglabāt profilu {path}: {e}")
+                return
+
+            heapq.heappush(self._saved, (duration, path))
+            while len(self._saved) > self.keep:
+                _, removed = heapq.heappop(self._saved)
+                self._remove(removed)
+
+        logger.info(f"Saglabāts pieprasījuma profils {digest} ({duration * 1000:.1f} ms, {len(text)} zīmes)")
+
+    def _load_saved(self):
+        """Nolasa iepriekš saglabātos profilus (izpildes laiks no faila nosaukuma)"""
+        for duration, path in list_profiles(self.directory):
+            heapq.heappush(self._saved, (duration, path))
+        while len(self._saved) > self.keep:
+            _, removed = heapq.heappop(self._saved)
+            self._remove(removed)
+
+    def _remove(self, path):
+        """Dzēš profilu un tā aprakstu"""
+        for file_path in (path, path[:-len(PROFILE_SUFFIX)] + ".json"):
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+def list_profiles(directory):
+    """
+    Atrod saglabātos profilus
+
+    Args:
+        directory (str): Profilu direktorija
+
+    Returns:
+        list: [(izpildes laiks sekundēs, faila ceļš), ...], lēnākie pirmie
+    """
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    profiles = []
+    for name in names:
+        if not name.endswith(PROFILE_SUFFIX):
+            continue
+        try:
+            duration = float(name.split("ms_", 1)[0]) / 1000
+        except ValueError:
+            continue
+        profiles.append((duration, os.path.join(directory, name)))
+    return sorted(profiles, reverse=True)
+
+# Izveidojam koplietojamo profilētāju, kad modulis tiek importēts
+request_profiler = RequestProfiler(Config.PROFILE_SAMPLE_RATE, get_folder_path(Config.PROFILE_DIR),
+                                   Config.PROFILE_KEEP)
+
+def main(argv=None):
+    """Komandrindas rīks saglabāto profilu apskatei"""
+    parser = argparse.ArgumentParser(description="Saglabāto pieprasījumu profilu apskate")
+    parser.add_argument("path", nargs="?", help="Profila fails (pēc noklusējuma lēnākais)")
+    parser.add_argument("--directory", default=get_folder_path(Config.PROFILE_DIR), help="Profilu direktorija")
+    parser.add_argument("--limit", type=int, default=20, help="Izvadāmo funkciju skaits")
+    parser.add_argument("--sort", default="cumulative", help="Kārtošana (pstats atslēga)")
+    args = parser.parse_args(argv)
+
+    profiles = list_profiles(args.directory)
+    if not args.path:
+        if not profiles:
+            print(f"Profilu nav: {args.directory}")
+            return 1
+        for duration, path in profiles:
+            description = path[:-len(PROFILE_SUFFIX)] + ".json"
+            details = {}
+            if os.path.exists(description):
+                with open(description, encoding="utf-8") as f:
+                    details = json.load(f)
+            print(f"{duration * 1000:10.1f} ms  {details.get('query_hash', '?')}  "
+                  f"{details.get('query_length', '?'):>6} zīmes  {details.get('entry', '')}  "
+                  f"{details.get('route', '')}  {os.path.basename(path)}")
+        args.path = profiles[0][1]
+
+    print(f"\n{args.path}")
+    pstats.Stats(args.path).strip_dirs().sort_stats(args.sort).print_stats(args.limit)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
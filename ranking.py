@@ -0,0 +1,370 @@
+# ranking.py
+"""
+Atbilstības novērtēšanas modulis.
+Satur nomaināmus fragmentu novērtētājus (vēsturisko, BM25 un vektorizēto BM25),
+ko izvēlas ar Config.RANKING_ENGINE.
+"""
+import re
+import math
+import logging
+from config import Config
+
+try:
+    import numpy as np
+except ImportError:  # NumPy nav obligāts - bez tā vektorizētā novērtēšana nav pieejama
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Budžeta koda formāts (piemēram, "09.620")
+CODE_PATTERN = re.compile(r'\d{2}\.\d{3}')
+
+class Scorer:
+    """Bāzes klase fragmentu novērtētājiem"""
+
+    name = None
+
+    def __init__(self, index):
+        """
+        Inicializē novērtētāju
+
+        Args:
+            index (CorpusIndex): Meklēšanas indekss
+        """
+        self.index = index
+
+    def score(self, folder_name, query_words, query):
+        """
+        Novērtē mapes fragmentus pēc atbilstības vaicājumam
+
+        Args:
+            folder_name (str): Mapes nosaukums
+            query_words (list): Apstrādātie vaicājuma vārdi (secībā, bez dublējumiem); indeksa
+                                terminos tos pārveido index.terms, frāzes meklē pēc vārdiem
+            query (str): Sākotnējais vaicājums
+
+        Returns:
+            dict: {dokumenta_id: atbilstības reitings}
+        """
+        raise NotImplementedError
+
+    def _query_terms(self, query_words):
+        """
+        Pārveido vaicājuma vārdus indeksa terminos; terminus, kuru nav indeksā (piemēram,
+        drukas kļūdas), aizstāj ar līdzīgāko indeksa terminu pēc trigrammu līdzības
+
+        Args:
+            query_words (list): Apstrādātie vaicājuma vārdi
+
+        Returns:
+            list: Unikālie indeksa termini
+        """
+        terms = self.index.terms(query_words)
+        if Config.FUZZY_MATCH_THRESHOLD <= 0:
+            return terms
+
+        corrected = []
+        trigrams = self.index.trigrams
+        for term in terms:
+            # Skaitļi (kodu daļas) jāatrod precīzi
+            if term not in trigrams and term.isalpha():
+                matches = trigrams.similar(term, limit=1, threshold=Config.FUZZY_MATCH_THRESHOLD)
+                if matches:
+                    logger.debug(f"Termins '{term}' aizstāts ar '{matches[0][0]}' (līdzība {matches[0][1]:.2f})")
+                    term = matches[0][0]
+            corrected.append(term)
+        return list(dict.fromkeys(corrected))
+
+    def _feature_bonus(self, content, query_words, codes):
+        """
+        Papildu punkti par frāžu un budžeta kodu sakritībām
+
+        Args:
+            content (str): Fragmenta saturs
+            query_words (list): Vaicājuma vārdi secībā
+            codes (list): Vaicājumā minētie budžeta kodi
+
+        Returns:
+            float: Papildu punkti
+        """
+        bonus = 0
+
+        # Frāžu meklēšana (divu blakus esošu vārdu kombinācijas)
+        for i in range(len(query_words) - 1):
+            phrase_count = content.count(f"{query_words[i]} {query_words[i+1]}")
+            if phrase_count > 0:
+                bonus += 3 * phrase_count
+
+        # Kodi ir ļoti svarīgi, tāpēc augstāks svars
+        for code in codes:
+            code_count = content.count(code)
+            if code_count > 0:
+                bonus += 5 * code_count
+
+        return bonus
+
+class LegacyScorer(Scorer):
+    """Sākotnējais novērtētājs: vārdu sakritības, daļējas sakritības, frāzes un pārklājums"""
+
+    name = "legacy"
+
+    def score(self, folder_name, query_words, query):
+        """Novērtē mapes fragmentus ar sākotnējo algoritmu"""
+        terms = self._query_terms(query_words)
+        # Precīzās sakritības: dokumenta_id → {termins: biežums}
+        term_frequencies = {}
+        # Daļējās sakritības (termins kā daļa no garāka termina): dokumenta_id → {termini}
+        partial_matches = {}
+
+        for term in terms:
+            for doc_id, frequency in self.index.postings(folder_name, term):
+                term_frequencies.setdefault(doc_id, {})[term] = frequency
+
+            # Garāki termini, kas satur vaicājuma terminu - no trigrammu indeksa, nevis pārlūkojot vārdnīcu
+            for token in self.index.trigrams.containing(term):
+                for doc_id, _ in self.index.postings(folder_name, token):
+                    partial_matches.setdefault(doc_id, set()).add(term)
+
+        scores = {}
+        for doc_id in term_frequencies.keys() | partial_matches.keys():
+            scores[doc_id] = self._calculate_relevance(
+                self.index.content(doc_id), query_words, terms,
+                term_frequencies.get(doc_id, {}), partial_matches.get(doc_id, set())
+            )
+        return scores
+
+    def _calculate_relevance(self, content, query_words, terms, term_frequencies, partial_terms):
+        """
+        Aprēķina teksta atbilstību vaicājumam
+
+        Args:
+            content (str): Teksta saturs
+            query_words (list): Meklēšanas vārdu saraksts
+            terms (list): Vaicājuma vārdu indeksa termini
+            term_frequencies (dict): Vaicājuma terminu biežums fragmentā (no indeksa)
+            partial_terms (set): Vaicājuma termini, kas fragmentā ir daļa no garāka termina
+
+        Returns:
+            float: Atbilstības reitings
+        """
+        if not query_words:
+            return 0
+
+        relevance_score = 0
+
+        # 1. Pārbauda precīzas terminu sakritības
+        for term in terms:
+            # Precīzs termins (kā atsevišķs vārds) - biežums no indeksa
+            exact_matches = term_frequencies.get(term, 0)
+            if exact_matches > 0:
+                relevance_score += 2 * exact_matches
+            # Termins kā daļa no garāka termina
+            elif term in partial_terms:
+                relevance_score += 0.5
+
+        # 2. un 3. Frāzes un kodi (kodus meklē apstrādātajā vaicājumā, kā līdz šim)
+        original_query = ' '.join(query_words).lower()
+        relevance_score += self._feature_bonus(content, query_words, CODE_PATTERN.findall(original_query))
+
+        # 4. Konteksta atbilstība - cik % no vaicājuma terminiem ir tekstā
+        unique_terms = set(terms)
+        term_overlap = len(unique_terms.intersection(term_frequencies))
+        context_score = term_overlap / len(unique_terms) if unique_terms else 0
+
+        relevance_score += context_score * 2
+
+        # Normalizējam rezultātu, ņemot vērā vaicājuma garumu
+        return relevance_score / len(query_words)
+
+class BM25Scorer(Scorer):
+    """BM25 novērtētājs ar iepriekš aprēķinātām IDF tabulām un dokumentu garumiem"""
+
+    name = "bm25"
+
+    def __init__(self, index, k1=None, b=None):
+        """
+        Inicializē BM25 novērtētāju un aprēķina korpusa statistiku
+
+        Args:
+            index (CorpusIndex): Meklēšanas indekss
+            k1 (float): Vārdu biežuma piesātinājuma parametrs
+            b (float): Dokumenta garuma normalizācijas parametrs
+        """
+        super().__init__(index)
+        self.k1 = Config.BM25_K1 if k1 is None else k1
+        self.b = Config.BM25_B if b is None else b
+
+        document_count = len(index.documents)
+        average_length = (sum(doc["length"] for doc in index.documents) / document_count
+                          if document_count else 0)
+
+        # Garuma normalizācija katram dokumentam: k1 * (1 - b + b * |d| / avgdl)
+        self.length_norms = [
+            self.k1 * (1 - self.b + self.b * doc["length"] / average_length) if average_length else self.k1
+            for doc in index.documents
+        ]
+
+        # Dokumentu biežums visā korpusā (visās mapēs kopā)
+        document_frequencies = {}
+        for vocabulary in index.partitions.values():
+            for token, (_, count) in vocabulary.items():
+                document_frequencies[token] = document_frequencies.get(token, 0) + count
+
+        self.idf = {
+            token: math.log(1 + (document_count - df + 0.5) / (df + 0.5))
+            for token, df in document_frequencies.items()
+        }
+
+    def score(self, folder_name, query_words, query):
+        """Novērtē mapes fragmentus ar BM25 un pieskaita frāžu/kodu papildu punktus"""
+        scores = {}
+        matched_words = {}
+
+        for term in self._query_terms(query_words):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, frequency in self.index.postings(folder_name, term):
+                weight = frequency * (self.k1 + 1) / (frequency + self.length_norms[doc_id])
+                scores[doc_id] = scores.get(doc_id, 0) + idf * weight
+                matched_words[doc_id] = matched_words.get(doc_id, 0) + 1
+
+        codes = CODE_PATTERN.findall(query)
+        if len(query_words) > 1 or codes:
+            for doc_id in scores:
+                # Frāze iespējama tikai, ja fragmentā ir vismaz divi vaicājuma termini
+                phrase_words = query_words if matched_words[doc_id] > 1 else []
+                if phrase_words or codes:
+                    scores[doc_id] += self._feature_bonus(self.index.content(doc_id), phrase_words, codes)
+
+        return scores
+
+class TermDocumentMatrix:
+    """
+    Korpuss kā CSR vārdu-dokumentu matrica ar iepriekš aprēķinātiem BM25 svariem.
+
+    Katras mapes vārda rinda ir nepārtraukts posms indeksa biežumu sarakstu masīvā,
+    tāpēc matricas indeksi un indptr tiek ņemti tieši no indeksa (bez kopēšanas).
+    """
+
+    def __init__(self, index, idf, length_norms, k1):
+        """
+        Izveido matricu no indeksa
+
+        Args:
+            index (CorpusIndex): Meklēšanas indekss
+            idf (dict): IDF vērtības katram vārdam
+            length_norms (list): BM25 garuma normalizācija katram dokumentam
+            k1 (float): BM25 piesātinājuma parametrs
+        """
+        self.index = index
+        pairs = np.frombuffer(index.raw_postings, dtype=np.uint32).reshape(-1, 2)
+        # Kolonnu indeksi (dokumenti) - skats uz indeksa atmiņu
+        self.indices = pairs[:, 0]
+        frequencies = pairs[:, 1].astype(np.float32)
+
+        # IDF katram nenulles elementam pēc tā rindas (vārda)
+        term_idf = np.zeros(len(pairs), dtype=np.float32)
+        for vocabulary in index.partitions.values():
+            for token, (offset, length) in vocabulary.items():
+                term_idf[offset:offset + length] = idf[token]
+
+        norms = np.asarray(length_norms, dtype=np.float32)
+        self.data = term_idf * frequencies * (k1 + 1) / (frequencies + norms[self.indices])
+
+        # Katras mapes dokumentu diapazons [sākums, beigas)
+        self.folder_ranges = {}
+        for doc_id, document in enumerate(index.documents):
+            start, _ = self.folder_ranges.get(document["folder"], (doc_id, doc_id))
+            self.folder_ranges[document["folder"]] = (start, doc_id + 1)
+
+    def scores(self, folder_name, terms):
+        """
+        Aprēķina visu mapes dokumentu reitingus ar vienu retās matricas-vektora reizinājumu
+
+        Args:
+            folder_name (str): Mapes nosaukums
+            terms (list): Vaicājuma indeksa termini
+
+        Returns:
+            tuple: (reitingu masīvs, sakritušo terminu skaita masīvs, pirmā dokumenta id)
+                   vai (None, None, 0), ja nav sakritību
+        """
+        spans = [self.index.posting_span(folder_name, term) for term in terms]
+        spans = [span for span in spans if span]
+        if not spans:
+            return None, None, 0
+
+        start, end = self.folder_ranges[folder_name]
+        columns = np.concatenate([self.indices[offset:offset + length] for offset, length in spans]) - start
+        weights = np.concatenate([self.data[offset:offset + length] for offset, length in spans])
+        # Katrā biežumu sarakstā dokuments ir ne vairāk kā vienu reizi
+        matched = np.bincount(columns, minlength=end - start)
+        return np.bincount(columns, weights=weights, minlength=end - start), matched, start
+
+class VectorBM25Scorer(BM25Scorer):
+    """BM25 novērtētājs, kas visus fragmentus novērtē vienā NumPy operācijā"""
+
+    name = "bm25_vector"
+
+    def __init__(self, index, k1=None, b=None, rerank_depth=None):
+        """
+        Inicializē novērtētāju un izveido vārdu-dokumentu matricu
+
+        Args:
+            index (CorpusIndex): Meklēšanas indekss
+            k1 (float): Vārdu biežuma piesātinājuma parametrs
+            b (float): Dokumenta garuma normalizācijas parametrs
+            rerank_depth (int): Cik labāko fragmentu atgriezt
+        """
+        super().__init__(index, k1, b)
+        self.rerank_depth = Config.VECTOR_RERANK_DEPTH if rerank_depth is None else rerank_depth
+        self.matrix = TermDocumentMatrix(index, self.idf, self.length_norms, self.k1)
+
+    def score(self, folder_name, query_words, query):
+        """
+        Novērtē mapes fragmentus vektorizēti un atgriež tikai labākos kandidātus. Frāžu/kodu
+        punkti tiek pieskaitīti pirms labāko atlases ar tiem pašiem nosacījumiem kā BM25Scorer,
+        tāpēc labāko rerank_depth fragmentu reitingi sakrīt ar BM25Scorer
+        """
+        scores, matched, start = self.matrix.scores(folder_name, self._query_terms(query_words))
+        if scores is None:
+            return {}
+
+        codes = CODE_PATTERN.findall(query)
+        # Frāze iespējama tikai, ja fragmentā ir vismaz divi vaicājuma termini
+        phrase_candidates = matched > 1 if len(query_words) > 1 else np.zeros(len(scores), dtype=bool)
+        bonus_candidates = matched > 0 if codes else phrase_candidates
+        for position in np.flatnonzero(bonus_candidates).tolist():
+            phrase_words = query_words if phrase_candidates[position] else []
+            scores[position] += self._feature_bonus(self.index.content(start + position), phrase_words, codes)
+
+        # Labākie kandidāti bez pilnas kārtošanas
+        depth = min(self.rerank_depth, len(scores))
+        candidates = np.argpartition(-scores, depth - 1)[:depth]
+        candidates = candidates[matched[candidates] > 0]
+        return {start + position: float(scores[position]) for position in candidates.tolist()}
+
+# Pieejamie novērtētāji pēc nosaukuma
+SCORERS = {scorer.name: scorer for scorer in (LegacyScorer, BM25Scorer, VectorBM25Scorer)}
+
+def create_scorer(index, name=None):
+    """
+    Izveido konfigurācijā norādīto novērtētāju
+
+    Args:
+        index (CorpusIndex): Meklēšanas indekss
+        name (str, optional): Novērtētāja nosaukums; pēc noklusējuma Config.RANKING_ENGINE
+
+    Returns:
+        Scorer: Novērtētāja instance
+    """
+    name = (name or Config.RANKING_ENGINE).lower()
+    if name not in SCORERS:
+        logger.warning(f"Nezināms novērtētājs '{name}', izmantojam 'bm25'")
+        name = "bm25"
+    if name == VectorBM25Scorer.name and np is None:
+        logger.warning("NumPy nav instalēts, vektorizētās novērtēšanas vietā izmantojam 'bm25'")
+        name = "bm25"
+    logger.info(f"Izmantojam novērtētāju: {name}")
+    return SCORERS[name](index)
@@ -3,212 +3,362 @@
 Meklēšanas modulis aplikācijai.
 Pārvalda teksta fragmentu meklēšanu un atbilstības noteikšanu.
 """
-import os
 import re
+import time
 import logging
+import threading
 from config import Config, get_folder_path
+from search_index import CorpusIndex, CodeIndex, IncrementalIndexBuilder
+from normalization import is_stop_word
+from corpus_watcher import CorpusWatcher
+from query_router import route_query
+from ranking import create_scorer
+import embeddings
+from cache import LRUCache
+from metrics import registry, STAGE_SECONDS, SEARCH_FOLDER_SECONDS
 
 logger = logging.getLogger(__name__)
 
+class SearchSnapshot:
+    """
+    Nemainīgs meklēšanas stāvoklis: indekss un no tā atkarīgās struktūras.
+    Korpusa izmaiņu gadījumā tiek izveidots jauns momentuzņēmums, nevis mainīts esošais.
+    """
+
+    __slots__ = ("index", "scorer", "code_index", "dense", "folder_rows")
+
+    def __init__(self, index):
+        """
+        Args:
+            index (CorpusIndex): Meklēšanas indekss
+        """
+        self.index = index
+        # Atbilstības novērtētājs (Config.RANKING_ENGINE: "bm25", "bm25_vector" vai "legacy")
+        self.scorer = create_scorer(index)
+        # Budžeta kodu indekss (kods → definējošie fragmenti) tiek veidots ielādes laikā
+        self.code_index = CodeIndex.build(index)
+        # Trigrammu indekss (daļējām sakritībām un drukas kļūdām) - arī ielādes, nevis pirmā vaicājuma laikā
+        index.trigrams
+        # Fragmentu vektori semantiskajai meklēšanai (Config.DENSE_RETRIEVAL); nemainīto fragmentu
+        # vektori tiek ņemti no iepriekšējā vektoru faila
+        self.dense = None
+        self.folder_rows = {}
+        if Config.DENSE_RETRIEVAL:
+            if embeddings.np is None:
+                logger.warning("Semantiskajai meklēšanai nepieciešams NumPy, izmantojam tikai atslēgvārdus")
+                return
+            try:
+                self.dense = embeddings.EmbeddingIndex.load_or_build(index, get_folder_path(Config.EMBEDDING_INDEX_PATH))
+                folders = embeddings.np.array([document["folder"] for document in index.documents], dtype=object)
+                self.folder_rows = {folder: folders == folder for folder in index.folders}
+            except Exception as e:
+                logger.error(f"Neizdevās ielādēt fragmentu vektorus, izmantojam tikai atslēgvārdus: {e}", exc_info=True)
+                self.dense = None
+
 class SearchEngine:
     """Klase teksta fragmentu meklēšanai un atbilstības noteikšanai"""
     
     def __init__(self):
         """Inicializē meklēšanas dzinēju"""
         # Mapju saraksti, kuros veikt meklēšanu
-        self.primary_folders = ["pdf_chunks_part8", "pdf_chunks_part9"]
-        self.cofog_folders = [
-            "pdf_chunks_part1", "pdf_chunks_part2", "pdf_chunks_part3", 
-            "pdf_chunks_part4", "pdf_chunks_part5", "pdf_chunks_part6", "pdf_chunks_part7"
-        ]
+        self.primary_folders = list(Config.PRIMARY_FOLDERS)
+        self.cofog_folders = list(Config.COFOG_FOLDERS)
+        
+        # Meklēšanas rezultātu kešatmiņa (atslēga: indeksa kontrolsumma, apstrādātie vārdi, COFOG pazīme, kodi)
+        self.result_cache = LRUCache(Config.SEARCH_CACHE_SIZE, Config.SEARCH_CACHE_TTL)
+        
+        # Ielādējam iepriekš sakompilēto indeksu (mmap); ja tas novecojis, to pārbūvējam
+        folders = self.primary_folders + self.cofog_folders
+        self.snapshot = SearchSnapshot(CorpusIndex.load_or_build(folders, get_folder_path(Config.INDEX_PATH)))
+        
+        # Korpusa izmaiņas tiek pievienotas indeksam fonā, pārbūvējot tikai mainītos avotus
+        self._index_builder = IncrementalIndexBuilder(folders)
+        self._update_lock = threading.Lock()
+        self.watcher = CorpusWatcher(folders, self.apply_changes)
+        self.watcher.start()
+    
+    @property
+    def index(self):
+        """Pašreizējā momentuzņēmuma meklēšanas indekss"""
+        return self.snapshot.index
+    
+    def apply_changes(self, changed_files):
+        """
+        Atjauno indeksu pēc korpusa izmaiņām un publicē jaunu momentuzņēmumu.
+        Momentuzņēmums tiek aizstāts ar vienu piešķiršanu, tāpēc meklēšanas, kas jau sākušās,
+        netiek bloķētas un līdz beigām izmanto iepriekšējo (pilnīgo) stāvokli.
+        
+        Args:
+            changed_files (set): Pievienotie, mainītie vai dzēstie faili {(mape, nosaukums), ...}
+        """
+        with self._update_lock:
+            started = time.time()
+            data = self._index_builder.update(self.snapshot.index, changed_files)
+            snapshot = SearchSnapshot(CorpusIndex.publish(data, get_folder_path(Config.INDEX_PATH)))
+            self.snapshot = snapshot
+            # Rezultāti no iepriekšējā korpusa vairs nav derīgi
+            self.result_cache.clear()
+            logger.info(f"Publicēts jauns meklēšanas indekss: {len(snapshot.index.documents)} fragmenti, "
+                        f"{time.time() - started:.2f}s")
     
     def search(self, query):
         """
         Meklē teksta fragmentus, kas atbilst vaicājumam
         
         Args:
-            query (str): Meklēšanas vaicājums
+            query (str vai RoutedQuery): Meklēšanas vaicājums (klasificēts ar route_query vai teksts)
             
         Returns:
             list: Atbilstošo fragmentu saraksts ar atbilstības reitingu
         """
-        logger.info(f"Meklējam teksta fragmentos pēc vaicājuma: {query}")
+        # COFOG salīdzinājuma pazīmi un vaicājumā minētos kodus (piemēram, "09.620") nosaka maršrutētājs
+        routed = route_query(query)
+        query = routed.text
+        is_cofog_comparison = routed.is_cofog_comparison
+        codes = list(routed.codes)
+        logger.info(f"Meklējam teksta fragmentos pēc vaicājuma: {query} (maršruts: {routed.route})")
         
         query_words = self._preprocess_query(query)
-        results = []
-        
-        # Nosaka, vai jautājums saistīts ar COFOG salīdzinājumu
-        is_cofog_comparison = self._is_cofog_related(query)
-        logger.info(f"Jautājums prasa COFOG salīdzinājumu: {is_cofog_comparison}")
         
         try:
-            # 1. Pārbaudām primārās mapes
-            for folder in self.primary_folders:
-                self._process_folder(folder, query_words, results)
+            # Visa meklēšana notiek vienā momentuzņēmumā, pat ja korpuss tikmēr tiek atjaunots
+            snapshot = self.snapshot
             
-            # 2. Ja jautājums saistīts ar COFOG vai nav atrasti rezultāti, meklējam COFOG mapēs
-            if is_cofog_comparison or len(results) < 1:
-                for folder in self.cofog_folders:
-                    self._process_folder(folder, query_words, results)
+            cache_key = (snapshot.index.checksum, tuple(query_words), is_cofog_comparison, tuple(codes))
+            cached_results = self.result_cache.get(cache_key)
+            if cached_results is not None:
+                logger.info(f"Meklēšanas rezultāts atrasts kešatmiņā ({len(cached_results)} fragmenti)")
+                return list(cached_results)
             
-            # Sakārtojam rezultātus pēc atbilstības
-            results.sort(key=lambda x: x["score"], reverse=True)
-            
-            logger.info(f"Kopā atrasti {len(results)} atbilstoši fragmenti")
-            # Atgriežam labākos 3 rezultātus
-            return results[:3]
+            results = self._search(snapshot, query, query_words, codes, is_cofog_comparison)
+            self.result_cache.set(cache_key, results)
+            return list(results)
         
         except Exception as e:
             logger.error(f"Kļūda meklējot teksta fragmentos: {e}", exc_info=True)
             return []
     
-    def _preprocess_query(self, query):
+    def _search(self, snapshot, query, query_words, codes, is_cofog_comparison):
         """
-        Apstrādā vaicājumu pirms meklēšanas
+        Veic meklēšanu indeksā
         
         Args:
+            snapshot (SearchSnapshot): Meklēšanas momentuzņēmums
             query (str): Sākotnējais vaicājums
+            query_words (list): Apstrādātie vaicājuma vārdi
+            codes (list): Vaicājumā minētie budžeta kodi
+            is_cofog_comparison (bool): Vai jautājums saistīts ar COFOG
             
         Returns:
-            list: Apstrādātu vaicājuma vārdu saraksts
+            list: Labākie Config.SEARCH_RESULTS fragmenti ar saturu
         """
-        # Pārvērš vaicājumu mazajiem burtiem
-        query = query.lower()
+        results = []
+        code_matches = snapshot.code_index.ranked_documents(codes) if codes else []
         
-        # Noņem pieturzīmes
-        query = re.sub(r'[^\w\s]', ' ', query)
+        # Ja vaicājums ir tikai kods, atbildi dod kodu indekss bez novērtēšanas
+        if code_matches and self._is_code_only(query_words, codes):
+            logger.info(f"Kodu indeksā atrasti {len(code_matches)} fragmenti kodiem {codes}")
+            return self._with_content(snapshot, [
+                self._code_result(snapshot, doc_id, code, role, 0) for doc_id, code, role in code_matches[:Config.SEARCH_RESULTS]
+            ])
         
-        # Sadala vārdos
-        words = query.split()
+        # 1. Pārbaudām primārās mapes
+        for folder in self.primary_folders:
+            self._process_folder(snapshot, folder, query_words, query, results)
+        
+        # 2. Ja jautājums saistīts ar COFOG vai nav atrasti rezultāti, meklējam COFOG mapēs
+        folders = list(self.primary_folders)
+        if is_cofog_comparison or len(results) < 1:
+            folders += self.cofog_folders
+            for folder in self.cofog_folders:
+                self._process_folder(snapshot, folder, query_words, query, results)
+        
+        # Sakārtojam rezultātus pēc atbilstības
+        results.sort(key=lambda x: x["score"], reverse=True)
         
-        # Atgriež unikālus vārdus (noņem dublējumus)
-        return list(set(words))
+        # Semantiskās meklēšanas rezultāti tiek apvienoti ar atslēgvārdu rezultātiem tajās pašās mapēs
+        if snapshot.dense is not None:
+            results = self._fuse_dense(snapshot, query, folders, results)
+        
+        # Koda definējošie fragmenti vienmēr tiek nodoti kontekstam pirmie
+        if code_matches:
+            results = self._prepend_code_definitions(snapshot, code_matches, results)
+        
+        logger.info(f"Kopā atrasti {len(results)} atbilstoši fragmenti")
+        # Atgriežam labākos rezultātus; saturu nolasām tikai tiem
+        return self._with_content(snapshot, results[:Config.SEARCH_RESULTS])
     
-    def _is_cofog_related(self, query):
+    def _fuse_dense(self, snapshot, query, folders, results):
         """
-        Nosaka, vai vaicājums ir saistīts ar COFOG klasifikāciju
+        Apvieno atslēgvārdu rezultātus ar semantiskās meklēšanas rezultātiem (Reciprocal Rank Fusion):
+        fragmenta reitings ir summa 1 / (Config.HYBRID_RRF_K + vieta) pa abiem sarakstiem, tāpēc
+        BM25 un kosinusa līdzības skalas nav jāsaskaņo
         
         Args:
-            query (str): Meklēšanas vaicājums
+            snapshot (SearchSnapshot): Meklēšanas momentuzņēmums
+            query (str): Sākotnējais vaicājums
+            folders (list): Mapes, kurās meklēts
+            results (list): Atslēgvārdu rezultāti atbilstības secībā
             
         Returns:
-            bool: True, ja vaicājums saistīts ar COFOG, citādi False
+            list: Apvienotie rezultāti apvienotā reitinga secībā ("score" - apvienotais reitings,
+                  "keyword_score" un "dense_score" - sākotnējie reitingi)
         """
-        # Atslēgvārdi, kas norāda uz COFOG saistību
-        cofog_keywords = [
-            "cofog", "salīdzin", "salīdzināj", "salīdzināt", 
-            "starptautisk", "klasifik", "standart", "funkciju", "kods"
-        ]
+        np = embeddings.np
+        rows = np.logical_or.reduce([snapshot.folder_rows[folder] for folder in folders if folder in snapshot.folder_rows])
+        with STAGE_SECONDS.time(stage="dense"):
+            query_vector = embeddings.get_embedder().embed([query.lower()])[0]
+            dense_matches = snapshot.dense.search(query_vector, Config.DENSE_TOP_K, rows)
+        logger.info(f"Semantiskajā meklēšanā atrasti {len(dense_matches)} fragmenti")
+        
+        fused = {}
+        for rank, result in enumerate(results, 1):
+            result["keyword_score"] = result["score"]
+            result["score"] = 1 / (Config.HYBRID_RRF_K + rank)
+            fused[result["doc_id"]] = result
+        for rank, (doc_id, similarity) in enumerate(dense_matches, 1):
+            result = fused.get(doc_id)
+            if result is None:
+                result = fused[doc_id] = self._result(snapshot, doc_id, 0)
+                result["keyword_score"] = 0
+            result["dense_score"] = similarity
+            result["score"] += 1 / (Config.HYBRID_RRF_K + rank)
         
-        query_lower = query.lower()
-        return any(word in query_lower for word in cofog_keywords)
+        return sorted(fused.values(), key=lambda x: x["score"], reverse=True)
     
-    def _process_folder(self, folder_name, query_words, results):
+    def _is_code_only(self, query_words, codes):
         """
-        Apstrādā visus teksta failus norādītajā mapē
+        Nosaka, vai vaicājums sastāv tikai no budžeta kodiem
         
         Args:
-            folder_name (str): Mapes nosaukums
-            query_words (list): Meklēšanas vārdu saraksts
-            results (list): Rezultātu saraksts, kurā pievienot atradumus
+            query_words (list): Apstrādātie vaicājuma vārdi
+            codes (list): Vaicājumā atrastie kodi
+            
+        Returns:
+            bool: True, ja vaicājumā nav citu vārdu kā vien kodi
+        """
+        code_parts = {part for code in codes for part in code.split(".")}
+        return set(query_words) <= code_parts
+    
+    def _code_result(self, snapshot, doc_id, code, role, score):
         """
-        folder_path = get_folder_path(folder_name)
+        Izveido rezultāta ierakstu fragmentam no kodu indeksa
         
-        if not os.path.exists(folder_path):
-            logger.warning(f"Mape {folder_path} netika atrasta, izlaižam")
-            return
+        Args:
+            snapshot (SearchSnapshot): Meklēšanas momentuzņēmums
+            doc_id (int): Dokumenta identifikators
+            code (str): Budžeta kods
+            role (str): Koda loma fragmentā (skat. CodeIndex.ROLES)
+            score (float): Atbilstības reitings
             
-        logger.info(f"Meklējam mapē: {folder_path}")
+        Returns:
+            dict: Rezultāta ieraksts
+        """
+        result = self._result(snapshot, doc_id, score)
+        result["code"] = code
+        result["match"] = role
+        return result
+    
+    def _result(self, snapshot, doc_id, score):
+        """
+        Izveido rezultāta ierakstu fragmentam
         
-        try:
-            for filename in os.listdir(folder_path):
-                if filename.endswith(".txt"):
-                    filepath = os.path.join(folder_path, filename)
-                    self._process_file(filepath, query_words, results)
-        except Exception as e:
-            logger.error(f"Kļūda lasot mapes {folder_path} saturu: {e}", exc_info=True)
+        Args:
+            snapshot (SearchSnapshot): Meklēšanas momentuzņēmums
+            doc_id (int): Dokumenta identifikators
+            score (float): Atbilstības reitings
+            
+        Returns:
+            dict: Rezultāta ieraksts ar fragmenta identifikatoru un kodu, kuram tas pieder
+        """
+        document = snapshot.index.documents[doc_id]
+        return {
+            "doc_id": doc_id,
+            "file": document["file"],
+            "passage": document["passage"],
+            "parent_code": document["code"],
+            "score": score
+        }
     
-    def _process_file(self, file_path, query_words, results):
+    def _prepend_code_definitions(self, snapshot, code_matches, results):
         """
-        Apstrādā vienu teksta failu, meklējot atbilstības
+        Pārkārto rezultātus tā, lai kodu definīcijas būtu pirmās
         
         Args:
-            file_path (str): Ceļš līdz failam
-            query_words (list): Meklēšanas vārdu saraksts
-            results (list): Rezultātu saraksts, kurā pievienot atradumus
+            snapshot (SearchSnapshot): Meklēšanas momentuzņēmums
+            code_matches (list): [(dokumenta_id, kods, loma), ...] no kodu indeksa
+            results (list): Sakārtotie novērtēšanas rezultāti
+            
+        Returns:
+            list: Rezultāti ar kodu definīcijām sākumā
         """
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read().lower()
-                
-                # Uzlabota atbilstības noteikšana
-                relevance_score = self._calculate_relevance(content, query_words)
-                
-                if relevance_score > 0:
-                    results.append({
-                        "file": file_path,
-                        "content": content,
-                        "score": relevance_score
-                    })
-                    logger.debug(f"Atrasts atbilstošs fragments: {file_path} (score: {relevance_score})")
-        except Exception as e:
-            logger.error(f"Kļūda lasot failu {file_path}: {e}", exc_info=True)
+        scores = {result["doc_id"]: result["score"] for result in results}
+        definitions = [
+            self._code_result(snapshot, doc_id, code, role, scores.get(doc_id, 0))
+            for doc_id, code, role in code_matches if role in ("definition", "heading")
+        ]
+        defined_ids = {result["doc_id"] for result in definitions}
+        return definitions + [result for result in results if result["doc_id"] not in defined_ids]
     
-    def _calculate_relevance(self, content, query_words):
+    def _with_content(self, snapshot, results):
         """
-        Aprēķina teksta atbilstību vaicājumam
+        Pievieno rezultātiem fragmentu saturu
         
         Args:
-            content (str): Teksta saturs
-            query_words (list): Meklēšanas vārdu saraksts
+            snapshot (SearchSnapshot): Meklēšanas momentuzņēmums
+            results (list): Rezultātu ieraksti
             
         Returns:
-            float: Atbilstības reitings
+            list: Tie paši ieraksti ar aizpildītu "content" lauku
+        """
+        for result in results:
+            result["content"] = snapshot.index.content(result["doc_id"])
+        return results
+    
+    def _preprocess_query(self, query):
+        """
+        Apstrādā vaicājumu pirms meklēšanas
+        
+        Args:
+            query (str): Sākotnējais vaicājums
+            
+        Returns:
+            list: Apstrādātu vaicājuma vārdu saraksts
+        """
+        # Pārvērš vaicājumu mazajiem burtiem
+        query = query.lower()
+        
+        # Noņem pieturzīmes
+        query = re.sub(r'[^\w\s]', ' ', query)
+        
+        # Sadala vārdos
+        words = query.split()
+        
+        # Atgriež unikālus vārdus bez stop-vārdiem (noņem dublējumus, saglabājot secību frāžu meklēšanai).
+        # Galotnes netiek noņemtas šeit - vārdus indeksa terminos pārveido index.terms, bet frāzes
+        # un kodi tiek meklēti pēc vārdiem
+        return [word for word in dict.fromkeys(words) if not is_stop_word(word)]
+    
+    def _process_folder(self, snapshot, folder_name, query_words, query, results):
         """
-        if not query_words:
-            return 0
-        
-        relevance_score = 0
-        content_words = re.findall(r'\b\w+\b', content)
-        
-        # 1. Pārbauda precīzas vārdu sakritības
-        for word in query_words:
-            # Meklē precīzu vārdu (kā atsevišķu vārdu)
-            exact_matches = len(re.findall(rf'\b{re.escape(word)}\b', content))
-            if exact_matches > 0:
-                relevance_score += 2 * exact_matches
-            # Meklē vārdu kā daļu no garāka vārda
-            elif word in content:
-                relevance_score += 0.5
-        
-        # 2. Frāžu meklēšana (divu vārdu kombinācijas)
-        # Vispirms atjaunojam sākotnējo vaicājumu, lai saglabātu vārdu secību
-        original_query = ' '.join(query_words).lower()
-        words_in_order = original_query.split()
-        
-        for i in range(len(words_in_order) - 1):
-            phrase = f"{words_in_order[i]} {words_in_order[i+1]}"
-            phrase_count = content.count(phrase)
-            if phrase_count > 0:
-                relevance_score += 3 * phrase_count
-        
-        # 3. Specifiska meklēšana pēc kodu formāta (piemēram, "09.620")
-        code_patterns = re.findall(r'\d{2}\.\d{3}', original_query)
-        for code in code_patterns:
-            code_count = content.count(code)
-            if code_count > 0:
-                relevance_score += 5 * code_count  # Kodi ir ļoti svarīgi, tāpēc augstāks svars
-        
-        # 4. Konteksta atbilstība - cik % no vaicājuma vārdiem ir tekstā
-        unique_query_words = set(query_words)
-        content_word_set = set(content_words)
-        word_overlap = len(unique_query_words.intersection(content_word_set))
-        context_score = word_overlap / len(unique_query_words) if unique_query_words else 0
-        
-        relevance_score += context_score * 2
-        
-        # Normalizējam rezultātu, ņemot vērā vaicājuma garumu
-        return relevance_score / len(query_words)
+        Novērtē indeksētos fragmentus no norādītās mapes
+        
+        Args:
+            snapshot (SearchSnapshot): Meklēšanas momentuzņēmums
+            folder_name (str): Mapes nosaukums
+            query_words (list): Meklēšanas vārdu saraksts
+            query (str): Sākotnējais vaicājums
+            results (list): Rezultātu saraksts, kurā pievienot atradumus
+        """
+        logger.debug(f"Meklējam mapē: {folder_name}")
+        
+        with SEARCH_FOLDER_SECONDS.time(folder=folder_name):
+            scores = snapshot.scorer.score(folder_name, query_words, query)
+        
+        for doc_id, relevance_score in scores.items():
+            if relevance_score > 0:
+                results.append(self._result(snapshot, doc_id, relevance_score))
+                logger.debug(f"Atrasts atbilstošs fragments: {snapshot.index.documents[doc_id]['passage']} (score: {relevance_score})")
 
 # Funkcija vispārīgu jautājumu atpazīšanai
 def is_generic_question(text):
@@ -216,32 +366,12 @@ def is_generic_question(text):
     Nosaka, vai jautājums ir vispārīgs (nekonkrēts)
     
     Args:
-        text (str): Jautājuma teksts
+        text (str vai RoutedQuery): Jautājuma teksts
         
     Returns:
         bool: True, ja jautājums ir vispārīgs, citādi False
     """
-    # Atslēgvārdi, kas norāda uz vispārīgu jautājumu
-    generic_keywords = [
-        "kas tu esi", "ko tu zini", "ko tu dari", "kā tu vari palīdzēt", 
-        "kam tu esi", "ko tu", "kas tu", "ko vari", "kā vari", 
-        "palīdzi man", "kāda tev", "kādas ir", "ko māki", "ko maki"
-    ]
-    
-    text_lower = text.lower()
-    
-    # Pārbauda, vai jautājums ir īss (zem 30 rakstzīmēm) un nesatur konkrētus skaitļus vai "kods"
-    is_short_without_specifics = (
-        len(text) < 30 and 
-        not any(char.isdigit() for char in text) and
-        "kods" not in text_lower and
-        "kodu" not in text_lower
-    )
-    
-    # Pārbauda, vai jautājums satur kādu no vispārīgajiem atslēgvārdiem
-    contains_generic_keyword = any(keyword in text_lower for keyword in generic_keywords)
-    
-    return is_short_without_specifics or contains_generic_keyword
+    return route_query(text).is_generic
 
 class QueryProcessor:
     """Klase, kas apvieno meklēšanu un vaicājumu apstrādi"""
@@ -255,23 +385,25 @@ class QueryProcessor:
         """
         self.search_engine = search_engine
     
-    def process_query(self, text):
+    def process_query(self, query):
         """
         Apstrādā vaicājumu un atgriež kontekstu
         
         Args:
-            text (str): Vaicājuma teksts
+            query (str vai RoutedQuery): Vaicājums (jau klasificēts ziņojums netiek klasificēts atkārtoti)
             
         Returns:
             str: Konteksts atbildei vai tukša virkne, ja konteksts nav atrasts
         """
+        query = route_query(query)
+        
         # Pārbauda, vai tas ir vispārīgs jautājums
-        if is_generic_question(text):
-            logger.info(f"Saņemts vispārīgs jautājums: {text}")
+        if query.is_generic:
+            logger.info(f"Saņemts vispārīgs jautājums: {query.text}")
             return ""
         
         # Meklējam relevantos fragmentus
-        relevant_chunks = self.search_engine.search(text)
+        relevant_chunks = self.search_engine.search(query)
         
         if not relevant_chunks:
             logger.info("Nav atrasts neviens atbilstošs fragments kontekstam")
@@ -285,3 +417,15 @@ class QueryProcessor:
 
 # Izveidojam meklēšanas dzinēja instanci, kad modulis tiek importēts
 search_engine = SearchEngine()
+
+# Meklēšanas rezultātu kešatmiņas skaitītāji (/metrics)
+registry.register_callback("chatbot_cache_hits_total", "counter", "Kešatmiņas trāpījumi",
+                           lambda: search_engine.result_cache.hits, cache="search")
+registry.register_callback("chatbot_cache_misses_total", "counter", "Kešatmiņas netrāpījumi",
+                           lambda: search_engine.result_cache.misses, cache="search")
+registry.register_callback("chatbot_cache_evictions_total", "counter", "No kešatmiņas izmestie ieraksti",
+                           lambda: search_engine.result_cache.evictions, cache="search")
+registry.register_callback("chatbot_cache_entries", "gauge", "Ierakstu skaits kešatmiņā",
+                           lambda: len(search_engine.result_cache), cache="search")
+registry.register_callback("chatbot_index_passages", "gauge", "Fragmentu skaits meklēšanas indeksā",
+                           lambda: len(search_engine.index.documents))
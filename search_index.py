@@ -0,0 +1,920 @@
+# search_index.py
+"""
+Meklēšanas indeksa modulis.
+Vienreiz ielādē teksta fragmentus (passages, sk. passages.py) atmiņā un uztur apgriezto
+indeksu (termins → fragmenti), lai meklēšanas laikā nebūtu jālasa faili no diska.
+Termini ir normalizēti vārdi (sk. normalization.py); indeksā saglabāta arī korpusa vārdu
+→ terminu tabula, lai vaicājuma vārdu normalizācija būtu vārdnīcas uzmeklēšana.
+
+Indeksu var iepriekš sakompilēt vienā binārā failā un ielādēt ar mmap:
+    python search_index.py build [--output search_index.bin] [--workers N]
+"""
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import struct
+import hashlib
+import logging
+import argparse
+from array import array
+from itertools import chain
+from functools import cached_property
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from config import Config, get_folder_path
+from passages import parse_chunk_name, group_sources, split_source, split_corpus
+from normalization import normalize_word, is_stop_word, signature as normalization_signature
+
+logger = logging.getLogger(__name__)
+
+# Vārdu sadalīšanas šablons - tas pats, ko izmanto atbilstības aprēķinā
+TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+# Indeksa faila formāts: maģiskā virkne, versija, metadatu (JSON) garums
+INDEX_MAGIC = b"LVSIDX\0\0"
+INDEX_FORMAT_VERSION = 3
+_HEADER = struct.Struct("<8sII")
+
+# Ierakstu platums (uint32 vienībās) bināro tabulu sadaļās
+# mape, ceļa nobīde/garums, satura nobīde/garums, terminu skaits,
+# fragmenta ID nobīde/garums, koda nobīde/garums, veida nobīde/garums
+_DOCUMENT_FIELDS = 12
+_TERM_FIELDS = 4      # termina nobīde, termina garums, sarakstu nobīde, sarakstu garums
+_STEM_FIELDS = 4      # vārda nobīde, vārda garums, termina nobīde, termina garums
+
+# Budžeta kodu atsauces: MK Nr. 934 kodi (NN.NNN) un COFOG kodi (NN.N.N), bet ne datumi
+CODE_REFERENCE_PATTERN = re.compile(r'(?<![\d.])\d{2}\.(?:\d{3}|\d\.\d)(?!\d|\.\d)')
+
+# Kodu sadaļu struktūra MK noteikumu tekstā (mazajiem burtiem)
+_CODE_STRUCTURE_PATTERN = re.compile(
+    r'(?P<definition>kodā\s+(?P<defined>\d{2}\.\d{3})\s+uzskaita)'
+    r'|(?P<exclusion>neuzskaita\s*:)'
+    r'|^[ \t]*(?P<heading>\d{2}\.\d{3})[ \t]*$'
+    r'|(?P<code>' + CODE_REFERENCE_PATTERN.pattern + r')',
+    re.MULTILINE
+)
+
+class IndexFormatError(Exception):
+    """Indeksa fails ir bojāts, citas versijas vai neatbilst korpusam"""
+
+def tokenize(text):
+    """
+    Sadala tekstu vārdos
+
+    Args:
+        text (str): Teksts (jau mazajiem burtiem)
+
+    Returns:
+        list: Vārdu saraksts
+    """
+    return TOKEN_PATTERN.findall(text)
+
+def extract_codes(text):
+    """
+    Atrod tekstā minētos budžeta kodus (piemēram, "09.620" vai "09.6.0")
+
+    Args:
+        text (str): Teksts
+
+    Returns:
+        list: Unikālie kodi to parādīšanās secībā
+    """
+    return list(dict.fromkeys(CODE_REFERENCE_PATTERN.findall(text)))
+
+def list_corpus_files(folders):
+    """
+    Atgriež korpusa teksta failus deterministiskā secībā
+
+    Args:
+        folders (list): Mapju nosaukumu saraksts
+
+    Returns:
+        list: [(mapes nosaukums, faila nosaukums), ...]
+    """
+    files = []
+    for folder in folders:
+        folder_path = get_folder_path(folder)
+        if not os.path.exists(folder_path):
+            logger.warning(f"Mape {folder_path} netika atrasta, izlaižam")
+            continue
+        try:
+            names = sorted(f for f in os.listdir(folder_path) if f.endswith(".txt"))
+        except Exception as e:
+            logger.error(f"Kļūda lasot mapes {folder_path} saturu: {e}", exc_info=True)
+            continue
+        files.extend((folder, name) for name in names)
+    return files
+
+def analyze(content):
+    """
+    Sadala tekstu indeksa terminos (bez stop-vārdiem, normalizētus)
+
+    Args:
+        content (str): Teksts mazajiem burtiem
+
+    Returns:
+        tuple: (terminu skaits, Counter terminu biežumi, {vārds: termins})
+    """
+    stems = {}
+    terms = []
+    for token in tokenize(content):
+        term = stems.get(token)
+        if term is None:
+            if is_stop_word(token):
+                continue
+            term = stems[token] = normalize_word(token)
+        terms.append(term)
+    return len(terms), Counter(terms), stems
+
+def compile_document(passage):
+    """
+    Sagatavo fragmentu indeksēšanai: saturs mazajiem burtiem un terminu biežumi
+
+    Args:
+        passage (passages.Passage): Fragments
+
+    Returns:
+        dict: Dokumenta ieraksts CorpusIndex.assemble vajadzībām
+    """
+    content = passage.text.lower()
+    length, terms, stems = analyze(content)
+    return {
+        "folder": passage.folder,
+        "path": passage.file,
+        "passage": passage.id,
+        "code": passage.code,
+        "kind": passage.kind,
+        "content": content,
+        "length": length,
+        "terms": terms,
+        "stems": stems
+    }
+
+def document_postings(documents, first_doc_id=0):
+    """
+    Izveido biežumu sarakstus dokumentu kopai, sadalītus pa mapēm
+
+    Args:
+        documents (list): Dokumentu ieraksti ar "terms" lauku (sk. compile_document)
+        first_doc_id (int): Pirmā dokumenta identifikators
+
+    Returns:
+        dict: {mape: {termins: [(dokumenta_id, biežums), ...]}}
+    """
+    partitions = {}
+    for doc_id, document in enumerate(documents, first_doc_id):
+        partition = partitions.setdefault(document["folder"], {})
+        for token, frequency in document["terms"].items():
+            partition.setdefault(token, []).append((doc_id, frequency))
+    return partitions
+
+def _compile_shard(passages):
+    """
+    Apstrādā vienu fragmentu daļu (izpildās darba procesā)
+
+    Args:
+        passages (list): Secīgi fragmenti
+
+    Returns:
+        tuple: (dokumentu ieraksti bez "terms" un "stems", daļas biežumu saraksti ar lokāliem
+                identifikatoriem, daļas {vārds: termins} tabula)
+    """
+    documents = [compile_document(passage) for passage in passages]
+    partitions = document_postings(documents)
+    # Terminu biežumi jau ir biežumu sarakstos - tos atpakaļ uz galveno procesu nesūtām
+    stems = {}
+    for document in documents:
+        del document["terms"]
+        stems.update(document.pop("stems"))
+    return documents, partitions, stems
+
+def corpus_checksum(folders):
+    """
+    Aprēķina korpusa kontrolsummu no failu nosaukumiem un satura. Izmaiņu laiki netiek ņemti
+    vērā - pēc git checkout, kopēšanas vai izvēršanas serverī tie mainās, un iepriekš
+    sakompilēts indekss tiktu uzskatīts par novecojušu
+
+    Args:
+        folders (list): Mapju nosaukumu saraksts
+
+    Returns:
+        str: SHA-256 kontrolsumma
+    """
+    # Indekss ir atkarīgs arī no normalizācijas iestatījumiem
+    digest = hashlib.sha256(f"v{INDEX_FORMAT_VERSION}/{normalization_signature()}\n".encode())
+    for folder, name in list_corpus_files(folders):
+        with open(os.path.join(get_folder_path(folder), name), "rb") as f:
+            content = f.read()
+        digest.update(f"{folder}/{name}\0{len(content)}\0".encode("utf-8"))
+        digest.update(content)
+    return digest.hexdigest()
+
+class CorpusIndex:
+    """
+    Apgrieztais indekss teksta fragmentiem, sadalīts pa mapēm.
+
+    Indekss vienmēr tiek glabāts kompaktā binārā formā (vai nu atmiņā, vai mmap failā):
+    dokumentu tabula, terminu vārdnīca katrai mapei, biežumu saraksti, vārdu → terminu
+    tabula un teksta bloks.
+    """
+
+    def __init__(self, buffer):
+        """
+        Ielādē indeksu no binārā bufera
+
+        Args:
+            buffer: bytes vai mmap objekts ar indeksa saturu
+
+        Raises:
+            IndexFormatError: Ja buferis nav derīgs indekss
+        """
+        self._buffer = buffer
+        view = memoryview(buffer)
+
+        if len(view) < _HEADER.size:
+            raise IndexFormatError("Indeksa fails ir pārāk īss")
+        magic, version, meta_length = _HEADER.unpack_from(view, 0)
+        if magic != INDEX_MAGIC:
+            raise IndexFormatError("Nezināms indeksa faila formāts")
+        if version != INDEX_FORMAT_VERSION:
+            raise IndexFormatError(f"Indeksa versija {version}, sagaidīta {INDEX_FORMAT_VERSION}")
+
+        meta = json.loads(bytes(view[_HEADER.size:_HEADER.size + meta_length]).decode("utf-8"))
+        self.checksum = meta["checksum"]
+        self.folders = meta["folders"]
+
+        # Sadaļu nobīdes ir relatīvas pret datu apgabalu aiz metadatiem
+        view = view[_align(_HEADER.size + meta_length):]
+        self._strings = view[meta["strings"][0]:meta["strings"][0] + meta["strings"][1]]
+        self._postings = self._uint32_section(view, meta["postings"])
+        doc_table = self._uint32_section(view, meta["documents"])
+
+        # Dokumentu metadati: {"file", "path", "folder", "length", "passage", "code", "kind"},
+        # saturs tiek nolasīts pēc pieprasījuma
+        self.documents = []
+        self._content_spans = []
+        for i in range(0, len(doc_table), _DOCUMENT_FIELDS):
+            (folder_idx, path_off, path_len, content_off, content_len, length,
+             passage_off, passage_len, code_off, code_len, kind_off, kind_len) = doc_table[i:i + _DOCUMENT_FIELDS]
+            relative_path = self._string(path_off, path_len)
+            self.documents.append({
+                "file": get_folder_path(relative_path),
+                "path": relative_path,
+                "folder": self.folders[folder_idx],
+                "length": length,
+                "passage": self._string(passage_off, passage_len),
+                "code": self._string(code_off, code_len) or None,
+                "kind": self._string(kind_off, kind_len)
+            })
+            self._content_spans.append((content_off, content_len))
+
+        # Korpusa vārds → indeksa termins
+        stem_table = self._uint32_section(view, meta["stems"])
+        self.stems = {}
+        for i in range(0, len(stem_table), _STEM_FIELDS):
+            word_off, word_len, term_off, term_len = stem_table[i:i + _STEM_FIELDS]
+            self.stems[self._string(word_off, word_len)] = self._string(term_off, term_len)
+
+        # Mapes nosaukums → {termins: (sarakstu nobīde, garums)}
+        self.partitions = {}
+        for partition in meta["partitions"]:
+            term_table = self._uint32_section(view, partition["terms"])
+            vocabulary = {}
+            for i in range(0, len(term_table), _TERM_FIELDS):
+                term_off, term_len, postings_off, postings_len = term_table[i:i + _TERM_FIELDS]
+                vocabulary[self._string(term_off, term_len)] = (postings_off, postings_len)
+            self.partitions[partition["folder"]] = vocabulary
+
+    @staticmethod
+    def _uint32_section(view, section):
+        """Atgriež uint32 skatu uz bufera sadaļu bez kopēšanas"""
+        offset, count = section
+        return view[offset:offset + count * 4].cast("I")
+
+    def _string(self, offset, length):
+        """Atkodē UTF-8 virkni no teksta bloka"""
+        return bytes(self._strings[offset:offset + length]).decode("utf-8")
+
+    @classmethod
+    def build(cls, folders, workers=None):
+        """
+        Izveido indeksu no norādītajām mapēm
+
+        Args:
+            folders (list): Mapju nosaukumu saraksts
+            workers (int, optional): Darba procesu skaits (sk. compile)
+
+        Returns:
+            CorpusIndex: Aizpildīts indekss
+        """
+        started = time.time()
+        index = cls(cls.compile(folders, workers))
+        logger.info(f"Indekss izveidots: {len(index.documents)} fragmenti, "
+                    f"{sum(len(p) for p in index.partitions.values())} termini, "
+                    f"{time.time() - started:.2f}s")
+        return index
+
+    @classmethod
+    def compile(cls, folders, workers=None):
+        """
+        Nolasa korpusu un sakompilē to binārā indeksa formātā.
+        Fragmentu apstrāde (vārdu sadalīšana un biežumu saraksti) tiek sadalīta secīgās daļās
+        starp darba procesiem; daļu rezultāti tiek apvienoti daļu secībā, tāpēc indekss ir
+        identisks neatkarīgi no procesu skaita.
+
+        Args:
+            folders (list): Mapju nosaukumu saraksts
+            workers (int, optional): Darba procesu skaits; pēc noklusējuma Config.INDEX_BUILD_WORKERS
+
+        Returns:
+            bytes: Indeksa saturs
+        """
+        workers = max(1, workers or Config.INDEX_BUILD_WORKERS)
+        started = time.time()
+        checksum = corpus_checksum(folders)
+        # Dokumenti ir fragmenti pa struktūras robežām, nevis faili (sk. passages.split_corpus).
+        # Avota sadalīšanai vajadzīgs viss avota teksts, tāpēc tā notiek galvenajā procesā
+        passages = split_corpus(list_corpus_files(folders))
+
+        # Vairāk daļu nekā procesu, lai nevienmērīgas daļas neatstātu procesus dīkstāvē
+        shard_count = 1 if workers == 1 else min(len(passages), workers * 4) or 1
+        size = -(-len(passages) // shard_count)
+        shards = [passages[i:i + size] for i in range(0, len(passages), size)]
+        if workers > 1 and len(shards) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_compile_shard, shards))
+        else:
+            results = [_compile_shard(shard) for shard in shards]
+
+        # Daļu biežumu saraksti tiek apvienoti daļu secībā, pārbīdot lokālos identifikatorus
+        documents = []
+        partitions = {folder: {} for folder in folders}
+        stems = {}
+        for shard_documents, shard_partitions, shard_stems in results:
+            offset = len(documents)
+            documents.extend(shard_documents)
+            stems.update(shard_stems)
+            for folder, terms in shard_partitions.items():
+                partition = partitions[folder]
+                for token, entries in terms.items():
+                    if offset:
+                        entries = [(doc_id + offset, frequency) for doc_id, frequency in entries]
+                    if token in partition:
+                        partition[token].extend(entries)
+                    else:
+                        partition[token] = entries
+
+        data = cls.assemble(folders, checksum, documents, partitions, stems)
+        elapsed = max(time.time() - started, 1e-9)
+        megabytes = sum(len(passage.text) for passage in passages) / 1e6
+        logger.info(f"Indekss sakompilēts: {len(passages)} fragmenti, {megabytes:.2f} MB, {elapsed:.2f}s "
+                    f"({megabytes / elapsed:.2f} MB/s, {len(passages) / elapsed:.0f} fragmenti/s, "
+                    f"{workers} procesi)")
+        return data
+
+    @staticmethod
+    def assemble(folders, checksum, documents, partitions, stems):
+        """
+        Saliek sagatavotos dokumentus un to biežumu sarakstus binārā indeksa formātā
+
+        Args:
+            folders (list): Mapju nosaukumu saraksts
+            checksum (str): Korpusa kontrolsumma
+            documents (list): Dokumentu ieraksti (sk. compile_document) indeksa secībā
+            partitions (dict): {mape: {termins: [(dokumenta_id, biežums), ...]}} (sk. document_postings)
+            stems (dict): {korpusa vārds: termins}
+
+        Returns:
+            bytes: Indeksa saturs
+        """
+        strings = bytearray()
+
+        def add_string(value):
+            encoded = value.encode("utf-8")
+            offset = len(strings)
+            strings.extend(encoded)
+            return offset, len(encoded)
+
+        folder_ids = {folder: i for i, folder in enumerate(folders)}
+        doc_table = array("I")
+        for document in documents:
+            doc_table.extend((folder_ids[document["folder"]],) + add_string(document["path"])
+                             + add_string(document["content"]) + (document["length"],)
+                             + add_string(document["passage"]) + add_string(document["code"] or "")
+                             + add_string(document["kind"]))
+
+        postings = array("I")
+        term_tables = []
+        for folder in folders:
+            term_table = array("I")
+            partition = partitions.get(folder, {})
+            for token in sorted(partition):
+                entries = partition[token]
+                term_table.extend(add_string(token) + (len(postings) // 2, len(entries)))
+                postings.extend(chain.from_iterable(entries))
+            term_tables.append(term_table)
+
+        stem_table = array("I")
+        for word in sorted(stems):
+            stem_table.extend(add_string(word) + add_string(stems[word]))
+
+        # Sadaļu nobīdes ir relatīvas pret datu apgabalu, kas sākas aiz metadatiem
+        sections = [doc_table, postings, stem_table] + term_tables
+        layout = []
+        offset = 0
+        for section in sections:
+            layout.append([offset, len(section)])
+            offset = _align(offset + len(section) * 4)
+        meta = {
+            "checksum": checksum,
+            "folders": list(folders),
+            "documents": layout[0],
+            "postings": layout[1],
+            "stems": layout[2],
+            "partitions": [{"folder": folder, "terms": layout[3 + i]} for i, folder in enumerate(folders)],
+            "strings": [offset, len(strings)]
+        }
+
+        meta_bytes = json.dumps(meta).encode("utf-8")
+        data = bytearray(_HEADER.pack(INDEX_MAGIC, INDEX_FORMAT_VERSION, len(meta_bytes)) + meta_bytes)
+        base = _align(len(data))
+        for (section_offset, _), section in zip(layout, sections):
+            data.extend(b"\0" * (base + section_offset - len(data)))
+            data.extend(section.tobytes())
+        data.extend(b"\0" * (base + offset - len(data)))
+        data.extend(strings)
+        return bytes(data)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Ielādē indeksu no faila, izmantojot mmap (saturs netiek kopēts atmiņā)
+
+        Args:
+            path (str): Indeksa faila ceļš
+
+        Returns:
+            CorpusIndex: Ielādētais indekss
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped)
+
+    @classmethod
+    def save(cls, folders, path, workers=None):
+        """
+        Sakompilē korpusu un saglabā indeksa failu (atomāri)
+
+        Args:
+            folders (list): Mapju nosaukumu saraksts
+            path (str): Indeksa faila ceļš
+            workers (int, optional): Darba procesu skaits (sk. compile)
+
+        Returns:
+            int: Faila izmērs baitos
+        """
+        return cls._write(cls.compile(folders, workers), path)
+
+    @staticmethod
+    def _write(data, path):
+        """Atomāri ieraksta indeksa saturu failā un atgriež tā izmēru"""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return len(data)
+
+    @classmethod
+    def publish(cls, data, path):
+        """
+        Saglabā sakompilētu indeksu failā un ielādē to ar mmap
+
+        Args:
+            data (bytes): Indeksa saturs
+            path (str): Indeksa faila ceļš
+
+        Returns:
+            CorpusIndex: Indekss (atmiņā, ja failu neizdevās saglabāt)
+        """
+        try:
+            cls._write(data, path)
+            return cls.load(path)
+        except OSError as e:
+            # Piemēram, tikai lasāma failu sistēma - strādājam ar indeksu atmiņā
+            logger.warning(f"Neizdevās saglabāt indeksa failu {path}: {e}")
+            return cls(data)
+
+    @classmethod
+    def load_or_build(cls, folders, path):
+        """
+        Ielādē indeksa failu, ja tas atbilst korpusam; citādi to pārbūvē
+
+        Args:
+            folders (list): Mapju nosaukumu saraksts
+            path (str): Indeksa faila ceļš
+
+        Returns:
+            CorpusIndex: Indekss
+        """
+        try:
+            index = cls.load(path)
+            if index.folders != list(folders) or index.checksum != corpus_checksum(folders):
+                raise IndexFormatError("Indeksa fails neatbilst korpusam")
+            logger.info(f"Indekss ielādēts no {path}: {len(index.documents)} fragmenti")
+            return index
+        except FileNotFoundError:
+            logger.info(f"Indeksa fails {path} nav atrasts, veidojam no jauna")
+        except (IndexFormatError, ValueError, OSError) as e:
+            logger.warning(f"Indeksa fails {path} nav derīgs ({e}), veidojam no jauna")
+
+        try:
+            size = cls.save(folders, path)
+            logger.info(f"Indekss saglabāts: {path} ({size} baiti)")
+            return cls.load(path)
+        except OSError as e:
+            # Piemēram, tikai lasāma failu sistēma - strādājam ar indeksu atmiņā
+            logger.warning(f"Neizdevās saglabāt indeksa failu {path}: {e}")
+            return cls.build(folders)
+
+    def content(self, doc_id):
+        """
+        Atgriež fragmenta saturu (mazajiem burtiem)
+
+        Args:
+            doc_id (int): Dokumenta identifikators
+
+        Returns:
+            str: Fragmenta teksts
+        """
+        offset, length = self._content_spans[doc_id]
+        return self._string(offset, length)
+
+    def terms(self, words):
+        """
+        Pārveido vaicājuma vārdus indeksa terminos tāpat kā indeksēšanas laikā.
+        Korpusā sastopamajiem vārdiem termins tiek ņemts no indeksa tabulas.
+
+        Args:
+            words (list): Vaicājuma vārdi mazajiem burtiem
+
+        Returns:
+            list: Unikālie termini vārdu secībā (bez stop-vārdiem)
+        """
+        terms = []
+        for word in words:
+            term = self.stems.get(word)
+            if term is None:
+                if is_stop_word(word):
+                    continue
+                term = normalize_word(word)
+            terms.append(term)
+        return list(dict.fromkeys(terms))
+
+    def postings(self, folder_name, token):
+        """
+        Atgriež dokumentus, kuros termins sastopams norādītajā mapē
+
+        Args:
+            folder_name (str): Mapes nosaukums
+            token (str): Meklējamais termins (sk. terms)
+
+        Returns:
+            list: [(dokumenta_id, biežums), ...]
+        """
+        entry = self.posting_span(folder_name, token)
+        if entry is None:
+            return []
+        offset, length = entry
+        pairs = self._postings[offset * 2:(offset + length) * 2]
+        return list(zip(pairs[0::2], pairs[1::2]))
+
+    def posting_span(self, folder_name, token):
+        """
+        Atgriež termina biežumu saraksta atrašanās vietu kopējā sarakstu masīvā
+
+        Args:
+            folder_name (str): Mapes nosaukums
+            token (str): Meklējamais termins
+
+        Returns:
+            tuple: (nobīde, garums) pāru vienībās vai None, ja termins nav sastopams
+        """
+        return self.partitions.get(folder_name, {}).get(token)
+
+    @cached_property
+    def trigrams(self):
+        """Visu mapju terminu trigrammu indekss (tiek veidots pirmajā izmantošanā)"""
+        return TrigramIndex(term for vocabulary in self.partitions.values() for term in vocabulary)
+
+    @property
+    def raw_postings(self):
+        """uint32 skats uz visiem biežumu sarakstiem: dokumenta_id, biežums, dokumenta_id, ..."""
+        return self._postings
+
+    def vocabulary(self, folder_name):
+        """
+        Atgriež visus mapē sastopamos terminus
+
+        Args:
+            folder_name (str): Mapes nosaukums
+
+        Returns:
+            iterable: Terminu kopa
+        """
+        return self.partitions.get(folder_name, {}).keys()
+
+class IncrementalIndexBuilder:
+    """
+    Pārbūvē indeksu pēc korpusa izmaiņām, no jauna sadalot un apstrādājot tikai to avotu
+    fragmentus, kuru faili mainījušies. Pārējo avotu dokumenti (saturs un vārdu biežumi)
+    tiek ņemti no iepriekšējā indeksa, tāpēc to faili netiek lasīti.
+    """
+
+    def __init__(self, folders):
+        """
+        Inicializē pārbūvētāju
+
+        Args:
+            folders (list): Mapju nosaukumu saraksts
+        """
+        self.folders = list(folders)
+        # Avots → dokumentu ieraksti (sk. compile_document); aizpilda no indeksa pirmajā izmaiņā
+        self._sources = None
+        self._checksum = None
+
+    def update(self, index, changed_files):
+        """
+        Sakompilē jaunu indeksu, ņemot vērā mainītos failus
+
+        Args:
+            index (CorpusIndex): Pašreizējais indekss
+            changed_files (iterable): Pievienotie, mainītie vai dzēstie faili [(mape, nosaukums), ...]
+
+        Returns:
+            bytes: Jaunā indeksa saturs
+        """
+        if self._sources is None or self._checksum != index.checksum:
+            self._sources = self._sources_from_index(index)
+
+        checksum = corpus_checksum(self.folders)
+        groups = group_sources(list_corpus_files(self.folders))
+        changed_sources = {parse_chunk_name(name)[0] for _, name in changed_files}
+        for source in changed_sources:
+            if source in groups:
+                self._sources[source] = [compile_document(passage)
+                                         for passage in split_source(source, groups[source])]
+            else:
+                self._sources.pop(source, None)
+
+        documents = [document for source in groups for document in self._sources.get(source, [])]
+        stems = {}
+        for document in documents:
+            stems.update(document["stems"])
+        logger.info(f"Indekss atjaunots: {len(changed_sources)} mainīti avoti, {len(documents)} fragmenti")
+        self._checksum = checksum
+        return CorpusIndex.assemble(self.folders, checksum, documents, document_postings(documents), stems)
+
+    @staticmethod
+    def _sources_from_index(index):
+        """
+        Atjauno dokumentu ierakstus no esošā indeksa (bez korpusa failu lasīšanas)
+
+        Args:
+            index (CorpusIndex): Indekss
+
+        Returns:
+            dict: {avots: [dokumentu ieraksti, ...]}
+        """
+        sources = {}
+        for doc_id, document in enumerate(index.documents):
+            content = index.content(doc_id)
+            _, terms, stems = analyze(content)
+            record = dict(document, content=content, terms=terms, stems=stems)
+            sources.setdefault(document["passage"].rpartition("#")[0], []).append(record)
+        return sources
+
+class TrigramIndex:
+    """
+    Terminu vārdnīcas trigrammu indekss: trigramma → termini, kuros tā sastopama.
+
+    Aizstāj visas vārdnīcas pārlūkošanu, meklējot terminus, kas satur vaicājuma terminu
+    (daļēja sakritība), vai terminus, kas tam ir līdzīgi (drukas kļūdas).
+    Termini tiek sadalīti trigrammās ar atstarpi sākumā un beigās (" ab", "abc", "bc "),
+    tāpēc vārda sākums un beigas līdzības novērtējumā sver vairāk.
+    """
+
+    def __init__(self, terms):
+        """
+        Izveido indeksu
+
+        Args:
+            terms (iterable): Termini (dublējumi tiek izmesti)
+        """
+        self.terms = sorted(set(terms))
+        self._term_set = frozenset(self.terms)
+        # Trigramma → terminu identifikatori augošā secībā
+        self.grams = {}
+        self._gram_counts = []
+        for term_id, term in enumerate(self.terms):
+            grams = _trigrams(f" {term} ")
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self.grams.setdefault(gram, []).append(term_id)
+
+    def __contains__(self, term):
+        return term in self._term_set
+
+    def __len__(self):
+        return len(self.terms)
+
+    def containing(self, fragment):
+        """
+        Atrod terminus, kas satur fragmentu kā daļu no garāka termina
+
+        Args:
+            fragment (str): Meklējamais fragments
+
+        Returns:
+            list: Termini (bez paša fragmenta) alfabētiskā secībā
+        """
+        grams = _trigrams(fragment)
+        if not grams:
+            # Fragmentam īsākam par trigrammu indekss nepalīdz
+            return [term for term in self.terms if fragment in term and term != fragment]
+
+        # Kandidāti satur visas fragmenta trigrammas; sākam ar retāko
+        lists = sorted((self.grams.get(gram, ()) for gram in grams), key=len)
+        candidates = set(lists[0])
+        for term_ids in lists[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(term_ids)
+
+        # Trigrammas var būt arī nesecīgas - apstiprinām ar apakšvirknes pārbaudi
+        return [self.terms[term_id] for term_id in sorted(candidates)
+                if fragment in self.terms[term_id] and self.terms[term_id] != fragment]
+
+    def similar(self, term, limit=1, threshold=0.5):
+        """
+        Atrod terminam līdzīgākos terminus pēc kopīgo trigrammu skaita (Dice koeficients)
+
+        Args:
+            term (str): Termins (piemēram, ar drukas kļūdu)
+            limit (int): Maksimālais atgriežamo terminu skaits
+            threshold (float): Minimālā līdzība no 0 līdz 1
+
+        Returns:
+            list: [(termins, līdzība), ...] līdzības secībā
+        """
+        grams = _trigrams(f" {term} ")
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.grams.get(gram, ()))
+
+        matches = []
+        for term_id, count in shared.items():
+            score = 2 * count / (len(grams) + self._gram_counts[term_id])
+            if score >= threshold and self.terms[term_id] != term:
+                matches.append((self.terms[term_id], score))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit]
+
+def _trigrams(text):
+    """Teksta trigrammu kopa"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class CodeIndex:
+    """
+    Budžeta kodu indekss: kods → fragmenti, kuros kods definēts vai minēts.
+
+    Katrai koda parādīšanās reizei tiek saglabāta loma:
+        definition - "Kodā X.XXX uzskaita:" (koda definīcija) un paša koda "Neuzskaita:" fragments
+        heading    - koda virsraksts (kods atsevišķā rindā)
+        excluded   - kods minēts cita koda "Neuzskaita:" sadaļā
+        included   - kods minēts cita koda "Kodā X.XXX uzskaita:" sadaļā
+        mention    - jebkura cita pieminēšana (piemēram, COFOG dokumentos)
+    """
+
+    # Lomas prioritātes secībā, kādā fragmenti tiek nodoti kontekstam
+    ROLES = ("definition", "heading", "excluded", "included", "mention")
+
+    def __init__(self):
+        """Inicializē tukšu kodu indeksu"""
+        # Kods → {loma: [dokumenta_id, ...]}
+        self.codes = {}
+
+    @classmethod
+    def build(cls, index):
+        """
+        Izveido kodu indeksu no meklēšanas indeksa fragmentiem
+
+        Args:
+            index (CorpusIndex): Meklēšanas indekss
+
+        Returns:
+            CodeIndex: Aizpildīts kodu indekss
+        """
+        started = time.time()
+        code_index = cls()
+        for doc_id, document in enumerate(index.documents):
+            code_index.add_document(doc_id, index.content(doc_id))
+            # "Neuzskaita:" fragments sākas bez koda, bet sadalīšanā zināms, kuram kodam tas pieder
+            if document["kind"] == "excluded" and document["code"]:
+                code_index._add(document["code"], "definition", doc_id)
+
+        logger.info(f"Kodu indekss izveidots: {len(code_index.codes)} kodi, "
+                    f"{time.time() - started:.2f}s")
+        return code_index
+
+    def add_document(self, doc_id, content):
+        """
+        Pievieno fragmentā atrastos kodus indeksam
+
+        Args:
+            doc_id (int): Dokumenta identifikators
+            content (str): Fragmenta saturs (mazajiem burtiem)
+        """
+        # Fragments var sākties sadaļas vidū, tāpēc līdz pirmajam marķierim kods ir tikai minēts
+        section = "mention"
+        owner = None
+
+        for match in _CODE_STRUCTURE_PATTERN.finditer(content):
+            if match.group("definition"):
+                owner = match.group("defined")
+                section = "included"
+                self._add(owner, "definition", doc_id)
+            elif match.group("exclusion"):
+                section = "excluded"
+            elif match.group("heading"):
+                owner = None
+                section = "mention"
+                self._add(match.group("heading"), "heading", doc_id)
+            elif match.group("code") != owner:
+                self._add(match.group("code"), section, doc_id)
+
+    def _add(self, code, role, doc_id):
+        """Pievieno koda parādīšanos, ja tā vēl nav reģistrēta"""
+        documents = self.codes.setdefault(code, {}).setdefault(role, [])
+        if doc_id not in documents:
+            documents.append(doc_id)
+
+    def lookup(self, code):
+        """
+        Atgriež fragmentus, kuros kods definēts vai minēts
+
+        Args:
+            code (str): Budžeta kods
+
+        Returns:
+            dict: {loma: [dokumenta_id, ...]}
+        """
+        return self.codes.get(code, {})
+
+    def ranked_documents(self, codes):
+        """
+        Atgriež kodu fragmentus prioritātes secībā (vispirms definīcijas)
+
+        Args:
+            codes (list): Budžeta kodi
+
+        Returns:
+            list: [(dokumenta_id, kods, loma), ...] bez dublējumiem
+        """
+        seen = set()
+        ranked = []
+        for role in self.ROLES:
+            for code in codes:
+                for doc_id in self.lookup(code).get(role, []):
+                    if doc_id not in seen:
+                        seen.add(doc_id)
+                        ranked.append((doc_id, code, role))
+        return ranked
+
+def _align(offset, boundary=8):
+    """Noapaļo nobīdi uz augšu līdz norādītajai robežai"""
+    return (offset + boundary - 1) // boundary * boundary
+
+def main(argv=None):
+    """Komandrindas rīks indeksa faila izveidei"""
+    parser = argparse.ArgumentParser(description="Meklēšanas indeksa izveide")
+    parser.add_argument("command", choices=["build"], help="Veicamā darbība")
+    parser.add_argument("--output", default=Config.INDEX_PATH, help="Indeksa faila ceļš")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Darba procesu skaits (pēc noklusējuma - procesora kodolu skaits)")
+    args = parser.parse_args(argv)
+
+    folders = Config.PRIMARY_FOLDERS + Config.COFOG_FOLDERS
+    started = time.time()
+    size = CorpusIndex.save(folders, args.output, args.workers)
+    elapsed = max(time.time() - started, 1e-9)
+    index = CorpusIndex.load(args.output)
+    megabytes = sum(span[1] for span in index._content_spans) / 1e6
+    print(f"Indekss saglabāts: {args.output} ({size} baiti, {len(index.documents)} fragmenti, "
+          f"{elapsed:.2f}s, {megabytes / elapsed:.2f} MB/s, {args.workers} procesi)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())